@@ -3,167 +3,838 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import shelve, time, os, os.path, sys, pickle, dbm, uuid, hashlib, atexit, glob
+import time, os, os.path, sys, pickle, uuid, hashlib, atexit, glob, collections, json, weakref, zlib, threading, queue
 
 import jasy
-import jasy.core.Util
+import jasy.core.CacheBackend as CacheBackend
+import jasy.core.SharedCache as SharedCache
 import jasy.core.Console as Console
 
+from jasy.parse.AbstractNode import AbstractNode
+from jasy.parse.CompactTree import CompactTree
+
 hostId = uuid.getnode()
 
+# Layout of the stored records. Increase to recreate existing cache files.
+cacheFormat = 3
+
+# Default limit for the in-memory storage of each cache (in bytes). None means unlimited.
+memoryLimit = None
+
+# Whether stores are written by a background thread by default
+writeBehind = False
+
+# Maximum number of stores waiting for the background thread. Further stores block until there is room.
+writeQueueSize = 1000
+
+# Default folder and size limit (in bytes) of the shared cache of all projects. None means disabled/unlimited.
+sharedPath = None
+sharedLimit = None
+
+# Version of the values stored in each namespace (defaults to 1). Increase when changing the
+# format of the values so that only the entries of this namespace are dropped on upgrades.
+schemaVersions = {
+    "tree" : 1,
+    "tree-data" : 2,
+    "opt-tree" : 1,
+    "fields" : 1,
+    "facts" : 2,
+    "api" : 1,
+    "highlighted" : 1,
+    "compressed" : 2,
+    "size" : 1,
+    "fingerprint" : 1,
+    "deps" : 2
+}
+
+# Serialized values larger than this are compressed (in bytes)
+compressionThreshold = 4096
+
+# Default codec for compressing values
+compressionCodec = "zlib"
+
+# Codecs for compressing values. Each stored record starts with the tag of the used codec.
+codecs = {
+    "none" : (b"-", None, None),
+    "zlib" : (b"z", lambda data: zlib.compress(data, 1), zlib.decompress)
+}
+
+try:
+    import lz4.frame
+    codecs["lz4"] = (b"l", lz4.frame.compress, lz4.frame.decompress)
+except ImportError:
+    pass
+
+decoders = { codecs[name][0] : codecs[name][2] for name in codecs }
+
+# Namespaces of small but often requested entries. Their entries which are not specific to
+# a permutation (no parameters besides the fingerprint e.g. "facts[foo.Main]") are never evicted from memory.
+pinnedNamespaces = set(["facts", "fields", "project", "fingerprint"])
+
+
+# Usage counters of all caches grouped by namespace (see getStatistics())
+statisticFields = ("hits", "misses", "stale", "loads", "loadedBytes", "loadTime", "stores", "storedBytes", "dumpTime")
+statistics = collections.defaultdict(lambda: dict.fromkeys(statisticFields, 0))
+
+# All cache instances created so far (for reporting file sizes)
+instances = weakref.WeakSet()
+
+# Whether the caches are used by a forked worker process (see detachAll())
+detached = False
+
+
+def setMemoryLimit(limit):
+    """Configures the default in-memory budget (in bytes) for caches created afterwards"""
+
+    global memoryLimit
+    memoryLimit = limit
+
+
+def setWriteBehind(enabled):
+    """Configures whether caches created afterwards write stores in a background thread"""
+
+    global writeBehind
+    writeBehind = enabled
+
+
+def setCompressionCodec(codec):
+    """Configures the default codec for compressing large values of caches created afterwards"""
+
+    global compressionCodec
+    compressionCodec = codec
+
+
+def encode(data, codec):
+    """Compresses the given data (if large enough) and prepends the tag of the used codec"""
+
+    tag, compress, decompress = codecs[codec]
+    if compress is None or len(data) < compressionThreshold:
+        return codecs["none"][0] + data
+
+    return tag + compress(data)
+
+
+def decode(data):
+    """Decompresses data stored by encode(). Raises a ValueError for unsupported codecs."""
+
+    tag = data[:1]
+    if not tag in decoders:
+        raise ValueError("Unsupported codec: %s" % tag)
+
+    decompress = decoders[tag]
+    if decompress is None:
+        return data[1:]
+
+    return decompress(data[1:])
+
+
+def setSharedPath(path, limit=None):
+    """Configures the default shared cache folder (and its size limit in bytes) for caches created afterwards"""
+
+    global sharedPath, sharedLimit
+    sharedPath = path
+    sharedLimit = limit
+
+
+def detachAll():
+    """
+    Switches all existing caches (and caches created afterwards) to read-only access of their storage.
+    Used by forked worker processes which share the cache files with the main process. Entries stored
+    by the workers are collected in memory instead (see takeRecords()).
+    """
+
+    global detached
+    detached = True
+
+    for cache in list(instances):
+        cache.detach()
+
+
+def takeRecords():
+    """Returns the entries collected by all detached caches grouped by the file name of the cache and resets them"""
+
+    result = {}
+    for cache in list(instances):
+        records = cache.takeRecords()
+        if records:
+            result[cache.getFileName()] = records
+
+    return result
+
+
+def mergeRecords(records):
+    """Stores the entries collected by detached caches (see takeRecords()) in the caches of this process"""
+
+    for cache in list(instances):
+        fileName = cache.getFileName()
+        if fileName in records:
+            cache.merge(records[fileName])
+
+
+def getNamespace(key):
+    """Returns the namespace of the given key e.g. "opt-tree" for "opt-tree[foo.Bar]-debug:true" """
+
+    pos = key.find("[")
+    if pos == -1:
+        return key
+
+    return key[:pos]
+
+
+def isPinned(key):
+    """Whether the given entry is kept in memory outside of the budget (see pinnedNamespaces)"""
+
+    if not getNamespace(key) in pinnedNamespaces:
+        return False
+
+    # Entries of permutations would grow with the number of permutations
+    end = key.find("]")
+    return key[end+1:end+2] in ("", "@")
+
+
+def getSharedKey(key):
+    """Returns the key of the given entry in the shared cache which includes the schema version of its namespace"""
+
+    return "%s:%s" % (schemaVersions.get(getNamespace(key), 1), key)
+
+
+def getStatistics():
+    """
+    Returns the usage counters of all caches grouped by namespace
+    together with the size of the cache files (in bytes).
+    """
+
+    return {
+        "namespaces" : { namespace : dict(statistics[namespace]) for namespace in statistics },
+        "files" : { cache.getFileName() : cache.getFileSize() for cache in instances }
+    }
+
+
+def resetStatistics():
+    """Resets all usage counters"""
+
+    statistics.clear()
+
+
+def printStatistics():
+    """Prints the usage counters of all caches"""
+
+    Console.info("%-20s %8s %8s %8s %10s %10s %10s", "Namespace", "Hits", "Misses", "Stale", "Stored KB", "Load ms", "Dump ms")
+
+    for namespace in sorted(statistics):
+        entry = statistics[namespace]
+        Console.info("%-20s %8s %8s %8s %10.1f %10.1f %10.1f", namespace, entry["hits"], entry["misses"], entry["stale"], 
+            entry["storedBytes"] / 1024, entry["loadTime"] * 1000, entry["dumpTime"] * 1000)
+
+    for cache in instances:
+        Console.info("Cache file %s: %.1f KB", cache.getFileName(), cache.getFileSize() / 1024)
+
+
+def writeStatistics(fileName):
+    """Writes the usage counters of all caches to the given file as JSON"""
+
+    data = getStatistics()
+    data["time"] = time.time()
+    data["version"] = jasy.__version__
+
+    handle = open(fileName, mode="w", encoding="utf-8")
+    json.dump(data, handle, indent=2, sort_keys=True)
+    handle.close()
+
+
+def estimateSize(value, depth=0):
+    """
+    Returns an estimation of the memory used by the given value (in bytes).
+    Syntax trees are measured by their nodes (or node tables), containers by their entries.
+    """
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, AbstractNode):
+        stack = list(value)
+        while stack:
+            node = stack.pop()
+            if node is not None:
+                size += sys.getsizeof(node)
+                stack.extend(node)
+
+    elif isinstance(value, CompactTree):
+        size += estimateSize(value.strings, depth+1) + estimateSize(value.attributeValues, depth+1)
+
+    elif depth > 4 or isinstance(value, (str, bytes, int, float, bool)):
+        pass
+
+    elif isinstance(value, dict):
+        for key in value:
+            size += estimateSize(key, depth+1) + estimateSize(value[key], depth+1)
+
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for entry in value:
+            size += estimateSize(entry, depth+1)
+
+    elif hasattr(value, "__dict__"):
+        size += estimateSize(value.__dict__, depth+1)
+
+    elif hasattr(value, "__slots__"):
+        for name in value.__slots__:
+            size += estimateSize(getattr(value, name, None), depth+1)
+
+    return size
+
+
+
+class MemoryStore:
+    """
+    In-memory storage with a byte budget. Entries are evicted in least-recently-used
+    order, large entries (e.g. syntax trees) before all others. Entries of pinned
+    namespaces are kept outside of the budget and are never evicted (see isPinned()).
+    """
+
+    def __init__(self, limit=None):
+        self.__limit = limit
+        self.__pinned = {}
+        self.__small = collections.OrderedDict()
+        self.__large = collections.OrderedDict()
+        self.__size = 0
+
+        # Entries larger than this are evicted first
+        self.__largeSize = limit // 32 if limit else None
+
+
+    def __contains__(self, key):
+        return key in self.__pinned or key in self.__small or key in self.__large
+
+
+    def get(self, key, default=None):
+        """Returns the value stored for the given key and marks it as recently used"""
+
+        if key in self.__pinned:
+            return self.__pinned[key]
+
+        for entries in (self.__small, self.__large):
+            if key in entries:
+                entries.move_to_end(key)
+                return entries[key][0]
+
+        return default
+
+
+    def set(self, key, value):
+        """Stores the given value. Might evict other entries to keep the budget."""
+
+        self.remove(key)
+
+        if self.__limit is None:
+            self.__small[key] = (value, 0)
+            return
+
+        if isPinned(key):
+            self.__pinned[key] = value
+            return
+
+        size = estimateSize(value)
+        if size > self.__limit:
+            return
+
+        if size > self.__largeSize:
+            self.__large[key] = (value, size)
+        else:
+            self.__small[key] = (value, size)
+
+        self.__size += size
+
+        while self.__size > self.__limit:
+            entries = self.__large or self.__small
+            evictedKey, evicted = entries.popitem(last=False)
+            self.__size -= evicted[1]
+
+
+    def remove(self, key):
+        """Removes the given key (if stored)"""
+
+        if key in self.__pinned:
+            del self.__pinned[key]
+            return
+
+        for entries in (self.__small, self.__large):
+            if key in entries:
+                self.__size -= entries.pop(key)[1]
+                return
+
+
+    def getSize(self):
+        """Returns the estimated size of all evictable entries"""
+
+        return self.__size
+
+
 class Cache:
-    """ 
-    A cache class based on shelve feature of Python. Supports transient in-memory 
-    storage, too. Uses memory storage for caching requests to DB as well for 
-    improved performance. Uses keys for identification of entries like a normal
-    hash table / dictionary.
     """
-    
-    __shelve = None
-    
-    def __init__(self, path, filename="jasycache", hashkeys=False):
-        self.__transient = {}
+    A cache class based on a pluggable storage backend (shelve by default, or a
+    transactional SQLite database). Supports transient in-memory storage, too.
+    Uses memory storage for caching requests to DB as well for improved performance.
+    Uses keys for identification of entries like a normal hash table / dictionary.
+
+    Optionally a shared folder (see jasy.core.SharedCache) is used as a second tier
+    for entries which are keyed by content. It is consulted on local misses and
+    populated on stores of such entries.
+
+    In write-behind mode serialized values are written to the storage by a background
+    thread. Reads see pending values, sync() and close() wait for all pending writes.
+    """
+
+    __backend = None
+    __shared = None
+    __writer = None
+    __records = None
+
+    def __init__(self, path, filename="jasycache", hashkeys=False, backend="shelve", memory=None, shared=None, sharedLimit=None, codec=None, writebehind=None):
+        self.__memoryLimit = memory if memory is not None else memoryLimit
+        self.__writeBehind = writebehind if writebehind is not None else writeBehind
+
+        # Guards all access to the storage backend (shared with background writer)
+        self.__lock = threading.RLock()
+        self.__pending = {}
+        self.__queue = queue.Queue(writeQueueSize)
+        self.__codec = codec or compressionCodec
+
+        if not self.__codec in codecs:
+            Console.warn("Unsupported cache codec: %s. Using zlib instead.", self.__codec)
+            self.__codec = "zlib"
+
+        self.__transient = MemoryStore(self.__memoryLimit)
         self.__file = os.path.join(path, filename)
         self.__hashkeys = hashkeys
+        self.__backend = CacheBackend.create(backend, self.__file)
+
+        if shared:
+            self.__shared = SharedCache.SharedCache(shared, sharedLimit, salt=cacheFormat)
+
+        if detached:
+            self.detach()
+        else:
+            self.open()
+
+        self.__register()
+
+
+    def __register(self):
+        """Registers an opened cache for reporting and closing it on exit"""
+
+        if not self in instances:
+            instances.add(self)
+
+            # Be sure to correctly write down and close cache file on exit
+            atexit.register(self.close)
 
-        self.open()
 
-        # Be sure to correctly write down and close cache file on exit
-        atexit.register(self.close)
-        
-        
     def open(self):
         """Opens a cache file in the given path"""
-        
+
+        backend = self.__backend
+
+        if self.__writeBehind and self.__writer is None:
+            self.__writer = threading.Thread(target=self.__write, name="Cache writer: %s" % self.__file, daemon=True)
+            self.__writer.start()
+
         try:
-            self.__shelve = shelve.open(self.__file, flag="c")
-            
-            storedVersion = jasy.core.Util.getKey(self.__shelve, "jasy-version")
-            storedHost = jasy.core.Util.getKey(self.__shelve, "jasy-host")
-            
-            if storedVersion == jasy.__version__ and storedHost == hostId:
-                return
-                    
-            if storedVersion is not None or storedHost is not None:
-                Console.debug("Jasy version or host has been changed. Recreating cache...")
-            
+            backend.open()
+
+        except CacheBackend.BackendError as error:
+            Console.error(error)
+            Console.warn("Recreating cache database...")
             self.clear()
+            backend.open()
+
+        storedHost = backend.getMeta("jasy-host")
+        storedFormat = backend.getMeta("jasy-format")
+
+        if storedHost != hostId or storedFormat != cacheFormat:
+            if storedHost is not None:
+                Console.debug("Host or cache format has been changed. Recreating cache...")
+
+            self.clear()
+
+            backend.open()
+            backend.setMeta("jasy-host", hostId)
+            backend.setMeta("jasy-format", cacheFormat)
+
+        # Only drop the entries of namespaces which have changed since the last run
+        storedSchemas = backend.getMeta("jasy-schemas")
+        if storedSchemas is None and not backend.keys():
+            # Brand new caches do not contain entries of any older schema
+            outdated = set()
+        else:
+            storedSchemas = storedSchemas or {}
+            outdated = set([namespace for namespace in set(storedSchemas) | set(schemaVersions) if storedSchemas.get(namespace, 1) != schemaVersions.get(namespace, 1)])
+
+        if outdated:
+            Console.debug("Clearing outdated cache namespaces: %s", ", ".join(sorted(outdated)))
+            for key in backend.keys():
+                if getNamespace(key) in outdated:
+                    backend.delete(key)
+
+        if outdated or backend.getMeta("jasy-version") != jasy.__version__:
+            backend.setMeta("jasy-version", jasy.__version__)
+            backend.setMeta("jasy-schemas", dict(schemaVersions))
+            backend.sync()
+
+        self.__register()
+
+
+    def detach(self):
+        """
+        Switches to read-only access of the storage e.g. inside of forked worker processes. Entries
+        stored afterwards are kept in memory and collected for the main process (see takeRecords()).
+        """
+
+        if self.__records is not None:
+            return
+
+        # Locks and the background writer are not copied into forked processes
+        self.__lock = threading.RLock()
+        self.__queue = queue.Queue(writeQueueSize)
+        self.__writer = None
+
+        # The storage of the main process must not be closed by this process
+        self.__inherited = self.__backend
+
+        try:
+            backend = self.__backend.detach()
+        except CacheBackend.BackendError as error:
+            Console.debug("Using in-memory entries only: %s", error)
+            backend = CacheBackend.MemoryBackend(self.__file)
+
+        if not backend.isOpen():
+            backend.open()
+
+        self.__backend = backend
+
+        self.__records = {}
+
+
+    def takeRecords(self):
+        """Returns the entries stored since detaching (or since the last call) and resets them"""
+
+        if not self.__records:
+            return None
+
+        records = self.__records
+        self.__records = {}
+
+        return records
+
+
+    def merge(self, records):
+        """Writes the entries collected by a detached cache to the storage"""
+
+        with self.__lock:
+            for key in records:
+                timestamp, data, shared = records[key]
+                self.__pending.pop(key, None)
+                self.__backend.put(key, timestamp, data)
+
+        if self.__shared is not None:
+            for key in records:
+                timestamp, data, shared = records[key]
+                if shared:
+                    self.__shared.put(getSharedKey(key), data)
+
 
-            self.__shelve = shelve.open(self.__file, flag="n")
-            self.__shelve["jasy-version"] = jasy.__version__
-            self.__shelve["jasy-host"] = hostId
-            
-        except dbm.error as dbmerror:
-            errno = None
-            try:
-                errno = dbmerror.errno
-            except:
-                pass
-                
-            if errno is 35:
-                raise IOError("Cache file is locked by another process!")
-                
-            elif "type could not be determined" in str(dbmerror):
-                Console.error("Could not detect cache file format: %s" % self.__file)
-                Console.warn("Recreating cache database...")
-                self.clear()
-                
-            elif "module is not available" in str(dbmerror):
-                Console.error("Unsupported cache file format: %s" % self.__file)
-                Console.warn("Recreating cache database...")
-                self.clear()
-                
-            else:
-                raise dbmerror
-    
-    
     def clear(self):
         """
         Clears the cache file(s)
         """
-        
-        if self.__shelve != None:
-            Console.debug("Closing cache file %s..." % self.__file)
-            
-            self.__shelve.close()
-            self.__shelve = None
+
+        with self.__lock:
+            self.__pending.clear()
+
+            if self.__backend.isOpen():
+                Console.debug("Closing cache file %s..." % self.__file)
+                self.__backend.close()
+
+        self.__transient = MemoryStore(self.__memoryLimit)
 
         for fileName in glob.glob("%s*" % self.__file):
             Console.debug("Clearing cache file %s..." % fileName)
             os.remove(fileName)
 
-        
-    def read(self, key, timestamp=None, inMemory=True):
-        """ 
+
+    def getFileName(self):
+        """Returns the file name (without extension) of the cache"""
+
+        return self.__file
+
+
+    def getFileSize(self):
+        """Returns the size of the cache file(s) in bytes"""
+
+        size = 0
+        for fileName in glob.glob("%s*" % self.__file):
+            try:
+                size += os.stat(fileName).st_size
+            except OSError:
+                pass
+
+        return size
+
+
+    def keys(self):
+        """Returns a list of the keys of all stored entries (hashed when using hashkeys)"""
+
+        self.__flush()
+
+        with self.__lock:
+            return self.__backend.keys()
+
+
+    def getTimestamp(self, key):
+        """Returns the timestamp of the stored entry or None when not available"""
+
+        if self.__hashkeys:
+            key = hashlib.sha1(key.encode("ascii")).hexdigest()
+
+        with self.__lock:
+            if key in self.__pending:
+                return self.__pending[key][0]
+
+            if self.__records and key in self.__records:
+                return self.__records[key][0]
+
+            return self.__backend.getTimestamp(key)
+
+
+    def remove(self, key):
+        """Removes the given entry from memory and storage"""
+
+        if self.__hashkeys:
+            key = hashlib.sha1(key.encode("ascii")).hexdigest()
+
+        self.__transient.remove(key)
+
+        if self.__records is not None:
+            self.__records.pop(key, None)
+            return
+
+        with self.__lock:
+            self.__pending.pop(key, None)
+            self.__backend.delete(key)
+
+
+    def compact(self):
+        """Compacts the storage e.g. after removing entries. Returns the number of bytes reclaimed."""
+
+        self.__flush()
+
+        before = self.getFileSize()
+        with self.__lock:
+            self.__backend.compact()
+
+        return before - self.getFileSize()
+
+
+    def isShared(self):
+        """Whether a shared cache folder is used as second tier"""
+
+        return self.__shared is not None
+
+
+    def read(self, key, timestamp=None, inMemory=True, shared=False):
+        """
         Reads the given value from cache.
-        Optionally support to check wether the value was stored after the given 
+        Optionally support to check wether the value was stored after the given
         time to be valid (useful for comparing with file modification times).
+        Entries with keys based on content might be looked up in the shared cache, too.
         """
-        
+
+        counters = statistics[getNamespace(key)]
+
         if self.__hashkeys:
             key = hashlib.sha1(key.encode("ascii")).hexdigest()
 
         if key in self.__transient:
-            return self.__transient[key]
-        
-        timeKey = key + "-timestamp"
-        if key in self.__shelve and timeKey in self.__shelve:
-            if not timestamp or timestamp <= self.__shelve[timeKey]:
-                value = self.__shelve[key]
-                
-                # Useful to debug serialized size. Often a performance
-                # issue when data gets to big.
-                # rePacked = pickle.dumps(value)
-                # print("LEN: %s = %s" % (key, len(rePacked)))
-                
-                # Copy over value to in-memory cache
+            counters["hits"] += 1
+            return self.__transient.get(key)
+
+        with self.__lock:
+            record = self.__pending.get(key)
+            if record is None and self.__records is not None:
+                record = self.__records.get(key)
+            if record is None:
+                record = self.__backend.get(key)
+
+        if record is not None:
+            storedTimestamp, data = record[:2]
+            if timestamp and timestamp > storedTimestamp:
+                counters["stale"] += 1
+
+            else:
+                try:
+                    value = self.__load(data, counters)
+                except ValueError as error:
+                    # e.g. stored with a codec which is not available anymore
+                    Console.debug("Ignoring cache entry %s: %s", key, error)
+                else:
+                    counters["hits"] += 1
+
+                    # Copy over value to in-memory cache
+                    if inMemory:
+                        self.__transient.set(key, value)
+
+                    return value
+
+        if shared and self.__shared is not None:
+            data = self.__shared.get(getSharedKey(key))
+            if data is not None:
+                try:
+                    value = self.__load(data, counters)
+                except Exception as error:
+                    Console.debug("Ignoring invalid shared cache entry %s: %s", key, error)
+                    counters["misses"] += 1
+                    return None
+
+                counters["hits"] += 1
+
+                # Copy over to the local storage (not available to detached caches)
+                if self.__records is None:
+                    with self.__lock:
+                        self.__backend.put(key, time.time(), data)
                 if inMemory:
-                    self.__transient[key] = value
+                    self.__transient.set(key, value)
 
                 return value
-                
+
+        counters["misses"] += 1
         return None
-        
-    
-    def store(self, key, value, timestamp=None, transient=False, inMemory=True):
+
+
+    def __load(self, data, counters):
+        """Deserializes the given data and measures the time required"""
+
+        counters["loads"] += 1
+        counters["loadedBytes"] += len(data)
+
+        start = time.perf_counter()
+        value = pickle.loads(decode(data))
+        counters["loadTime"] += time.perf_counter() - start
+
+        return value
+
+
+    def store(self, key, value, timestamp=None, transient=False, inMemory=True, shared=False):
         """
         Stores the given value.
         Default timestamp goes to the current time. Can be modified
         to the time of an other files modification date etc.
-        Transient enables in-memory cache for the given value
+        Transient enables in-memory cache for the given value.
+        Shared copies the value to the shared cache (keys have to be based on content).
         """
-        
+
+        counters = statistics[getNamespace(key)]
+
         if self.__hashkeys:
             key = hashlib.sha1(key.encode("ascii")).hexdigest()
-        
+
         if inMemory:
-            self.__transient[key] = value
+            self.__transient.set(key, value)
 
         if transient:
             return
-        
+
         if not timestamp:
             timestamp = time.time()
-        
+
+        start = time.perf_counter()
+
         try:
-            self.__shelve[key+"-timestamp"] = timestamp
-            self.__shelve[key] = value
-        except pickle.PicklingError as err:
+            data = encode(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self.__codec)
+        except (pickle.PicklingError, TypeError, AttributeError) as err:
             Console.error("Failed to store enty: %s" % key)
+            return
+
+        counters["dumpTime"] += time.perf_counter() - start
+        counters["stores"] += 1
+        counters["storedBytes"] += len(data)
+
+        if self.__records is not None:
+            self.__records[key] = (timestamp, data, shared)
+            return
+
+        if self.__writer is not None:
+            with self.__lock:
+                self.__pending[key] = (timestamp, data, shared)
+
+            # Blocks when the queue is full
+            self.__queue.put(key)
+            return
+
+        with self.__lock:
+            self.__backend.put(key, timestamp, data)
+
+        if shared and self.__shared is not None:
+            self.__shared.put(getSharedKey(key), data)
+
+
+    def __write(self):
+        """Writes pending entries to the storage. Runs in a background thread."""
+
+        while True:
+            key = self.__queue.get()
+
+            try:
+                if key is None:
+                    return
+
+                with self.__lock:
+                    # The latest value of the key is written by the first queued request
+                    record = self.__pending.pop(key, None)
+                    if record is not None and self.__backend.isOpen():
+                        self.__backend.put(key, record[0], record[1])
+
+                if record is not None and record[2] and self.__shared is not None:
+                    self.__shared.put(getSharedKey(key), record[1])
+
+            except Exception as error:
+                Console.error("Failed to write cache entry %s: %s", key, error)
+
+            finally:
+                self.__queue.task_done()
+
+
+    def __flush(self):
+        """Waits until all pending entries are written"""
+
+        if self.__writer is not None:
+            self.__queue.join()
+
 
-        
     def sync(self):
-        """ Syncs the internal storage database """
-        
-        if self.__shelve is not None:
-            self.__shelve.sync() 
-      
-      
+        """ Syncs the internal storage database (commits pending transactions) """
+
+        self.__flush()
+
+        with self.__lock:
+            if self.__backend.isOpen():
+                self.__backend.sync()
+
+
     def close(self):
         """ Closes the internal storage database """
-        
-        if self.__shelve is not None:
-            self.__shelve.close()  
-            self.__shelve = None
 
-      
+        if self.__writer is not None:
+            self.__queue.put(None)
+            self.__writer.join()
+            self.__writer = None
+
+        with self.__lock:
+            if self.__backend.isOpen():
+                self.__backend.close()
+
+        if self.__shared is not None:
+            reclaimed = self.__shared.evict()
+            if reclaimed:
+                Console.debug("Removed %s bytes from shared cache %s", reclaimed, self.__shared.getPath())
+
+        # Closed caches are released (until opened again)
+        instances.discard(self)
+        atexit.unregister(self.close)
@@ -0,0 +1,402 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Storage backends for jasy.core.Cache.
+
+Backends store already serialized entries (bytes) together with their timestamp
+in one record. Meta data (version info etc.) is stored separately.
+"""
+
+import shelve, dbm, sqlite3, errno, pickle, os, glob, urllib.parse
+
+import jasy.core.Console as Console
+
+from jasy import UserError
+
+__all__ = ["ShelveBackend", "SqliteBackend", "MemoryBackend", "BackendError", "create"]
+
+
+# Seconds to wait for the lock of a SQLite database held by another process
+sqliteTimeout = 30
+
+# Number of writes to a SQLite database which are committed together
+sqliteBatchSize = 100
+
+
+class BackendError(Exception):
+    """Raised whenever the storage file could not be used (unknown format, etc.)"""
+    pass
+
+
+
+class ShelveBackend:
+    """
+    Backend based on the shelve feature of Python. Only one process is
+    able to open the cache file at the same time.
+    """
+
+    __shelve = None
+
+    def __init__(self, fileName):
+        self.__fileName = fileName
+
+
+    def open(self):
+        try:
+            self.__shelve = shelve.open(self.__fileName, flag="c")
+
+        except dbm.error as dbmerror:
+            code = getattr(dbmerror, "errno", None)
+            if code in (35, errno.EAGAIN):
+                raise IOError("Cache file is locked by another process!")
+
+            elif "type could not be determined" in str(dbmerror):
+                raise BackendError("Could not detect cache file format: %s" % self.__fileName)
+
+            elif "module is not available" in str(dbmerror):
+                raise BackendError("Unsupported cache file format: %s" % self.__fileName)
+
+            else:
+                raise dbmerror
+
+
+    def detach(self):
+        """
+        Returns a backend with read-only access to the same file e.g. for forked worker processes.
+        The file handle of this backend is not touched as it still belongs to the main process.
+        """
+
+        backend = ShelveBackend(self.__fileName)
+
+        try:
+            backend.__shelve = shelve.open(self.__fileName, flag="r")
+        except dbm.error as dbmerror:
+            raise BackendError("Could not open cache file %s for reading: %s" % (self.__fileName, dbmerror))
+
+        return backend
+
+
+    def isOpen(self):
+        return self.__shelve is not None
+
+
+    def close(self):
+        if self.__shelve is not None:
+            self.__shelve.close()
+            self.__shelve = None
+
+
+    def sync(self):
+        if self.__shelve is not None:
+            self.__shelve.sync()
+
+
+    def getMeta(self, name):
+        return self.__shelve.get(name)
+
+
+    def setMeta(self, name, value):
+        self.__shelve[name] = value
+
+
+    def get(self, key):
+        """Returns a tuple of timestamp and data or None when not available"""
+
+        return self.__shelve.get("entry:%s" % key)
+
+
+    def put(self, key, timestamp, data):
+        self.__shelve["entry:%s" % key] = (timestamp, data)
+
+
+    def getTimestamp(self, key):
+        record = self.__shelve.get("entry:%s" % key)
+        if record is None:
+            return None
+
+        return record[0]
+
+
+    def delete(self, key):
+        try:
+            del self.__shelve["entry:%s" % key]
+        except KeyError:
+            pass
+
+
+    def keys(self):
+        """Returns a list of the keys of all entries"""
+
+        return [key[6:] for key in self.__shelve.keys() if key.startswith("entry:")]
+
+
+    def compact(self):
+        """Rewrites the database file(s) to release the space of removed entries"""
+
+        database = self.__shelve.dict
+
+        # Supported by GNU dbm only
+        if hasattr(database, "reorganize"):
+            self.__shelve.sync()
+            database.reorganize()
+            return
+
+        # Copy raw records into a new database and replace the existing file(s) with it
+        tempName = "%s-compact" % self.__fileName
+        target = dbm.open(tempName, "n")
+        for key in database.keys():
+            target[key] = database[key]
+
+        target.close()
+        self.close()
+
+        for fileName in glob.glob("%s*" % self.__fileName):
+            if not fileName.startswith(tempName):
+                os.remove(fileName)
+
+        for fileName in glob.glob("%s*" % tempName):
+            os.rename(fileName, self.__fileName + fileName[len(tempName):])
+
+        self.open()
+
+
+
+class SqliteBackend:
+    """
+    Transactional backend based on a single SQLite database file. Uses write-ahead
+    logging so that other processes are able to read while this process is writing.
+    Writes are committed in batches of sqliteBatchSize (and on sync() or close()), so the
+    write lock is only held shortly. When the lock could not be acquired in time, further
+    writes are skipped until the next sync() as the cache is just an optimization.
+    """
+
+    __connection = None
+    __uncommitted = 0
+    __failed = False
+
+    def __init__(self, fileName):
+        self.__fileName = "%s.sqlite" % fileName
+
+
+    def open(self):
+        try:
+            connection = sqlite3.connect(self.__fileName, timeout=sqliteTimeout, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, timestamp REAL, data BLOB)")
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value BLOB)")
+            connection.commit()
+
+        except sqlite3.OperationalError as error:
+            if "locked" in str(error):
+                raise IOError("Cache file is locked by another process!")
+
+            raise BackendError("Could not open cache database %s: %s" % (self.__fileName, error))
+
+        except sqlite3.DatabaseError as error:
+            raise BackendError("Could not detect cache file format: %s (%s)" % (self.__fileName, error))
+
+        self.__connection = connection
+
+
+    def detach(self):
+        """
+        Returns a backend with read-only access to the same database e.g. for forked worker processes.
+        Connections must not be shared between processes, so a new one is opened.
+        """
+
+        backend = SqliteBackend(self.__fileName[:-len(".sqlite")])
+
+        try:
+            uri = "file:%s?mode=ro" % urllib.parse.quote(os.path.abspath(self.__fileName))
+            backend.__connection = sqlite3.connect(uri, uri=True, timeout=sqliteTimeout, check_same_thread=False)
+        except sqlite3.Error as error:
+            raise BackendError("Could not open cache database %s for reading: %s" % (self.__fileName, error))
+
+        return backend
+
+
+    def isOpen(self):
+        return self.__connection is not None
+
+
+    def close(self):
+        if self.__connection is not None:
+            self.__connection.commit()
+            self.__connection.close()
+            self.__connection = None
+            self.__uncommitted = 0
+            self.__failed = False
+
+
+    def sync(self):
+        if self.__connection is not None:
+            self.__connection.commit()
+            self.__uncommitted = 0
+            self.__failed = False
+
+
+    def getMeta(self, name):
+        row = self.__connection.execute("SELECT value FROM meta WHERE name=?", (name,)).fetchone()
+        if row is None:
+            return None
+
+        return pickle.loads(row[0])
+
+
+    def setMeta(self, name, value):
+        self.__connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, pickle.dumps(value)))
+
+
+    def get(self, key):
+        """Returns a tuple of timestamp and data or None when not available"""
+
+        return self.__connection.execute("SELECT timestamp, data FROM entries WHERE key=?", (key,)).fetchone()
+
+
+    def put(self, key, timestamp, data):
+        self.__write("INSERT OR REPLACE INTO entries (key, timestamp, data) VALUES (?, ?, ?)", (key, timestamp, data))
+
+
+    def getTimestamp(self, key):
+        row = self.__connection.execute("SELECT timestamp FROM entries WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        return row[0]
+
+
+    def delete(self, key):
+        self.__write("DELETE FROM entries WHERE key=?", (key,))
+
+
+    def __write(self, statement, params):
+        """Executes the given modifying statement and commits when the batch is full"""
+
+        # Each write would wait for the lock again
+        if self.__failed:
+            return
+
+        try:
+            self.__connection.execute(statement, params)
+        except sqlite3.OperationalError as error:
+            # Database is locked by another writer for too long. Don't break the build.
+            Console.warn("Skipping writes to cache database %s until next sync: %s", self.__fileName, error)
+            self.__failed = True
+            return
+
+        self.__uncommitted += 1
+        if self.__uncommitted >= sqliteBatchSize:
+            self.__connection.commit()
+            self.__uncommitted = 0
+
+
+    def keys(self):
+        """Returns a list of the keys of all entries"""
+
+        return [row[0] for row in self.__connection.execute("SELECT key FROM entries")]
+
+
+    def compact(self):
+        """Rebuilds the database file to release the space of removed entries"""
+
+        self.__connection.commit()
+        self.__connection.execute("VACUUM")
+        self.__connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+
+class MemoryBackend:
+    """
+    Backend which keeps all entries in memory only e.g. for short living worker processes.
+    Entries are dropped when closing the backend.
+    """
+
+    __entries = None
+
+    def __init__(self, fileName):
+        pass
+
+
+    def open(self):
+        if self.__entries is None:
+            self.__entries = {}
+            self.__meta = {}
+
+
+    def detach(self):
+        """Entries are kept in the memory of each process (copied when forking) so they can be used directly"""
+
+        return self
+
+
+    def isOpen(self):
+        return self.__entries is not None
+
+
+    def close(self):
+        self.__entries = None
+        self.__meta = None
+
+
+    def sync(self):
+        pass
+
+
+    def getMeta(self, name):
+        return self.__meta.get(name)
+
+
+    def setMeta(self, name, value):
+        self.__meta[name] = value
+
+
+    def get(self, key):
+        """Returns a tuple of timestamp and data or None when not available"""
+
+        return self.__entries.get(key)
+
+
+    def put(self, key, timestamp, data):
+        self.__entries[key] = (timestamp, data)
+
+
+    def getTimestamp(self, key):
+        record = self.__entries.get(key)
+        if record is None:
+            return None
+
+        return record[0]
+
+
+    def delete(self, key):
+        self.__entries.pop(key, None)
+
+
+    def keys(self):
+        """Returns a list of the keys of all entries"""
+
+        return list(self.__entries)
+
+
+    def compact(self):
+        pass
+
+
+
+backends = {
+    "shelve" : ShelveBackend,
+    "sqlite" : SqliteBackend,
+    "memory" : MemoryBackend
+}
+
+def create(name, fileName):
+    """Creates a backend instance of the given type for the given file name (without extension)"""
+
+    if not name in backends:
+        raise UserError("Unsupported cache backend: %s" % name)
+
+    return backends[name](fileName)
@@ -64,6 +64,12 @@ optionals = [
         "minVersion": "2.0.0",
         "installPath": "'pip3 install git+https://github.com/python-imaging/Pillow.git'",
         "updatePath": ""
+    },
+    {
+        "packageName": "lz4",
+        "minVersion": "1.0",
+        "installPath": "'pip3 install lz4'",
+        "updatePath": ""
     }
 ]
 
@@ -80,6 +80,7 @@ class FileManager:
         if not os.path.isfile(src):
             raise Exception("No such file: %s" % src)
 
+        fileName = dst
         dst = self.__session.expandFileName(dst)
 
         # First test for existance of destination directory
@@ -90,6 +91,8 @@ class FileManager:
             shutil.copy2(src, dst)
         except IOError as ex:
             Console.error("Could not write file %s: %s" % (dst, ex))
+        else:
+            self.__copyEquivalents(fileName, dst)
             
         return True
 
@@ -119,8 +122,12 @@ class FileManager:
 
 
     def writeFile(self, dst, content):
-        """Writes the content to the destination file name"""
+        """
+        Writes the content to the destination file name. The content might be a string or
+        an iterable of strings (e.g. a generator) which are written one after another.
+        """
         
+        fileName = dst
         dst = self.__session.expandFileName(dst)
         
         # First test for existance of destination directory
@@ -128,6 +135,28 @@ class FileManager:
         
         # Open file handle and write
         handle = open(dst, mode="w", encoding="utf-8")
-        handle.write(content)
+        try:
+            if isinstance(content, str):
+                handle.write(content)
+            else:
+                for chunk in content:
+                    handle.write(chunk)
+
+        except:
+            # Do not leave incomplete files behind
+            handle.close()
+            os.remove(dst)
+            raise
+
         handle.close()
+        self.__copyEquivalents(fileName, dst)
+
+
+    def __copyEquivalents(self, fileName, dst):
+        """Copies the written file dst to the file names of all permutations sharing the output of the current one"""
 
+        for permutation in self.__session.getEquivalentPermutations():
+            equivalent = self.__session.expandFileName(fileName, permutation)
+            if equivalent != dst:
+                self.makeDir(os.path.dirname(equivalent))
+                shutil.copyfile(dst, equivalent)
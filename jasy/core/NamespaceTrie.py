@@ -0,0 +1,133 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Index of dotted names (e.g. class names) organized by their namespace segments.
+
+Answers wildcard queries (like "#require(foo.util.*)") by only looking at the names below
+the literal part of the pattern and finds known names which are prefixes of a given
+name (like the class being accessed by "foo.util.Helper.create") in the time of the
+length of the name.
+"""
+
+import re, fnmatch
+
+__all__ = ["NamespaceTrie"]
+
+
+# Characters with a special meaning in wildcard patterns (see fnmatch)
+wildcardExpr = re.compile(r"[\*\?\[]")
+
+
+class NamespaceTrie():
+
+    def __init__(self, names=None):
+
+        # Nested dictionaries of segments. The full name is stored under the key None.
+        self.__root = {}
+        self.__size = 0
+
+        # Results of wildcard queries
+        self.__matches = {}
+
+        if names:
+            for name in names:
+                self.add(name)
+
+
+    def __len__(self):
+        return self.__size
+
+
+    def __contains__(self, name):
+        node = self.__root
+        for segment in name.split("."):
+            node = node.get(segment)
+            if node is None:
+                return False
+
+        return None in node
+
+
+    def add(self, name):
+        """Adds the given name to the index"""
+
+        node = self.__root
+        for segment in name.split("."):
+            child = node.get(segment)
+            if child is None:
+                child = node[segment] = {}
+
+            node = child
+
+        if not None in node:
+            node[None] = name
+            self.__size += 1
+            self.__matches = {}
+
+
+    def getPrefixes(self, name):
+        """Returns all known names which are equal to the given one or one of its parent namespaces. Longest first."""
+
+        result = []
+        node = self.__root
+        for segment in name.split("."):
+            node = node.get(segment)
+            if node is None:
+                break
+
+            if None in node:
+                result.append(node[None])
+
+        result.reverse()
+        return result
+
+
+    def match(self, pattern):
+        """Returns all names matching the given wildcard pattern (same syntax as fnmatch)"""
+
+        result = self.__matches.get(pattern)
+        if result is not None:
+            return result
+
+        # Names matching the pattern need to start with its segments up to the first wildcard
+        node = self.__root
+        literal = True
+        for segment in pattern.split("."):
+            if wildcardExpr.search(segment):
+                literal = False
+                break
+
+            node = node.get(segment)
+            if node is None:
+                break
+
+        if node is None:
+            result = []
+        elif literal:
+            result = [node[None]] if None in node else []
+        else:
+            expr = re.compile(fnmatch.translate(pattern))
+            result = [name for name in self.__collect(node) if expr.match(name)]
+
+        self.__matches[pattern] = result
+        return result
+
+
+    def __collect(self, node):
+        """Returns all names stored in the given node and its children"""
+
+        result = []
+        pending = [node]
+
+        while pending:
+            node = pending.pop()
+            for segment, child in node.items():
+                if segment is None:
+                    result.append(child)
+                else:
+                    pending.append(child)
+
+        return result
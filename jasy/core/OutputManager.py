@@ -7,6 +7,7 @@
 import os
 
 import jasy.core.Console as Console
+import jasy.core.Worker as Worker
 
 from jasy.core.Permutation import getPermutation
 from jasy.item.Class import ClassError, ClassItem
@@ -134,23 +135,60 @@ class OutputManager:
         return sortedClasses
 
 
-    def __compressClasses(self, classes):
+    def __compressClassesParallel(self, classes, permutation, translation):
+        """Fills the cache with the compressed code of all given classes using the worker processes"""
+
+        missing = [classObj for classObj in classes if not classObj.hasCompressed(permutation, translation, self.__scriptOptimization, self.__scriptFormatting)]
+        if len(missing) < 2:
+            return
+
+        jobs = Worker.getJobs()
+        Console.info("Compressing %s classes using %s processes...", len(missing), jobs)
+
+        # Use more chunks than processes to balance differently sized classes
+        chunkCount = min(len(missing), jobs * 4)
+        chunks = [[(classObj.getId(), classObj.getText()) for classObj in missing[pos::chunkCount]] for pos in range(chunkCount)]
+
+        pool = Worker.getPool()
+        results = [pool.apply_async(Worker.compressClasses, (chunk, permutation, translation, self.__scriptOptimization, self.__scriptFormatting)) for chunk in chunks]
+
+        lookup = dict([(classObj.getId(), classObj) for classObj in missing])
+        for result in results:
+            for classId, entries in result.get().items():
+                classObj = lookup.get(classId)
+                if classObj is None:
+                    continue
+
+                for field, value in entries.items():
+                    classObj.storeCache(field, value)
+
+
+    def __iterCompressedClasses(self, classes):
+        """Yields the compressed code of the given classes one by one (e.g. for writing it to disk without joining it first)"""
+
         try:
             session = self.__session
-            result = []
+            permutation = session.getCurrentPermutation()
+            translation = session.getCurrentTranslationBundle()
+
+            if Worker.getJobs() > 1:
+                self.__compressClassesParallel(classes, permutation, translation)
 
+            # Serial pass keeps the order of the output and only reads from the cache when running in parallel before
             for classObj in classes:
-                compressed = classObj.getCompressed(session.getCurrentPermutation(), session.getCurrentTranslationBundle(), self.__scriptOptimization, self.__scriptFormatting)
+                compressed = classObj.getCompressed(permutation, translation, self.__scriptOptimization, self.__scriptFormatting)
 
                 if self.__addDividers:
-                    result.append("// FILE ID: %s\n%s\n\n" % (classObj.getId(), compressed))
+                    yield "// FILE ID: %s\n%s\n\n" % (classObj.getId(), compressed)
                 else:
-                    result.append(compressed)
+                    yield compressed
                 
         except ClassError as error:
             raise UserError("Error during class compression! %s" % error)
 
-        return "".join(result)
+
+    def __compressClasses(self, classes):
+        return "".join(self.__iterCompressedClasses(classes))
 
 
 
@@ -249,9 +287,9 @@ class OutputManager:
         sortedClasses = self.__buildClassList(classes, bootCode, inlineTranslations=True)
         
         Console.info("Compressing %s classes...", len(sortedClasses))
-        compressedCode = self.__compressClasses(sortedClasses)
+        compressedCode = self.__iterCompressedClasses(sortedClasses)
 
-        # Write file to disk
+        # Write file to disk (class by class)
         self.__fileManager.writeFile(fileName, compressedCode)
 
         # Remember kernel level classes
@@ -288,9 +326,9 @@ class OutputManager:
             
         # Compress code
         Console.info("Including %s classes...", len(sortedClasses))
-        compressedCode = self.__compressClasses(sortedClasses)
+        compressedCode = self.__iterCompressedClasses(sortedClasses)
 
-        # Write file to disk
+        # Write file to disk (class by class)
         self.__fileManager.writeFile(fileName, compressedCode)
 
         Console.outdent()        
@@ -6,24 +6,38 @@
 import jasy
 import jasy.core.Util as Util
 
-__all__ = ["Permutation", "getPermutation"]
+__all__ = ["Permutation", "getPermutation", "internFields"]
 
 
-"""Central cache for all permutations"""
+"""Central cache for all permutations (keyed by the sorted items of their combination, see getPermutation())"""
 registry = {}
 
+"""Central cache for all sets of field names (see internFields())"""
+fieldSets = {}
+
 def getPermutation(combination):
     """
     Small wrapper to omit double creation of identical permutations in filter() method 
     As these instances don't have any reference to session etc. they are actually cacheable globally.
     """
     
-    key = str(combination)
-    if key in registry:
-        return registry[key]
-        
-    registry[key] = Permutation(combination)
-    return registry[key]
+    # Types are part of the key as e.g. True and 1 are equal in Python but different in JavaScript
+    key = tuple(sorted([(name, type(value), value) for name, value in combination.items()], key=lambda entry: entry[0]))
+    permutation = registry.get(key)
+    if permutation is None:
+        permutation = registry[key] = Permutation(combination)
+
+    return permutation
+
+
+def internFields(fields):
+    """
+    Returns a shared frozenset with the given field names. Equal sets of fields (e.g. of different
+    classes) are represented by the same object which makes them fast to look up in filter().
+    """
+
+    fields = frozenset(fields)
+    return fieldSets.setdefault(fields, fields)
 
 
 class Permutation:
@@ -33,7 +47,10 @@ class Permutation:
         
         self.__combination = combination
         self.__key = self.__buildKey(combination)
-        self.__checksum = Util.generateChecksum(self.__key)
+        self.__checksum = None
+
+        # Results of filter() by set of fields
+        self.__filtered = {}
         
         
     def __buildKey(self, combination):
@@ -78,21 +95,45 @@ class Permutation:
         
     def getChecksum(self):
         """Returns the computed (SHA1) checksum based on the key of this permutation"""
+
+        if self.__checksum is None:
+            self.__checksum = Util.generateChecksum(self.__key)
+
         return self.__checksum
         
         
     def filter(self, available):
-        """Returns a variant of that permutation which only holds values for the available keys."""
-        
+        """
+        Returns a variant of that permutation which only holds values for the available keys.
+        Results are remembered per set of keys (ideally interned via internFields()).
+        """
+
+        if type(available) is not frozenset:
+            available = frozenset(available)
+
+        try:
+            return self.__filtered[available]
+        except KeyError:
+            pass
+
         filtered = {}
         for key in self.__combination:
             if key in available:
                 filtered[key] = self.__combination[key]
         
-        if not filtered:
-            return None
-            
-        return getPermutation(filtered)
+        if filtered:
+            result = getPermutation(filtered)
+        else:
+            result = None
+
+        self.__filtered[available] = result
+        return result
+
+
+    def __reduce__(self):
+        """Unpickled permutations (e.g. in worker processes) are taken from the registry as well"""
+
+        return (getPermutation, (self.__combination,))
 
 
     # Map Python built-ins
@@ -33,6 +33,20 @@ translationExtensions = (".po", ".xlf", ".properties", ".txt")
 docFiles = ("package.md", "readme.md")
 repositoryFolder = re.compile(r"^([a-zA-Z0-9\.\ _-]+)-([a-f0-9]{40})$")
 
+# Kinds of items which store entries in each cache namespace (see collectGarbage())
+itemNamespaces = {
+    "tree" : ("classes", "styles"),
+    "tree-data" : ("classes",),
+    "opt-tree" : ("classes", "styles"),
+    "facts" : ("classes",),
+    "fields" : ("styles",),
+    "api" : ("classes", "docs"),
+    "highlighted" : ("classes",),
+    "compressed" : ("classes", "styles"),
+    "size" : ("classes", "styles"),
+    "deps" : ("classes",)
+}
+
 
 projects = {}
 
@@ -150,9 +164,32 @@ class Project():
         # Initialize cache
         try:
             File.mkdir(os.path.join(self.__path, ".jasy"))
-            self.__cache = jasy.core.Cache.Cache(self.__path, filename=".jasy/cache")
+            memory = self.__config.get("cache.memory")
+            if memory is not None:
+                memory = int(memory) * 1024 * 1024
+
+            shared = self.__config.get("cache.shared", jasy.core.Cache.sharedPath)
+            if shared is not None:
+                shared = os.path.join(self.__path, os.path.expanduser(shared))
+
+            # Configured in MB, the global default is already in bytes
+            sharedLimit = self.__config.get("cache.sharedSize")
+            if sharedLimit is not None:
+                sharedLimit = int(sharedLimit) * 1024 * 1024
+            else:
+                sharedLimit = jasy.core.Cache.sharedLimit
+
+            self.__cache = jasy.core.Cache.Cache(self.__path, filename=".jasy/cache", backend=self.__config.get("cache.backend", "shelve"), memory=memory, shared=shared, sharedLimit=sharedLimit, codec=self.__config.get("cache.codec"), writebehind=self.__config.get("cache.writeBehind"))
         except IOError as err:
             raise UserError("Could not initialize project. Cache file in %s could not be initialized! %s" % (self.__path, err))
+
+        # How to validate cache entries of items: "mtime" (modification time) or "content" (checksum).
+        # Entries of the shared cache are only valid when keyed by content.
+        self.__cacheValidation = self.__config.get("cache.validation", "content" if shared else "mtime")
+        if not self.__cacheValidation in ("mtime", "content"):
+            raise UserError("Unsupported cache validation in project %s: %s" % (self.__path, self.__cacheValidation))
+        elif shared and self.__cacheValidation != "content":
+            raise UserError("Shared cache requires content validation in project %s!" % self.__path)
         
         # Detect version changes
         if version is None:
@@ -562,6 +599,11 @@ class Project():
         """Returns the cache instance"""
         
         return self.__cache
+
+    def getCacheValidation(self):
+        """Returns how cache entries of the items are validated: either "mtime" or "content" """
+
+        return self.__cacheValidation
     
     def clean(self):
         """Clears the cache of the project"""
@@ -596,6 +638,103 @@ class Project():
         return self.__cache is not None
 
 
+    def collectGarbage(self, permutations=None):
+        """
+        Removes cache entries of items which do not exist anymore, entries which are outdated
+        and (when a list of permutations is given) entries of other permutations. Compacts the
+        cache file afterwards. Returns the number of bytes reclaimed.
+        """
+
+        # Items of the same ID but different type do not share any entries
+        collections = {
+            "classes" : self.getClasses(),
+            "styles" : self.getStyles(),
+            "docs" : self.getDocs()
+        }
+
+        items = {}
+        for namespace in itemNamespaces:
+            items[namespace] = [collections[name] for name in itemNamespaces[namespace]]
+
+        items[None] = list(collections.values())
+
+        # Permutations are filtered by the fields used by each item
+        if permutations is not None:
+            permutations = list(permutations) + [jasy.item.Class.defaultPermutation]
+
+        cache = self.__cache
+        removed = 0
+
+        for key in cache.keys():
+            if not self.__isValidEntry(key, items, permutations):
+                cache.remove(key)
+                removed += 1
+
+        cache.sync()
+        reclaimed = cache.compact()
+
+        Console.info("Removed %s entries from cache of %s (%s KB reclaimed)", removed, self.__name, reclaimed // 1024)
+        return reclaimed
+
+
+    def __isValidEntry(self, key, items, permutations):
+        """Whether the given cache entry is still in use by one of the items of the project"""
+
+        namespace = jasy.core.Cache.getNamespace(key)
+        end = key.find("]")
+
+        # Entries not related to any item
+        if namespace == "project" or end == -1:
+            return True
+
+        itemId = key[len(namespace)+1:end]
+        for collection in items.get(namespace, items[None]):
+            item = collection.get(itemId)
+            if item is not None and self.__isValidItemEntry(key, namespace, key[end+1:], item, permutations):
+                return True
+
+        return False
+
+
+    def __isValidItemEntry(self, key, namespace, params, item, permutations):
+        """Whether the given cache entry with the given parameters is still in use by the given item"""
+
+        if namespace == "fingerprint":
+            return True
+
+        # Entries are keyed by fingerprint or validated by modification time
+        if "@" in params:
+            params, fingerprint = params.rsplit("@", 1)
+            if self.__cacheValidation != "content" or fingerprint != item.getFingerprint():
+                return False
+
+        elif self.__cacheValidation == "content":
+            return False
+
+        elif self.__cache.getTimestamp(key) < item.mtime:
+            return False
+
+        # Facts of the item itself are used by all permutations
+        if namespace == "facts" and params == "":
+            return True
+
+        # Entries of permutations start with the filtered permutation e.g. "opt-tree[foo.Main]-debug:true".
+        # Dependencies are keyed by the permutation only (see DependencyGraph).
+        if permutations is not None and namespace in ("opt-tree", "compressed", "facts", "deps"):
+            filtered = set([str(item.filterPermutation(permutation)) for permutation in permutations])
+            filtered.add("None")
+
+            for permutation in filtered:
+                if params == "-%s" % permutation:
+                    return True
+                elif namespace != "deps" and params.startswith("-%s-" % permutation):
+                    return True
+
+            return False
+
+        return True
+
+
 
     #
     # LIST ACCESSORS
@@ -11,10 +11,14 @@ import jasy.core.Config
 import jasy.core.Project
 import jasy.core.Permutation
 import jasy.core.Util as Util
+import jasy.core.Worker
+
+from jasy.core.NamespaceTrie import NamespaceTrie
 
 import jasy.asset.Manager
 import jasy.item.Translation
 import jasy.item.Class
+import jasy.js.Resolver
 
 from jasy import UserError
 import jasy.core.Console as Console
@@ -27,6 +31,7 @@ class Session():
     """
 
     __currentPermutation = None
+    __currentEquivalents = ()
     __currentTranslationBundle = None
     __currentPrefix = None
     
@@ -38,6 +43,9 @@ class Session():
     __updateRepositories = True
     __scriptEnvironment = None
     __virtualProject = None
+    __classes = None
+    __styles = None
+    __classIndexes = None
 
 
     #
@@ -55,6 +63,7 @@ class Session():
         self.__projects = []
         self.__fields = {}
         self.__translationBundles = {}
+        self.__classIndexes = {}
         
 
     def init(self, autoInitialize=True, updateRepositories=True, scriptEnvironment=None):
@@ -119,10 +128,22 @@ class Session():
             project.close()
         
         self.__projects = None
+        self.__resetIndexes()
 
         Console.outdent()
     
     
+    def sync(self):
+        """Writes down pending cache changes of all projects e.g. at the end of a task."""
+
+        if not self.__projects:
+            return
+
+        for project in self.__projects:
+            if project.isReady():
+                project.getCache().sync()
+
+
     def pause(self):
         """
         Pauses the session. This release cache files etc. and makes 
@@ -153,12 +174,16 @@ class Session():
         :type className: str
         """
 
-        for project in self.__projects:
-            classes = project.getClasses()
-            if className in classes:
-                return classes[className]
+        if self.__classes is None:
+            classes = {}
 
-        return None
+            # Projects added first have the highest priority
+            for project in reversed(self.__projects):
+                classes.update(project.getClasses())
+
+            self.__classes = classes
+
+        return self.__classes.get(className)
 
 
     def getStyleByName(self, styleName):
@@ -170,12 +195,45 @@ class Session():
         :type styleName: str
         """
 
-        for project in self.__projects:
-            styles = project.getStyles()
-            if styleName in styles:
-                return styles[styleName]
+        if self.__styles is None:
+            styles = {}
+
+            # Projects added first have the highest priority
+            for project in reversed(self.__projects):
+                styles.update(project.getStyles())
+
+            self.__styles = styles
+
+        return self.__styles.get(styleName)
+
+
+    def getClassIndex(self):
+        """
+        Returns the namespace index (see NamespaceTrie) of the names of all classes of the
+        currently registered projects including the project of the current locale. Used
+        for resolving wildcard requires and package access in dependencies.
+        """
 
-        return None        
+        localeProject = self.getCurrentLocaleProject()
+
+        index = self.__classIndexes.get(localeProject)
+        if index is None:
+            index = NamespaceTrie()
+            for project in self.getProjects():
+                for className in project.getClasses():
+                    index.add(className)
+
+            self.__classIndexes[localeProject] = index
+
+        return index
+
+
+    def __resetIndexes(self):
+        """Clears the merged indexes of classes and styles e.g. after the list of projects was modified"""
+
+        self.__classes = None
+        self.__styles = None
+        self.__classIndexes = {}
 
 
     
@@ -223,6 +281,7 @@ class Session():
                     
                 self.__fields[name] = entry
 
+        self.__resetIndexes()
 
 
     def loadLibrary(self, objectName, fileName, encoding="utf-8", doc=None):
@@ -326,6 +385,7 @@ class Session():
         project = jasy.core.Project.getProjectFromPath(path)
         self.__virtualProject = project
         self.__projects.append(project)
+        self.__resetIndexes()
 
         return project
 
@@ -679,7 +739,7 @@ class Session():
     # State Handling / Looping
     #
 
-    def __generatePermutations(self):
+    def getPermutations(self):
         """
         Combines all values to a set of permutations.
         These define all possible combinations of the configured settings
@@ -701,37 +761,165 @@ class Session():
         return permutations
 
 
-    def permutate(self):
-        """ Generator method for permutations for improving output capabilities """
+    def permutate(self, classes=None):
+        """
+        Generator method for permutations for improving output capabilities.
+
+        When the output of the loop only depends on the given classes, permutations producing the
+        same output are only processed once (see groupPermutations()). Files written during the
+        iteration are copied to the file names of the equivalent permutations (see getEquivalentPermutations()).
+        For processing permutations in parallel use runPermutations() instead.
+        """
         
         Console.info("Processing permutations...")
         Console.indent()
         
-        permutations = self.__generatePermutations()
-        length = len(permutations)
+        permutations = self.getPermutations()
+
+        if classes is None:
+            groups = [[current] for current in permutations]
+        else:
+            groups = self.groupPermutations(classes, permutations)
+
+        length = len(groups)
         
-        for pos, current in enumerate(permutations):
+        for pos, group in enumerate(groups):
             Console.info("Permutation %s/%s:" % (pos+1, length))
             Console.indent()
 
-            self.__currentPermutation = current
+            self.__currentPermutation = group[0]
+            self.__currentEquivalents = group[1:]
             self.__currentTranslationBundle = self.__generateTranslationBundle()
             
-            yield current
+            yield group[0]
             Console.outdent()
 
         Console.outdent()
 
         self.__currentPermutation = None
+        self.__currentEquivalents = ()
         self.__currentTranslationBundle = None
 
 
+    def groupPermutations(self, classes, permutations=None):
+        """
+        Groups the given permutations (defaults to all permutations) by the output they produce for
+        the given classes (including their dependencies). Permutations are equivalent when they include
+        the same classes and these classes see the same values of the fields they actually access (see
+        ClassItem.filterPermutation()). The locale is only relevant when translations are used.
+        Returns a list of groups (lists of permutations) in the order of the permutations.
+        """
+
+        if permutations is None:
+            permutations = self.getPermutations()
+
+        groups = {}
+        result = []
+
+        for permutation in permutations:
+            self.__currentPermutation = permutation
+
+            try:
+                resolver = jasy.js.Resolver.Resolver(self)
+                for classItem in classes:
+                    resolver.addClass(classItem)
+
+                included = resolver.getIncludedClasses()
+
+            finally:
+                self.__currentPermutation = None
+
+            locale = None
+            entries = []
+
+            for classItem in included:
+                entries.append((classItem.getId(), str(classItem.filterPermutation(permutation))))
+                if classItem.getTranslations():
+                    locale = permutation.get("locale")
+
+            key = (locale, tuple(sorted(entries)))
+            if key in groups:
+                groups[key].append(permutation)
+            else:
+                groups[key] = [permutation]
+                result.append(groups[key])
+
+        if len(result) < len(permutations):
+            Console.info("Reduced %s permutations to %s distinct outputs", len(permutations), len(result))
+
+        return result
+
+
+    def runPermutations(self, callback, classes=None):
+        """
+        Calls the given callback with each permutation (being the current permutation during the call).
+        Permutations are processed in parallel by forked worker processes when multiple jobs are
+        configured (see jasy.core.Worker.setJobs()). Log messages are grouped per permutation.
+        Returns the (picklable) results of the callback in the order of the permutations.
+
+        When the output of the callback only depends on the given classes, permutations producing
+        the same output are only processed once (see groupPermutations()). Files written during the
+        call are copied to the file names of the equivalent permutations (see getEquivalentPermutations()).
+        """
+
+        Console.info("Processing permutations...")
+        Console.indent()
+
+        permutations = self.getPermutations()
+
+        if classes is None:
+            groups = [[current] for current in permutations]
+        else:
+            groups = self.groupPermutations(classes, permutations)
+
+        length = len(groups)
+
+        def process(entry):
+            pos, group = entry
+
+            Console.info("Permutation %s/%s:" % (pos+1, length))
+            Console.indent()
+
+            self.__currentPermutation = group[0]
+            self.__currentEquivalents = group[1:]
+            self.__currentTranslationBundle = self.__generateTranslationBundle()
+
+            try:
+                return callback(group[0])
+
+            finally:
+                Console.outdent()
+                self.__currentPermutation = None
+                self.__currentEquivalents = ()
+                self.__currentTranslationBundle = None
+
+        try:
+            results = jasy.core.Worker.runInWorkers(process, enumerate(groups), [project.getCache() for project in self.__projects])
+
+        finally:
+            Console.outdent()
+
+        # Equivalent permutations share the result of the processed one
+        lookup = {}
+        for group, result in zip(groups, results):
+            for current in group:
+                lookup[current] = result
+
+        return [lookup[current] for current in permutations]
+
+
     def getCurrentPermutation(self):
         """Returns current permutation object (useful during looping through permutations via permutate())."""
 
         return self.__currentPermutation
 
 
+    def getEquivalentPermutations(self):
+        """Returns the permutations which share the output of the current permutation (see permutate() and runPermutations())."""
+
+        return self.__currentEquivalents
+
+
     def resetCurrentPermutation(self):
         """Resets the current permutation object."""
 
@@ -820,10 +1008,10 @@ class Session():
         return self.__currentPrefix
 
 
-    def expandFileName(self, fileName):
+    def expandFileName(self, fileName, permutation=None):
         """
         Replaces placeholders inside the given filename and returns the result. 
-        The placeholders are based on the current state of the session.
+        The placeholders are based on the current state of the session or the given permutation.
 
         These are the currently supported placeholders:
 
@@ -836,17 +1024,20 @@ class Session():
         if self.__currentPrefix:
             fileName = fileName.replace("{{prefix}}", self.__currentPrefix)
 
-        if self.__currentPermutation:
+        if permutation is None:
+            permutation = self.__currentPermutation
+
+        if permutation:
             if "{{permutation}}" in fileName:
-                fileName = fileName.replace("{{permutation}}", self.__currentPermutation.getChecksum())
+                fileName = fileName.replace("{{permutation}}", permutation.getChecksum())
 
             if "{{id}}" in fileName:
-                buildId = "%s@%s" % (self.__currentPermutation.getKey(), self.getMain().getRevision())
+                buildId = "%s@%s" % (permutation.getKey(), self.getMain().getRevision())
                 buildHash = Util.generateChecksum(buildId)
                 fileName = fileName.replace("{{id}}", buildHash)            
 
             if "{{locale}}" in fileName:
-                locale = self.__currentPermutation.get("locale")
+                locale = permutation.get("locale")
                 fileName = fileName.replace("{{locale}}", locale)
 
         elif "{{id}}" in fileName:
@@ -0,0 +1,141 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Content addressed cache folder which might be shared by multiple projects,
+machines or build agents (e.g. on a network drive).
+
+Entries are stored in one file each. Files are written atomically so that
+concurrent readers never see partial data. The size of the folder is limited
+by an eviction pass which removes the least recently used entries first.
+"""
+
+import os, hashlib, tempfile
+
+import jasy
+import jasy.core.Console as Console
+
+__all__ = ["SharedCache"]
+
+
+class SharedCache:
+
+    def __init__(self, path, limit=None, salt=""):
+        self.__path = os.path.abspath(os.path.expanduser(path))
+        self.__limit = limit
+        self.__salt = "%s:%s" % (jasy.__version__, salt)
+        self.__written = 0
+        self.__failed = False
+
+        os.makedirs(self.__path, exist_ok=True)
+
+
+    def getPath(self):
+        return self.__path
+
+
+    def __getFile(self, key):
+        """Returns the file name of the given key. Keys are salted with the version of Jasy."""
+
+        digest = hashlib.sha1(("%s:%s" % (self.__salt, key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.__path, digest[:2], digest[2:])
+
+
+    def get(self, key):
+        """Returns the data stored for the given key or None when not available"""
+
+        fileName = self.__getFile(key)
+
+        try:
+            with open(fileName, "rb") as handle:
+                data = handle.read()
+
+            # Mark as recently used for eviction
+            os.utime(fileName)
+
+        except OSError:
+            return None
+
+        return data
+
+
+    def put(self, key, data):
+        """Stores the given (serialized) data under the given key"""
+
+        fileName = self.__getFile(key)
+        folder = os.path.dirname(fileName)
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+
+            handle, tempName = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+            try:
+                with os.fdopen(handle, "wb") as tempFile:
+                    tempFile.write(data)
+
+                os.replace(tempName, fileName)
+
+            except:
+                os.remove(tempName)
+                raise
+
+        except OSError as error:
+            # The shared folder is just an optimization. Don't break the build.
+            if not self.__failed:
+                Console.warn("Could not write to shared cache %s: %s", self.__path, error)
+                self.__failed = True
+
+            return
+
+        self.__written += len(data)
+
+
+    def evict(self):
+        """
+        Removes least recently used entries until the size of the folder
+        is below its limit. Returns the number of bytes removed.
+        """
+
+        if not self.__limit or not self.__written:
+            return 0
+
+        entries = []
+        total = 0
+
+        for root, dirs, files in os.walk(self.__path):
+            for name in files:
+                fileName = os.path.join(root, name)
+                try:
+                    stat = os.stat(fileName)
+                except OSError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, fileName))
+                total += stat.st_size
+
+        self.__written = 0
+
+        if total <= self.__limit:
+            return 0
+
+        Console.debug("Shrinking shared cache %s (%s bytes)...", self.__path, total)
+
+        # Remove a bit more than required to not run into the limit again on the next store
+        target = self.__limit * 0.9
+        removed = 0
+
+        entries.sort()
+        for mtime, size, fileName in entries:
+            if total - removed <= target:
+                break
+
+            try:
+                os.remove(fileName)
+            except OSError:
+                continue
+
+            removed += size
+
+        return removed
@@ -0,0 +1,233 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Runs CPU intensive work (e.g. compressing classes) in a pool of worker processes.
+
+Workers have no access to the projects or their cache files. Items are recreated
+from their text inside the workers using a project stand-in with an in-memory cache.
+All entries stored by the workers are sent back to be merged into the caches of the
+actual projects.
+
+Larger units of work (e.g. whole permutations, see runInWorkers()) are processed by
+forked workers instead which share the loaded session with the main process. Their
+caches are detached (read-only) and the stored entries are merged afterwards.
+"""
+
+import atexit, multiprocessing, logging
+
+import jasy.core.Cache as Cache
+import jasy.core.Console as Console
+
+__all__ = ["setJobs", "getJobs", "getPool", "runInWorkers", "WorkerProject", "compressClasses"]
+
+
+# Number of worker processes. One means to do everything in the main process.
+jobs = 1
+
+__pool = None
+
+# Function and items processed by forked workers (inherited when forking, see runInWorkers())
+__forked = None
+
+
+def setJobs(count):
+    """Configures the number of worker processes"""
+
+    global jobs
+    jobs = max(1, int(count))
+
+
+def getJobs():
+    """Returns the number of worker processes"""
+
+    return jobs
+
+
+def getPool():
+    """Returns the pool of worker processes. Created on first request."""
+
+    global __pool
+
+    if __pool is None:
+        Console.debug("Starting %s worker processes...", jobs)
+        __pool = multiprocessing.Pool(jobs)
+        atexit.register(__pool.terminate)
+
+    return __pool
+
+
+def runInWorkers(function, items, caches=()):
+    """
+    Calls the given function for each of the items in forked worker processes. Returns
+    the results in the order of the items. Log messages are grouped per item and printed
+    by the main process. Entries stored in caches are merged into the caches of the main process.
+    The given caches (e.g. the ones of the projects in use) are synced before forking.
+
+    Runs everything in the main process when only one job is configured or forking is not
+    supported by the platform.
+    """
+
+    global __forked
+
+    items = list(items)
+
+    if jobs == 1 or len(items) < 2 or not "fork" in multiprocessing.get_all_start_methods():
+        return [function(item) for item in items]
+
+    # Forked processes read the cache files so all pending entries need to be written first
+    for cache in caches:
+        cache.sync()
+
+    Console.debug("Forking %s worker processes...", min(jobs, len(items)))
+
+    __forked = (function, items)
+    pool = multiprocessing.get_context("fork").Pool(min(jobs, len(items)), initializer=__initWorker)
+
+    results = []
+
+    try:
+        for result, messages, records, error in pool.imap(__runItem, range(len(items))):
+            for level, message in messages:
+                logging.log(level, message)
+
+            Cache.mergeRecords(records)
+
+            if error is not None:
+                raise error
+
+            results.append(result)
+
+    finally:
+        pool.close()
+        pool.join()
+        __forked = None
+
+    return results
+
+
+class __Collector(logging.Handler):
+    """Collects the log messages of a worker process for printing them in the main process"""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append((record.levelno, record.getMessage()))
+
+
+def __initWorker():
+    """Prepares a forked worker process"""
+
+    global jobs, __pool
+
+    # Workers never start workers on their own
+    jobs = 1
+    __pool = None
+
+    Cache.detachAll()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    root.addHandler(__Collector())
+
+
+def __runItem(pos):
+    """Processes one item inside a forked worker. Returns the result together with log messages and cache entries."""
+
+    function, items = __forked
+    collector = logging.getLogger().handlers[0]
+
+    result = None
+    error = None
+
+    try:
+        result = function(items[pos])
+    except Exception as ex:
+        error = ex
+
+    messages = collector.messages
+    collector.messages = []
+
+    return result, messages, Cache.takeRecords(), error
+
+
+
+class WorkerProject:
+    """Stand-in for projects inside worker processes"""
+
+    def __init__(self):
+        self.__cache = Cache.Cache(".", filename="worker", backend="memory")
+
+
+    def getName(self):
+        return "worker"
+
+
+    def getCache(self):
+        return self.__cache
+
+
+    def close(self):
+        """Releases the in-memory cache"""
+
+        self.__cache.close()
+
+
+    def getCacheValidation(self):
+        # Items are recreated for each run so there is nothing to validate
+        return "mtime"
+
+
+    def getEntries(self):
+        """Returns all stored entries grouped by the ID of their item"""
+
+        cache = self.__cache
+        result = {}
+
+        for key in cache.keys():
+            start = key.find("[")
+            end = key.find("]")
+            if start == -1 or end == -1:
+                continue
+
+            itemId = key[start+1:end]
+            if not itemId in result:
+                result[itemId] = {}
+
+            result[itemId][key] = cache.read(key, inMemory=False)
+
+        return result
+
+
+
+def compressClasses(classes, permutation, translation, optimization, formatting):
+    """
+    Compresses the given classes (list of tuples with ID and text) inside a worker process.
+    Returns all cache entries created for each class as a dictionary (ID => field => value).
+    """
+
+    # Imported here to omit circular imports
+    from jasy.item.Class import ClassItem
+
+    project = WorkerProject()
+
+    for classId, text in classes:
+        classItem = ClassItem(project, classId)
+        classItem.setText(text)
+
+        # Failing classes are processed again by the main process which reports the error
+        try:
+            classItem.getCompressed(permutation, translation, optimization, formatting)
+        except Exception as error:
+            Console.debug("Could not compress %s in worker: %s", classId, error)
+
+    entries = project.getEntries()
+    project.close()
+
+    return entries
@@ -77,6 +77,23 @@ def doctor():
     pass
 
 
+@task
+def gc(permutations=True):
+    """Removes outdated entries from the caches of all projects and compacts them"""
+
+    # Entries of permutations are only checked when the session knows about all used fields
+    if permutations in (True, "true"):
+        permutations = session.getPermutations()
+    else:
+        permutations = None
+    reclaimed = 0
+
+    for project in session.getProjects():
+        reclaimed += project.collectGarbage(permutations)
+
+    Console.info("Reclaimed %s KB in total", reclaimed // 1024)
+
+
 @task
 def create(name="myproject", origin=None, originVersion=None, skeleton=None, destination=None, **argv):
     """Creates a new project based on a local or remote skeleton"""
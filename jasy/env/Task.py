@@ -78,7 +78,12 @@ class Task:
         Console.header(self.__name__)
 
         # Execute internal function
-        return self.func(**merged)
+        result = self.func(**merged)
+
+        # Commit cache changes of this build phase
+        session.sync()
+
+        return result
 
 
     def __repr__(self):
@@ -3,7 +3,7 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import os
+import os, hashlib
 
 from jasy import UserError
 import jasy.core.File as File
@@ -18,6 +18,7 @@ class AbstractItem:
     __path = None
     __cache = None
     __text = None
+    __fingerprint = None
 
     def __init__(self, project, id=None):
         self.id = id
@@ -70,6 +71,7 @@ class AbstractItem:
     def setText(self, text):
         """Stores text from custom reader"""
         self.__text = text
+        self.__fingerprint = None
 
 
     def saveText(self, text, path, encoding="utf-8"):
@@ -82,6 +84,7 @@ class AbstractItem:
 
         self.__text = text
         self.__path = path
+        self.__fingerprint = None
 
         if not File.exists(path) or File.read(path) != text:
             File.write(path, text)
@@ -107,6 +110,69 @@ class AbstractItem:
         """Returns the SHA1 checksum of the item"""
         
         return File.sha1(open(self.getPath(), mode))
+
+
+    def getFingerprint(self):
+        """
+        Returns a SHA1 checksum of the content of the item. The stat data of the
+        underlying file(s) is stored in the project's cache so that unmodified
+        files are not hashed again on later runs.
+        """
+
+        if self.__fingerprint is not None:
+            return self.__fingerprint
+
+        if self.__text is not None:
+            self.__fingerprint = hashlib.sha1(self.__text.encode("utf-8")).hexdigest()
+            return self.__fingerprint
+
+        paths = self.__path if type(self.__path) is list else [self.__path]
+
+        stats = []
+        for path in paths:
+            stat = os.stat(path)
+            stats.append((path, stat.st_size, stat.st_mtime_ns, stat.st_ino))
+
+        cache = self.project.getCache()
+        field = "fingerprint[%s]" % self.id
+        stored = cache.read(field)
+
+        if stored is not None and stored[0] == stats:
+            fingerprint = stored[1]
+        else:
+            checksum = hashlib.sha1()
+            for path in paths:
+                with open(path, "rb") as handle:
+                    checksum.update(handle.read())
+
+            fingerprint = checksum.hexdigest()
+            cache.store(field, (stats, fingerprint))
+
+        self.__fingerprint = fingerprint
+        return fingerprint
+
+
+    def readCache(self, field, inMemory=True):
+        """
+        Reads the given field of this item from the project's cache. Depending on
+        the cache validation of the project entries are validated against the
+        modification time or are keyed by the fingerprint of the item. The latter
+        ones are shared with other projects/machines when a shared cache is configured.
+        """
+
+        if self.project.getCacheValidation() == "content":
+            return self.project.getCache().read("%s@%s" % (field, self.getFingerprint()), inMemory=inMemory, shared=True)
+
+        return self.project.getCache().read(field, self.mtime, inMemory=inMemory)
+
+
+    def storeCache(self, field, value, transient=False, inMemory=True):
+        """Stores the given field of this item in the project's cache (see readCache())"""
+
+        if self.project.getCacheValidation() == "content":
+            self.project.getCache().store("%s@%s" % (field, self.getFingerprint()), value, transient=transient, inMemory=inMemory, shared=True)
+        else:
+            self.project.getCache().store(field, value, self.mtime, transient, inMemory)
     
 
     # Map Python built-ins
@@ -3,10 +3,13 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
-import os, copy, zlib, fnmatch, re
+import os, zlib, fnmatch, re
 
 import jasy.js.parse.Parser as Parser
 import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Node as Node
+import jasy.parse.TreeStore as TreeStore
+import jasy.parse.CompactTree as CompactTree
 import jasy.js.clean.DeadCode
 import jasy.js.clean.Unused
 import jasy.js.clean.Permutate
@@ -16,7 +19,7 @@ import jasy.js.api.Data
 import jasy.core.Permutation
 import jasy.item.Abstract
 
-from jasy.js.MetaData import MetaData
+from jasy.js.Facts import Facts, fieldCalls
 from jasy.js.output.Compressor import Compressor
 
 from jasy import UserError
@@ -31,8 +34,6 @@ except:
     highlight = None
 
 
-aliases = {}
-
 defaultOptimization = jasy.js.output.Optimization.Optimization("declarations", "blocks", "variables")
 defaultPermutation = jasy.core.Permutation.getPermutation({"debug" : False})
 
@@ -42,9 +43,17 @@ def collectFields(node, keys=None):
     if keys is None:
         keys = set()
     
-    # Always the first parameter
-    # Supported calls: jasy.Env.isSet(key, expected?), jasy.Env.getValue(key), jasy.Env.select(key, map)
-    calls = ("jasy.Env.isSet", "jasy.Env.getValue", "jasy.Env.select")
+    # Supported calls (see Facts)
+    calls = fieldCalls
+
+    # Compact trees directly offer all dot nodes
+    if isinstance(node, CompactTree.CompactNode):
+        for dot in node.findNodes("dot"):
+            if dot.parent.type == "call" and assembleDot(dot) in calls:
+                keys.add(dot.parent[1][0].value)
+
+        return keys
+
     if node.type == "dot" and node.parent.type == "call" and assembleDot(node) in calls:
         keys.add(node.parent[1][0].value)
 
@@ -68,31 +77,108 @@ class ClassError(Exception):
 class ClassItem(jasy.item.Abstract.AbstractItem):
     
     kind = "class"
+
+    # Interned fields of the class (see getFieldSet())
+    __fieldSet = None
+
+
+    def attach(self, path):
+        self.__fieldSet = None
+        return jasy.item.Abstract.AbstractItem.attach(self, path)
+
+
+    def setText(self, text):
+        self.__fieldSet = None
+        return jasy.item.Abstract.AbstractItem.setText(self, text)
+
+
+    def saveText(self, text, path, encoding="utf-8"):
+        self.__fieldSet = None
+        return jasy.item.Abstract.AbstractItem.saveText(self, text, path, encoding)
+
     
     def __getTree(self, context=None):
+        """
+        Returns a read-only view of the plain tree (see CompactTree). Passes modifying
+        the tree need to work on a mutable copy created by materialize().
+        """
         
         field = "tree[%s]" % self.id
-        tree = self.project.getCache().read(field, self.mtime)
-        if not tree:
-            Console.info("Processing class %s %s...", Console.colorize(self.id, "bold"), Console.colorize("[%s]" % context, "cyan"))
-            
-            Console.indent()
-            tree = Parser.parse(self.getText(), self.id)
-            ScopeScanner.scan(tree)
-            Console.outdent()
+        tree = self.readCache(field)
+        if tree is None:
+            tree = self.__loadTree()
+
+            if not tree:
+                Console.info("Processing class %s %s...", Console.colorize(self.id, "bold"), Console.colorize("[%s]" % context, "cyan"))
+                
+                Console.indent()
+                tree = Parser.parse(self.getText(), self.id)
+
+                # Collects fields, translations, meta data and scopes in one walk (also attaches scope data to the tree)
+                facts = Facts(tree)
+                Console.outdent()
+
+                # Persist in compact binary format to omit parsing in the next session
+                self.storeCache("tree-data[%s]" % self.id, TreeStore.dump(tree), inMemory=False)
+                self.storeCache("facts[%s]" % self.id, facts)
             
-            self.project.getCache().store(field, tree, self.mtime, True)
+            # Keep the tree as a compact node table in memory
+            tree = CompactTree.CompactTree(tree)
+            self.storeCache(field, tree, True)
         
-        return tree
+        return tree.getRoot()
+
+
+    def __loadTree(self):
+        """Restores the tree stored by a previous session (if still valid)"""
+
+        data = self.readCache("tree-data[%s]" % self.id, inMemory=False)
+        if data is None:
+            return None
+
+        try:
+            return TreeStore.load(data, Node.Node)
+        except TreeStore.StoreError as error:
+            Console.debug("Ignoring stored tree of %s: %s", self.id, error)
+            return None
     
     
+    def __getFacts(self):
+        """Returns the facts of the plain tree (see Facts)"""
+
+        field = "facts[%s]" % self.id
+        facts = self.readCache(field)
+        if facts is None:
+            tree = self.__getTree(context="facts")
+
+            # Typically collected while parsing
+            facts = self.readCache(field)
+            if facts is None:
+                facts = Facts(tree)
+                self.storeCache(field, facts)
+
+        return facts
+
+
+    def __getOptimizedFacts(self, permutation=None):
+        """Returns the facts of the optimized tree of the given permutation"""
+
+        field = "facts[%s]-%s" % (self.id, permutation)
+        facts = self.readCache(field)
+        if facts is None:
+            facts = Facts(self.__getOptimizedTree(permutation, "facts"))
+            self.storeCache(field, facts)
+
+        return facts
+
+
     def __getOptimizedTree(self, permutation=None, context=None):
-        """Returns an optimized tree with permutations applied"""
+        """Returns a read-only view of the optimized tree with permutations applied"""
 
         field = "opt-tree[%s]-%s" % (self.id, permutation)
-        tree = self.project.getCache().read(field, self.mtime)
-        if not tree:
-            tree = copy.deepcopy(self.__getTree("%s:plain" % context))
+        tree = self.readCache(field)
+        if tree is None:
+            tree = self.__getTree("%s:plain" % context).materialize()
 
             # Logging
             msg = "Processing class %s" % Console.colorize(self.id, "bold")
@@ -104,25 +190,79 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             Console.info("%s..." % msg)
             Console.indent()
 
+            # Positions of field accesses and dead code are known from parsing
+            facts = self.__getFacts()
+            patched = []
+
             # Apply permutation
-            if permutation:
+            if permutation and facts.accesses:
                 Console.debug("Patching tree with permutation: %s", permutation)
                 Console.indent()
-                jasy.js.clean.Permutate.patch(tree, permutation)
+                patched = jasy.js.clean.Permutate.patchAccesses(tree, permutation, facts.accesses)
+                if patched is None:
+                    Console.debug("Outdated positions of field accesses. Patching whole tree...")
+                    jasy.js.clean.Permutate.patch(tree, permutation)
                 Console.outdent()
 
-            # Cleanups
-            jasy.js.clean.DeadCode.cleanup(tree)
+            # Cleanups (dead code is only searched for around patched nodes when possible)
+            if facts.deadCode or patched is None:
+                jasy.js.clean.DeadCode.cleanup(tree)
+            elif patched:
+                jasy.js.clean.DeadCode.cleanupPatched(tree, patched)
+
             ScopeScanner.scan(tree)
             jasy.js.clean.Unused.cleanup(tree)
         
-            self.project.getCache().store(field, tree, self.mtime, True)
+            tree = CompactTree.CompactTree(tree)
+            self.storeCache(field, tree, True)
             Console.outdent()
 
-        return tree
+        return tree.getRoot()
+
+
+    def __matchClasses(self, pattern, classes, index=None):
+        """Returns all known classes (except this one) matching the given wildcard pattern"""
+
+        if index is not None:
+            names = index.match(pattern)
+        else:
+            reobj = re.compile(fnmatch.translate(pattern))
+            names = [className for className in classes if reobj.match(className)]
 
+        return [classes[className] for className in names if className != self.id and className in classes]
 
-    def getBreaks(self, permutation=None, classes=None):
+
+    def __findPackageClass(self, package, classes, index=None):
+        """Returns the class which is accessed through the given package name (the class itself or one of its parent namespaces)"""
+
+        if index is not None:
+            candidates = index.getPrefixes(package)
+
+            # Access to the own namespace never refers to a parent namespace
+            if package == self.id or package.startswith(self.id + "."):
+                candidates = [className for className in candidates if len(className) > len(self.id)]
+
+        else:
+            candidates = []
+            while True:
+                candidates.append(package)
+                pos = package.rfind(".")
+                if pos == -1:
+                    break
+
+                package = package[0:pos]
+
+        for className in candidates:
+            if className == self.id:
+                break
+
+            elif className in classes and classes[className].kind == "class":
+                return classes[className]
+
+        return None
+
+
+    def getBreaks(self, permutation=None, classes=None, index=None):
         """
         Returns all down-priorized dependencies. This are dependencies which are
         required to make the module run, but are not required being available at load time.
@@ -136,22 +276,19 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             if name != self.id and name in classes and classes[name].kind == "class":
                 result.add(classes[name])
             elif "*" in name:
-                reobj = re.compile(fnmatch.translate(name))
-                for className in classes:
-                    if className != self.id:
-                        if reobj.match(className):
-                            result.add(classes[className])
+                result.update(self.__matchClasses(name, classes, index))
 
         return result
 
 
-    def getDependencies(self, permutation=None, classes=None, fields=None, warnings=True):
+    def getDependencies(self, permutation=None, classes=None, fields=None, warnings=True, index=None):
         """ 
         Returns a set of dependencies seen through the given list of known 
         classes (ignoring all unknown items in original set) and configured fields 
         with their individual detection classes. This method also
         makes use of the meta data (see core/MetaData.py) and the variable data 
-        (see parse/ScopeData.py).
+        (see parse/ScopeData.py). The optional index (see NamespaceTrie) of the
+        class names speeds up matching of wildcards and package names.
         """
 
         permutation = self.filterPermutation(permutation)
@@ -177,11 +314,7 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             if name != self.id and name in classes and classes[name].kind == "class":
                 result.add(classes[name])
             elif "*" in name:
-                reobj = re.compile(fnmatch.translate(name))
-                for className in classes:
-                    if className != self.id:
-                        if reobj.match(className):
-                            result.add(classes[className])
+                result.update(self.__matchClasses(name, classes, index))
             elif warnings:
                 Console.warn("Missing class (required): %s in %s", name, self.id)
 
@@ -192,29 +325,10 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
         
         # Add classes from detected package access
         for package in scope.packages:
-            if package in aliases:
-                className = aliases[package]
-                if className in classes:
-                    result.add(classes[className])
-                    continue
-            
-            orig = package
-            while True:
-                if package == self.id:
-                    break
-            
-                elif package in classes and classes[package].kind == "class":
-                    aliases[orig] = package
-                    result.add(classes[package])
-                    break
-            
-                else:
-                    pos = package.rfind(".")
-                    if pos == -1:
-                        break
-                    
-                    package = package[0:pos]
-                    
+            classObj = self.__findPackageClass(package, classes, index)
+            if classObj is not None:
+                result.add(classObj)
+
         # Manually excluded names/classes
         for name in meta.optionals:
             if name != self.id and name in classes and classes[name].kind == "class":
@@ -232,23 +346,17 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
         """
         
         permutation = self.filterPermutation(permutation)
-        
-        field = "scope[%s]-%s" % (self.id, permutation)
-        scope = self.project.getCache().read(field, self.mtime)
-        if scope is None:
-            scope = self.__getOptimizedTree(permutation, "scope").scope
-            self.project.getCache().store(field, scope, self.mtime)
-
-        return scope
+        return self.__getOptimizedFacts(permutation).scope
         
         
     def getApi(self, highlight=True):
         field = "api[%s]-%s" % (self.id, highlight)
-        apidata = self.project.getCache().read(field, self.mtime, inMemory=False)
+        apidata = self.readCache(field, inMemory=False)
         if apidata is None:
             apidata = jasy.js.api.Data.ApiData(self.id, highlight)
             
-            tree = self.__getTree(context="api")
+            # The API scanner relies on the full interface of mutable nodes
+            tree = self.__getTree(context="api").materialize()
             Console.indent()
             apidata.scanTree(tree)
             Console.outdent()
@@ -263,14 +371,14 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             apidata.addSize(self.getSize())
             apidata.addFields(self.getFields())
             
-            self.project.getCache().store(field, apidata, self.mtime, inMemory=False)
+            self.storeCache(field, apidata, inMemory=False)
 
         return apidata
 
 
     def getHighlightedCode(self):
         field = "highlighted[%s]" % self.id
-        source = self.project.getCache().read(field, self.mtime)
+        source = self.readCache(field)
         if source is None:
             if highlight is None:
                 raise UserError("Could not highlight JavaScript code! Please install Pygments.")
@@ -279,85 +387,96 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
             formatter = HtmlFormatter(full=True, style="autumn", linenos="table", lineanchors="line")
             source = highlight(self.getText(), lexer, formatter)
             
-            self.project.getCache().store(field, source, self.mtime)
+            self.storeCache(field, source)
 
         return source
 
 
     def getMetaData(self, permutation=None):
         permutation = self.filterPermutation(permutation)
-
-        field = "meta[%s]-%s" % (self.id, permutation)
-        meta = self.project.getCache().read(field, self.mtime)
-        if meta is None:
-            meta = MetaData(self.__getOptimizedTree(permutation, "meta"))
-            self.project.getCache().store(field, meta, self.mtime)
-            
-        return meta
+        return self.__getOptimizedFacts(permutation).meta
         
         
     def getFields(self):
-        field = "fields[%s]" % (self.id)
-        fields = self.project.getCache().read(field, self.mtime)
-        if fields is None:
-            fields = collectFields(self.__getTree(context="fields"))
-            self.project.getCache().store(field, fields, self.mtime)
-        
-        return fields
+        return self.__getFacts().fields
 
 
     def getTranslations(self):
-        field = "translations[%s]" % (self.id)
-        result = self.project.getCache().read(field, self.mtime)
-        if result is None:
-            result = jasy.js.optimize.Translation.collectTranslations(self.__getTree(context="i18n"))
-            self.project.getCache().store(field, result, self.mtime)
-
-        return result
+        return self.__getFacts().translations
         
         
+    def getFieldSet(self):
+        """Returns the fields of the class as shared frozenset (see jasy.core.Permutation.internFields())"""
+
+        if self.__fieldSet is None:
+            self.__fieldSet = jasy.core.Permutation.internFields(self.getFields())
+
+        return self.__fieldSet
+
+
     def filterPermutation(self, permutation):
         if permutation:
-            fields = self.getFields()
+            fields = self.getFieldSet()
             if fields:
                 return permutation.filter(fields)
 
         return None
         
         
-    def getCompressed(self, permutation=None, translation=None, optimization=None, formatting=None, context="compressed"):
+    def __getCompressedField(self, permutation, translation, optimization, formatting):
+        """Returns the cache field of the compressed code together with the actually relevant permutation and translation"""
+
         permutation = self.filterPermutation(permutation)
 
         # Disable translation for caching / patching when not actually used
-        if translation and not self.getTranslations():
-            translation = None
-        
-        field = "compressed[%s]-%s-%s-%s-%s" % (self.id, permutation, translation, optimization, formatting)
-        compressed = self.project.getCache().read(field, self.mtime)
+        translationKey = None
+        if translation:
+            translations = self.getTranslations()
+            if translations:
+                # Bundles are identified by language only, so the used entries are part of the key
+                translationKey = "%s#%s" % (translation, translation.getTableChecksum(translations))
+            else:
+                translation = None
+
+        return "compressed[%s]-%s-%s-%s-%s" % (self.id, permutation, translationKey, optimization, formatting), permutation, translation
+
+
+    def hasCompressed(self, permutation=None, translation=None, optimization=None, formatting=None):
+        """Whether the compressed code is available in the cache. Never parses the class."""
+
+        # Computing the cache field requires the fields and translations to not parse the class
+        if (permutation or translation) and self.readCache("facts[%s]" % self.id) is None:
+            return False
+
+        field, permutation, translation = self.__getCompressedField(permutation, translation, optimization, formatting)
+        return self.readCache(field) is not None
+
+
+    def getCompressed(self, permutation=None, translation=None, optimization=None, formatting=None, context="compressed"):
+        field, permutation, translation = self.__getCompressedField(permutation, translation, optimization, formatting)
+        compressed = self.readCache(field)
         if compressed == None:
-            tree = self.__getOptimizedTree(permutation, context)
-            
-            if translation or optimization:
-                tree = copy.deepcopy(tree)
+            # The compressor visits all nodes and their attributes which is faster on mutable nodes
+            tree = self.__getOptimizedTree(permutation, context).materialize()
             
-                if translation:
-                    jasy.js.optimize.Translation.optimize(tree, translation)
-
-                if optimization:
-                    try:
-                        optimization.apply(tree)
-                    except jasy.js.output.Optimization.Error as error:
-                        raise ClassError(self, "Could not compress class! %s" % error)
+            if translation:
+                jasy.js.optimize.Translation.optimize(tree, translation)
+
+            if optimization:
+                try:
+                    optimization.apply(tree)
+                except jasy.js.output.Optimization.Error as error:
+                    raise ClassError(self, "Could not compress class! %s" % error)
                 
             compressed = Compressor(formatting).compress(tree)
-            self.project.getCache().store(field, compressed, self.mtime)
+            self.storeCache(field, compressed)
             
         return compressed
             
             
     def getSize(self):
         field = "size[%s]" % self.id
-        size = self.project.getCache().read(field, self.mtime)
+        size = self.readCache(field)
         
         if size is None:
             compressed = self.getCompressed(context="size")
@@ -370,7 +489,7 @@ class ClassItem(jasy.item.Abstract.AbstractItem):
                 "zipped" : len(zipped)
             }
             
-            self.project.getCache().store(field, size, self.mtime)
+            self.storeCache(field, size)
             
         return size
         
@@ -103,7 +103,7 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
         """
         
         field = "tree[%s]" % self.id
-        tree = self.project.getCache().read(field, self.mtime)
+        tree = self.readCache(field)
         if not tree:
             Console.info("Processing stylesheet %s %s...", Console.colorize(self.id, "bold"), Console.colorize("[%s]" % context, "cyan"))
             
@@ -111,7 +111,7 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
             tree = Parser.parse(self.getText(), self.id)
             Console.outdent()
             
-            self.project.getCache().store(field, tree, self.mtime, True)
+            self.storeCache(field, tree, True)
         
         return tree
     
@@ -122,7 +122,7 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
         """
 
         field = "opt-tree[%s]-%s" % (self.id, permutation)
-        tree = self.project.getCache().read(field, self.mtime)
+        tree = self.readCache(field)
         if not tree:
             tree = copy.deepcopy(self.__getTree("%s:plain" % context))
 
@@ -143,7 +143,7 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
                 Permutate.patch(tree, permutation)
                 Console.outdent()
         
-            self.project.getCache().store(field, tree, self.mtime, True)
+            self.storeCache(field, tree, True)
             Console.outdent()
 
         return tree
@@ -179,10 +179,10 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
         
     def getFields(self):
         field = "fields[%s]" % (self.id)
-        fields = self.project.getCache().read(field, self.mtime)
+        fields = self.readCache(field)
         if fields is None:
             fields = collectFields(self.__getTree(context="fields"))
-            self.project.getCache().store(field, fields, self.mtime)
+            self.storeCache(field, fields)
         
         return fields
         
@@ -215,12 +215,9 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
 
                     childStyleItem = session.getStyleByName(includeName)
 
-                    # Use merged tree for children as well...
+                    # Use merged tree for children as well. It is a fresh copy already which we are free to modify.
                     childRoot = childStyleItem.getMergedTree(permutation, session)
 
-                    # and copy it for being free to modify it
-                    childRoot = copy.deepcopy(childRoot)
-
                     node.replace(child, childRoot)
 
                 else:
@@ -309,7 +306,7 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
         permutation = self.filterPermutation(permutation)
         
         field = "compressed[%s]-%s-%s-%s" % (self.id, permutation, optimization, formatting)
-        compressed = self.project.getCache().read(field, self.mtime)
+        compressed = self.readCache(field)
         if compressed == None:
             tree = self.__getOptimizedTree(permutation, context)
             
@@ -325,14 +322,14 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
                     raise StyleError(self, "Could not compress class! %s" % error)
                 
             compressed = Compressor(formatting).compress(tree)
-            self.project.getCache().store(field, compressed, self.mtime)
+            self.storeCache(field, compressed)
             
         return compressed
             
             
     def getSize(self):
         field = "size[%s]" % self.id
-        size = self.project.getCache().read(field, self.mtime)
+        size = self.readCache(field)
         
         if size is None:
             compressed = self.getCompressed(context="size")
@@ -345,7 +342,7 @@ class StyleItem(jasy.item.Abstract.AbstractItem):
                 "zipped" : len(zipped)
             }
             
-            self.project.getCache().store(field, size, self.mtime)
+            self.storeCache(field, size)
             
         return size
         
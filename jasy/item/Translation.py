@@ -7,6 +7,7 @@ import polib, json
 
 import jasy.item.Abstract
 import jasy.core.Console as Console
+import jasy.core.Util as Util
 
 
 def getFormat(path):
@@ -50,6 +51,7 @@ class TranslationItem(jasy.item.Abstract.AbstractItem):
 
     def __add__(self, other):
         self.table.update(other.getTable())
+        self.__checksums = {}
         return self
 
 
@@ -68,6 +70,9 @@ class TranslationItem(jasy.item.Abstract.AbstractItem):
         # Initialize translation table
         self.table = table or {}
 
+        # Checksums of parts of the table (see getTableChecksum())
+        self.__checksums = {}
+
 
     def attach(self, path):
         # Call Item's attach method first
@@ -108,6 +113,7 @@ class TranslationItem(jasy.item.Abstract.AbstractItem):
         Console.outdent()
         
         self.table = table
+        self.__checksums = {}
 
         return self
 
@@ -132,6 +138,21 @@ class TranslationItem(jasy.item.Abstract.AbstractItem):
         """Returns the translation table"""
         return self.table
 
+    def getTableChecksum(self, ids):
+        """
+        Returns a checksum of the translations of the given message IDs (e.g. the ones used by a class).
+        Changes whenever one of these translations is modified, added or removed.
+        """
+
+        ids = frozenset(ids)
+        checksum = self.__checksums.get(ids)
+        if checksum is None:
+            table = self.table
+            entries = { translationId: table.get(translationId) for translationId in ids }
+            checksum = self.__checksums[ids] = Util.generateChecksum(json.dumps(entries, sort_keys=True))
+
+        return checksum
+
     def getLanguage(self):
         """Returns the language of the translation file"""
         return self.language        
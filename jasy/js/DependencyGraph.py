@@ -0,0 +1,223 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+import re, fnmatch
+
+import jasy.core.Console as Console
+
+__all__ = ["DependencyGraph"]
+
+
+class DependencyGraph():
+    """
+    Dependencies between a set of classes for one permutation with forward and reverse edges.
+
+    The edges of each class are stored in the cache of its project. They are only computed
+    again when the class itself was modified (see AbstractItem.readCache()) or when the
+    classes matched by its references (names, wildcards and packages) or the configured
+    fields it uses are different. Adding or removing unrelated classes keeps them intact.
+    """
+
+    def __init__(self, classes, permutation=None, fields=None, index=None):
+
+        # Dictionary of all known classes (name => ClassItem)
+        self.__classes = classes
+
+        # Optional namespace index of the class names (see NamespaceTrie)
+        self.__index = index
+
+        self.__permutation = permutation
+        self.__fields = fields
+
+        # Resolved edges of each class
+        self.__dependencies = {}
+        self.__breaks = {}
+
+        # Reverse edges. Built on first request.
+        self.__dependents = None
+
+
+    def __matchClasses(self, pattern):
+        """Returns the names of all known classes matching the given wildcard pattern"""
+
+        classes = self.__classes
+
+        if self.__index is not None:
+            names = self.__index.match(pattern)
+        else:
+            reobj = re.compile(fnmatch.translate(pattern))
+            names = [className for className in classes if reobj.match(className)]
+
+        return sorted([className for className in names if className in classes])
+
+
+    def __getInputs(self, classObj, permutation):
+        """
+        Returns the classes matched by the references of the given class together with the names
+        of the configured fields it uses. Dependencies of the class only change together with these.
+        """
+
+        classes = self.__classes
+        meta = classObj.getMetaData(permutation)
+        scope = classObj.getScopeData(permutation)
+
+        names = set(meta.requires) | set(meta.optionals) | set(meta.breaks) | set(scope.shared)
+
+        # Packages are resolved to the class itself or one of its parent namespaces
+        for package in scope.packages:
+            while True:
+                names.add(package)
+                pos = package.rfind(".")
+                if pos == -1:
+                    break
+
+                package = package[0:pos]
+
+        matched = []
+        for name in names:
+            if "*" in name:
+                matched.append("%s=%s" % (name, ",".join(self.__matchClasses(name))))
+            elif name in classes and classes[name].kind == "class":
+                matched.append(name)
+
+        fieldNames = []
+        if self.__fields:
+            for fieldName in classObj.getFields():
+                if (permutation is None or not permutation.has(fieldName)) and fieldName in self.__fields:
+                    fieldNames.append(fieldName)
+
+        return (sorted(matched), sorted(fieldNames))
+
+
+    def __getEntry(self, classObj):
+        """Returns a tuple with the names of dependencies, breaks, used fields and missing classes of the given class"""
+
+        permutation = classObj.filterPermutation(self.__permutation)
+        inputs = self.__getInputs(classObj, permutation)
+
+        field = "deps[%s]-%s" % (classObj.getId(), permutation)
+        stored = classObj.readCache(field)
+        if stored is not None and stored[0] == inputs:
+            return stored[1]
+
+        classes = self.__classes
+        index = self.__index
+        meta = classObj.getMetaData(permutation)
+
+        # Detection classes of fields are generated for each build so they are stored by the name of the field
+        dependencies = classObj.getDependencies(permutation, classes=classes, warnings=False, index=index)
+        breaks = classObj.getBreaks(permutation, classes=classes, index=index)
+
+        # Remember names which are reported as missing (see ClassItem.getDependencies())
+        missing = []
+        for name in meta.requires:
+            if not (name != classObj.getId() and name in classes and classes[name].kind == "class") and not "*" in name:
+                missing.append(("required", name))
+
+        for name in meta.optionals:
+            if not (name != classObj.getId() and name in classes and classes[name].kind == "class"):
+                missing.append(("optional", name))
+
+        entry = (sorted([depObj.getId() for depObj in dependencies]), sorted([breakObj.getId() for breakObj in breaks]), inputs[1], missing)
+        classObj.storeCache(field, (inputs, entry))
+
+        return entry
+
+
+    def __resolve(self, classObj, warnings=False):
+        """Resolves the names of the cached entry into class instances"""
+
+        dependencyNames, breakNames, fieldNames, missing = self.__getEntry(classObj)
+
+        if warnings:
+            for kind, name in missing:
+                Console.warn("Missing class (%s): %s in %s", kind, name, classObj.getId())
+
+        classes = self.__classes
+        fields = self.__fields
+
+        # Self references have no meaning for loading and sorting
+        dependencies = set([classes[name] for name in dependencyNames if name in classes and name != classObj.getId()])
+        for fieldName in fieldNames:
+            dependencies.add(fields[fieldName])
+
+        self.__dependencies[classObj] = dependencies
+        self.__breaks[classObj] = set([classes[name] for name in breakNames if name in classes])
+
+
+    def getDependencies(self, classObj, warnings=False):
+        """Returns the set of classes the given class depends on"""
+
+        if not classObj in self.__dependencies:
+            self.__resolve(classObj, warnings)
+
+        return self.__dependencies[classObj]
+
+
+    def getBreaks(self, classObj):
+        """Returns the set of down-priorized dependencies of the given class (see ClassItem.getBreaks())"""
+
+        if not classObj in self.__breaks:
+            self.__resolve(classObj)
+
+        return self.__breaks[classObj]
+
+
+    def getDependents(self, classObj):
+        """Returns the set of classes which directly depend on the given class"""
+
+        if self.__dependents is None:
+            dependents = {}
+            for depender in self.__classes.values():
+                for dependency in self.getDependencies(depender):
+                    if not dependency in dependents:
+                        dependents[dependency] = set()
+
+                    dependents[dependency].add(depender)
+
+            self.__dependents = dependents
+
+        return self.__dependents.get(classObj, set())
+
+
+    def getClosure(self, classObjs, warnings=False):
+        """Returns the set of the given classes and all their (indirect) dependencies"""
+
+        result = set()
+        pending = list(classObjs)
+
+        while pending:
+            classObj = pending.pop()
+            if classObj in result:
+                continue
+
+            result.add(classObj)
+            for depObj in self.getDependencies(classObj, warnings):
+                if not depObj in result:
+                    pending.append(depObj)
+
+        return result
+
+
+    def getAffected(self, classObjs):
+        """
+        Returns the set of the given classes and all classes which (indirectly) depend on
+        them e.g. to figure out which outputs need to be rebuilt after a modification.
+        """
+
+        result = set()
+        pending = list(classObjs)
+
+        while pending:
+            classObj = pending.pop()
+            if classObj in result:
+                continue
+
+            result.add(classObj)
+            for depender in self.getDependents(classObj):
+                if not depender in result:
+                    pending.append(depender)
+
+        return result
@@ -0,0 +1,79 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.optimize.Translation as Translation
+import jasy.js.clean.DeadCode as DeadCode
+
+from jasy.js.MetaData import MetaData
+from jasy.js.util import assembleDot, getNodePath
+
+__all__ = ["Facts", "fieldCalls"]
+
+
+# Calls accessing fields. The name of the field is always the first parameter.
+# Supported calls: jasy.Env.isSet(key, expected?), jasy.Env.getValue(key), jasy.Env.select(key, map)
+fieldCalls = ("jasy.Env.isSet", "jasy.Env.getValue", "jasy.Env.select")
+
+
+class Facts:
+    """
+    Facts about a class which are collected in one walk over its tree: accessed fields,
+    the positions of the field accessing calls (see getNodePath()), whether there are
+    branches which can be removed without knowing any fields (see DeadCode), used
+    translations (ID => lines), meta data of doc comments and the variable data
+    of the root scope. Like ScopeScanner.scan() the walk attaches the variable data
+    of each scope to the tree.
+
+    Hint: Must be a clean data class without links to other
+    systems for optimal cachability using Pickle
+    """
+
+    __slots__ = ["fields", "accesses", "deadCode", "translations", "meta", "scope"]
+
+    def __init__(self, tree):
+        fields = self.fields = set()
+        accesses = self.accesses = []
+        self.deadCode = False
+        translations = self.translations = {}
+        meta = self.meta = MetaData()
+
+        scanner = ScopeScanner.Scanner()
+        enter = scanner.enter
+
+        # Iterative walk in document order (same as in ScopeScanner.scan()). Scopes to leave are marked by None.
+        pending = [tree]
+        push = pending.append
+        while pending:
+            node = pending.pop()
+            if node is None:
+                scanner.leave(pending.pop())
+                continue
+
+            if enter(node):
+                push(node)
+                push(None)
+
+            nodeType = node.type
+            if nodeType == "dot":
+                if node.parent.type == "call" and assembleDot(node) in fieldCalls:
+                    fields.add(node.parent[1][0].value)
+                    accesses.append(getNodePath(node.parent))
+
+            elif nodeType == "call":
+                Translation.collectCall(node, translations)
+
+            elif nodeType in DeadCode.branchTypes and not self.deadCode:
+                self.deadCode = DeadCode.isDecidable(node)
+
+            comments = getattr(node, "comments", None)
+            if comments:
+                meta.addComments(comments)
+
+            for child in reversed(node):
+                if child is not None:
+                    push(child)
+
+        self.scope = scanner.getResult()
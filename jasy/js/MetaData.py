@@ -3,6 +3,8 @@
 # Copyright 2010-2012 Zynga Inc.
 #
 
+from jasy.parse.CompactTree import CompactNode
+
 class MetaData:
     """ 
     Data structure to hold all meta information. 
@@ -16,7 +18,7 @@ class MetaData:
     
     __slots__ = ["name", "requires", "optionals", "breaks", "assets"]
     
-    def __init__(self, tree):
+    def __init__(self, tree=None):
         self.name = None
         
         self.requires = set()
@@ -24,14 +26,28 @@ class MetaData:
         self.breaks = set()
         self.assets = set()
         
-        self.__inspect(tree)
+        # Compact trees directly offer the comments of all nodes in document order
+        if isinstance(tree, CompactNode):
+            for comments in tree.collectValues("comments"):
+                self.addComments(comments)
+        elif tree is not None:
+            self.__inspect(tree)
         
         
     def __inspect(self, node):
         """ The internal inspection routine """
     
-        # Parse comments
-        comments = getattr(node, "comments", None)
+        self.addComments(getattr(node, "comments", None))
+
+        # Process children
+        for child in node:
+            if child is not None:
+                self.__inspect(child)
+
+
+    def addComments(self, comments):
+        """ Adds the tags of the given comments of one node (in document order) """
+
         if comments:
             for comment in comments:
                 commentTags = comment.getTags()
@@ -52,8 +68,3 @@ class MetaData:
                         self.breaks.update(commentTags["break"])
                     if "asset" in commentTags:
                         self.assets.update(commentTags["asset"])
-
-        # Process children
-        for child in node:
-            if child is not None:
-                self.__inspect(child)
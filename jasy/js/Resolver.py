@@ -7,6 +7,8 @@ import jasy.js.Sorter as Sorter
 import jasy.core.Console as Console
 import jasy.item.Class as Class
 
+from jasy.js.DependencyGraph import DependencyGraph
+
 __all__ = ["Resolver"]
 
 class Resolver():
@@ -36,6 +38,9 @@ class Resolver():
         self.__classes = {}
         for project in session.getProjects():
             self.__classes.update(project.getClasses())
+
+        # Dependencies between all available classes. Created on first request.
+        self.__graph = None
         
 
     def addClass(self, classNameOrItem, prepend=False):
@@ -129,9 +134,7 @@ class Resolver():
         if self.__included:
             return self.__included
                 
-        collection = set()
-        for classObj in self.__required:
-            self.__resolveDependencies(classObj, collection)
+        collection = self.getDependencyGraph().getClosure(self.__required, warnings=True)
             
         # Filter excluded classes
         for classObj in self.__excluded:
@@ -143,19 +146,16 @@ class Resolver():
         return self.__included
         
         
-    def getSortedClasses(self):
-        """ Returns a list of sorted classes """
+    def getDependencyGraph(self):
+        """ Returns the dependency graph of all available classes for the current permutation """
 
-        return Sorter.Sorter(self, self.__session).getSortedClasses()
+        if self.__graph is None:
+            self.__graph = DependencyGraph(self.__classes, self.__permutation, self.__fields, self.__session.getClassIndex())
 
+        return self.__graph
 
-    def __resolveDependencies(self, classObj, collection):
-        """ Internal resolver engine which works recursively through all dependencies """
-        
-        collection.add(classObj)
-        dependencies = classObj.getDependencies(self.__permutation, classes=self.__classes, fields=self.__fields)
-        
-        for depObj in dependencies:
-            if not depObj in collection:
-                self.__resolveDependencies(depObj, collection)
-                    
\ No newline at end of file
+
+    def getSortedClasses(self):
+        """ Returns a list of sorted classes """
+
+        return Sorter.Sorter(self, self.__session, self.getDependencyGraph()).getSortedClasses()
@@ -6,6 +6,8 @@
 import time
 import jasy.core.Console as Console
 
+from jasy.js.DependencyGraph import DependencyGraph
+
 __all__ = ["Sorter"]
 
 
@@ -14,7 +16,7 @@ class CircularDependency(Exception):
     
 
 class Sorter:
-    def __init__(self, resolver, session):
+    def __init__(self, resolver, session, graph=None):
         # Keep classes/permutation/fields reference
         # Classes is set(classObj, ...)
         self.__resolver = resolver
@@ -25,6 +27,10 @@ class Sorter:
 
         # Build class name dict
         self.__names = dict([(classObj.getId(), classObj) for classObj in classes])
+
+        # Dependencies between the included classes. The graph of the resolver is reused when
+        # given, it might contain further classes (e.g. excluded ones) which are ignored here.
+        self.__graph = graph or DependencyGraph(self.__names, self.__permutation, self.__fields, session.getClassIndex())
         
         # Initialize fields
         self.__loadDeps = {}
@@ -38,17 +44,16 @@ class Sorter:
         if not self.__sortedClasses:
             Console.debug("Sorting classes...")
             Console.indent()
-            
-            classNames = self.__names
-            for className in classNames:
-                self.__getLoadDeps(classNames[className])
+
+            self.__computeLoadDeps()
 
             result = []
+            added = set()
             requiredClasses = self.__resolver.getRequiredClasses()
             for classObj in requiredClasses:
-                if not classObj in result:
+                if not classObj in added:
                     # Console.debug("Start adding with: %s", classObj)
-                    self.__addSorted(classObj, result)
+                    self.__addSorted(classObj, result, added)
 
             Console.outdent()
             self.__sortedClasses = result
@@ -56,106 +61,196 @@ class Sorter:
         return self.__sortedClasses
 
 
-    def __addSorted(self, classObj, result, postponed=False):
-        """ Adds a single class and its dependencies to the sorted result list """
+    def __addSorted(self, classObj, result, added):
+        """ 
+        Adds a single class and its dependencies to the sorted result list. 
 
-        loadDeps = self.__getLoadDeps(classObj)
-        
-        for depObj in loadDeps:
-            if not depObj in result:
-                self.__addSorted(depObj, result)
+        Load time dependencies are sorted by the number of their own dependencies. This way
+        all dependencies of each entry are already part of the result when it is reached.
+        Classes which are down-priorized by breaks are inserted as soon as possible after 
+        the class which defines the break. Works without recursion.
+        """
+
+        circularDeps = self.__circularDeps
 
-        if classObj in result:
-            return
-            
-        # Console.debug("Adding class: %s", classObj)
-        result.append(classObj)
+        # Stack of iterators over the classes to add followed by the class itself
+        pending = [iter(self.__getLoadDeps(classObj) + [classObj])]
 
-        # Insert circular dependencies as soon as possible
-        if classObj in self.__circularDeps:
-            circularDeps = self.__circularDeps[classObj]
-            for depObj in circularDeps:
-                if not depObj in result:
-                    self.__addSorted(depObj, result, True)
+        while pending:
+            for current in pending[-1]:
+                if current in added:
+                    continue
 
+                # Console.debug("Adding class: %s", current)
+                result.append(current)
+                added.add(current)
+
+                # Insert circular dependencies as soon as possible
+                if current in circularDeps:
+                    postponed = [depObj for depObj in sorted(circularDeps[current], key=self.__getKey) if not depObj in added]
+                    if postponed:
+                        pending.append(iter([depObj for postponedObj in postponed for depObj in self.__getLoadDeps(postponedObj) + [postponedObj]]))
+                        break
+
+            else:
+                pending.pop()
+
+
+    def __getKey(self, classObj):
+        """ Sort key of classes: number of load time dependencies and name for a stable order """
+
+        count = self.__counts.get(classObj)
+        if count is None:
+            loadDeps = self.__loadDeps[classObj]
+            count = self.__counts[classObj] = bin(loadDeps).count("1") if type(loadDeps) is int else len(loadDeps)
+
+        return (count, classObj.getId())
 
 
     def __getLoadDeps(self, classObj):
-        """ Returns load time dependencies of given class """
+        """ Returns load time dependencies of given class (all direct and indirect ones sorted by their own number of dependencies) """
 
-        if not classObj in self.__loadDeps:
-            self.__getLoadDepsRecurser(classObj, [])
+        loadDeps = self.__loadDeps[classObj]
+        if type(loadDeps) is int:
+            positions = self.__positions
 
-        return self.__loadDeps[classObj]
+            # Convert bit set of positions into sorted list of classes
+            result = []
+            while loadDeps:
+                lowest = loadDeps & -loadDeps
+                result.append(positions[lowest.bit_length() - 1])
+                loadDeps ^= lowest
 
+            loadDeps = self.__loadDeps[classObj] = sorted(result, key=self.__getKey)
 
+        return loadDeps
 
-    def __getLoadDepsRecurser(self, classObj, stack):
-        """ 
-        This is the main routine which tries to control over a system
-        of unsorted classes. It directly tries to fullfil every dependency
-        a class have, but has some kind of exception based loop protection
-        to prevent circular dependencies from breaking the build.
-        
-        It respects break information given by file specific meta data, but
-        also adds custom hints where it found recursions. This lead to a valid 
-        sort, but might lead to problems between exeactly the two affected classes.
-        Without doing an exact execution it's not possible to whether found out
-        which of two each-other referencing classes needs to be loaded first.
-        This is basically only interesting in cases where one class needs another
-        during the definition phase which is not the case that often.
-        """
-        
-        if classObj in stack:
-            stack.append(classObj)
-            msg = " >> ".join([x.getId() for x in stack[stack.index(classObj):]])
-            raise CircularDependency("Circular Dependency: %s" % msg)
-    
-        stack.append(classObj)
 
-        classDeps = classObj.getDependencies(self.__permutation, classes=self.__names, fields=self.__fields, warnings=False)
-        classBreaks = classObj.getBreaks(self.__permutation, classes=self.__names)
-        
-        result = set()
-        circular = set()
-        
+    def __getEdges(self, classObj):
+        """ Returns the direct load time dependencies of the given class. Manually defined breaks are omitted. """
+
+        graph = self.__graph
+        classDeps = graph.getDependencies(classObj)
+        classBreaks = graph.getBreaks(classObj)
+
         # Respect manually defined breaks
         # Breaks are dependencies which are down-priorized to break
         # circular dependencies between classes.
+        circular = set()
         for breakObj in classBreaks:
             if breakObj.getId() in self.__names:
                 circular.add(breakObj)
 
-        # Now process the deps of the given class
-        loadDeps = self.__loadDeps
+        if circular:
+            self.__circularDeps[classObj] = circular
+
+        result = []
         for depObj in classDeps:
-            if depObj is classObj:
+            if depObj is classObj or not depObj.getId() in self.__names:
                 continue
-            
-            depName = depObj.getId()
-            
+
             if depObj in classBreaks:
                 Console.debug("Manual Break: %s => %s" % (classObj, depObj))
-                pass
-            
-            elif depObj in loadDeps:
-                result.update(loadDeps[depObj])
-                result.add(depObj)
-        
             else:
-                current = self.__getLoadDepsRecurser(depObj, stack[:])
-        
-                result.update(current)
-                result.add(depObj)
-        
-        # Sort dependencies by number of other dependencies
-        # For performance reasions we access the __loadDeps 
-        # dict directly as this data is already stored
-        result = sorted(result, key=lambda depObj: len(self.__loadDeps[depObj]))
-        
-        loadDeps[classObj] = result
-        
-        if circular:
-            self.__circularDeps[classObj] = circular
-        
+                result.append(depObj)
+
         return result
+
+
+    def __computeLoadDeps(self):
+        """ 
+        Computes the load time dependencies of all classes. Uses Tarjan's algorithm to find
+        strongly connected components (which are circular dependencies) without recursion.
+        Components are found in reverse topological order so that the transitive dependencies
+        of each class are simply the union of the ones of its direct dependencies. These are
+        stored as bit sets (integers) of class positions in this order.
+
+        Finding the components is linear in the number of classes V and edges E. Building the
+        bit sets takes O(E*V/w) as each union touches up to V bits in words of w bits.
+        """
+
+        edges = {}
+        index = {}
+        lowlink = {}
+        stack = []
+        onStack = set()
+
+        # Classes in order of completion and their position in this list
+        positions = []
+        position = {}
+        closures = {}
+
+        for root in sorted(self.__names.values(), key=lambda classObj: classObj.getId()):
+            if root in index:
+                continue
+
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            onStack.add(root)
+
+            edges[root] = self.__getEdges(root)
+            work = [(root, iter(edges[root]))]
+
+            while work:
+                classObj, children = work[-1]
+
+                for depObj in children:
+                    if not depObj in index:
+                        index[depObj] = lowlink[depObj] = len(index)
+                        stack.append(depObj)
+                        onStack.add(depObj)
+
+                        edges[depObj] = self.__getEdges(depObj)
+                        work.append((depObj, iter(edges[depObj])))
+                        break
+
+                    elif depObj in onStack:
+                        lowlink[classObj] = min(lowlink[classObj], index[depObj])
+
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[classObj])
+
+                    if lowlink[classObj] == index[classObj]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            onStack.remove(member)
+                            component.append(member)
+                            if member is classObj:
+                                break
+
+                        if len(component) > 1:
+                            raise CircularDependency("Circular Dependency: %s" % self.__getCycle(component, edges))
+
+                        # All dependencies are completed already
+                        closure = 0
+                        for depObj in edges[classObj]:
+                            closure |= closures[depObj] | (1 << position[depObj])
+
+                        position[classObj] = len(positions)
+                        positions.append(classObj)
+                        closures[classObj] = closure
+
+        self.__positions = positions
+        self.__loadDeps = closures
+        self.__counts = {}
+
+
+    def __getCycle(self, component, edges):
+        """ Returns a readable path of a circular dependency inside the given component """
+
+        members = set(component)
+        path = []
+        seen = {}
+
+        classObj = component[-1]
+        while not classObj in seen:
+            seen[classObj] = len(path)
+            path.append(classObj)
+            classObj = [depObj for depObj in edges[classObj] if depObj in members][0]
+
+        path = path[seen[classObj]:] + [classObj]
+        return " >> ".join([entry.getId() for entry in path])
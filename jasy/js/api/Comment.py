@@ -61,25 +61,34 @@ class Comment():
     Comment class is attached to parsed nodes and used to store all comment related information.
     
     The class supports a new Markdown and TomDoc inspired dialect to make developers life easier and work less repeative.
+
+    Comments are created for every comment in the source code while only a few of them are
+    ever used for documentation. Outdenting and doc processing (tags, params, markdown etc.)
+    is therefore deferred until the text or any of the extracted data is first requested.
     """
     
     # Relation to code
     context = None
     
     # Dictionary of tags
-    tags = None
+    __tags = None
     
     # Dictionary of params
-    params = None
+    __params = None
 
     # List of return types
-    returns = None
+    __returns = None
     
     # Static type
-    type = None
+    __type = None
     
     # Collected text of the comment (without the extracted doc relevant data)
-    text = None
+    __text = None
+
+    # Unprocessed text, indent and line of the comment until it is processed
+    __raw = None
+    __indent = None
+    __lineNo = None
     
     # Text with extracted / parsed data
     __processedText = None
@@ -128,9 +137,23 @@ class Comment():
         else:
             raise CommentException("Invalid comment text: %s" % text, lineNo)
 
+        # Keep data required for processing the text on first request
+        self.__raw = text
+        self.__indent = indent
+        self.__lineNo = lineNo
+
+
+    def __process(self):
+        """Outdents the text and processes doc comments. Only done on first request."""
+
+        text = self.__raw
+        lineNo = self.__lineNo
+
+        self.__raw = None
+
         # Multi line comments need to have their indentation removed
         if "\n" in text:
-            text = self.__outdent(text, indent, lineNo)
+            text = self.__outdent(text, self.__indent, lineNo)
 
         # For single line comments strip the surrounding whitespace
         else:
@@ -138,7 +161,7 @@ class Comment():
             text = text.strip()
 
         # The text of the comment before any processing took place
-        self.text = text
+        self.__text = text
 
 
         # Perform annotation parsing, markdown conversion and code highlighting on doc blocks
@@ -166,7 +189,57 @@ class Comment():
                     plainText += "\n\n" + b["text"] + "\n\n"
 
             # The without any annotations 
-            self.text = plainText.strip()
+            self.__text = plainText.strip()
+
+
+    @property
+    def text(self):
+        """Collected text of the comment (without the extracted doc relevant data)"""
+
+        if self.__raw is not None:
+            self.__process()
+
+        return self.__text
+
+
+    @property
+    def tags(self):
+        """Dictionary of tags"""
+
+        if self.__raw is not None:
+            self.__process()
+
+        return self.__tags
+
+
+    @property
+    def params(self):
+        """Dictionary of params"""
+
+        if self.__raw is not None:
+            self.__process()
+
+        return self.__params
+
+
+    @property
+    def returns(self):
+        """List of return types"""
+
+        if self.__raw is not None:
+            self.__process()
+
+        return self.__returns
+
+
+    @property
+    def type(self):
+        """Static type"""
+
+        if self.__raw is not None:
+            self.__process()
+
+        return self.__type
 
 
     def __splitBlocks(self, text):
@@ -329,6 +402,9 @@ class Comment():
         if not Text.supportsMarkdown:
             raise UserError("Markdown is not supported by the system. Documentation comments could converted to HTML.")
 
+        if self.__raw is not None:
+            self.__process()
+
         if highlight:
 
             if self.__highlightedText is None:
@@ -369,14 +445,19 @@ class Comment():
     
 
     def getTags(self):
+        # Tags are only extracted from doc comments and always start with a hash
+        if self.__raw is not None and (self.variant != "doc" or not "#" in self.__raw):
+            return None
+
         return self.tags
         
 
     def hasTag(self, name):
-        if not self.tags:
+        tags = self.getTags()
+        if not tags:
             return False
 
-        return name in self.tags
+        return name in tags
 
 
     def __outdent(self, text, indent, startLineNo):
@@ -523,7 +604,7 @@ class Comment():
         """
 
         def collectReturn(match):
-            self.returns = self.__splitTypeList(match.group(1))
+            self.__returns = self.__splitTypeList(match.group(1))
             return ""
             
         return returnMatcher.sub(collectReturn, text)
@@ -536,7 +617,7 @@ class Comment():
         """
 
         def collectType(match):
-            self.type = match.group(1).strip()
+            self.__type = match.group(1).strip()
             return ""
 
         return typeMatcher.sub(collectType, text)
@@ -550,18 +631,18 @@ class Comment():
         """
         
         def collectTags(match):
-             if not self.tags:
-                 self.tags = {}
+             if not self.__tags:
+                 self.__tags = {}
 
              name = match.group(1)
              param = match.group(3)
 
-             if name in self.tags:
-                 self.tags[name].add(param)
+             if name in self.__tags:
+                 self.__tags[name].add(param)
              elif param:
-                 self.tags[name] = set([param])
+                 self.__tags[name] = set([param])
              else:
-                 self.tags[name] = True
+                 self.__tags[name] = True
 
              return ""
 
@@ -581,10 +662,10 @@ class Comment():
             if paramTypes:
                 paramTypes = self.__splitTypeList(paramTypes)
             
-            if self.params is None:
-                self.params = {}
+            if self.__params is None:
+                self.__params = {}
 
-            params = self.params
+            params = self.__params
             fullName = match.group(1).strip()
             names = fullName.split('.')
 
@@ -47,9 +47,15 @@ It can figure out combined expressions as well like:
 
 """
 
-__all__ = ["cleanup"]
+__all__ = ["cleanup", "cleanupPatched", "isDecidable", "Pass"]
 
 import jasy.core.Console as Console
+import jasy.parse.Pipeline as Pipeline
+
+
+# Types of nodes which might be removed by cleanupNode()
+branchTypes = ("if", "hook", "switch")
+
 
 def cleanup(node):
     """
@@ -59,26 +65,102 @@ def cleanup(node):
     Console.debug("Removing dead code branches...")
 
     Console.indent()
-    result = __cleanup(node)
+    cleanupPass = Pass()
+    Pipeline.Pipeline([cleanupPass]).run(node)
     Console.outdent()
 
-    return result
+    return cleanupPass.optimized
 
 
-def __cleanup(node):
+def cleanupPatched(tree, patched):
     """
-    Reprocesses JavaScript to remove dead paths 
+    Removes dead paths which are caused by the given replaced nodes (e.g. by injecting values
+    of permutations). Only processes the branches which have one of these nodes inside their
+    condition. Same result as cleanup() when the tree had no dead paths before patching.
+    """
+
+    Console.debug("Removing dead code branches of %s patched nodes...", len(patched))
+    Console.indent()
+
+    # Branches are outdated when one of the patched nodes is part of their condition (nodes are not hashable => by ID)
+    outdated = {}
+    for node in patched:
+        branches = []
+        parent = getattr(node, "parent", None)
+        while parent is not None:
+            if parent.type in branchTypes and node is __getCondition(parent):
+                branches.append(parent)
+
+            node = parent
+            parent = getattr(node, "parent", None)
+
+        # Ignore nodes which are not part of the tree anymore (e.g. inside other patched nodes)
+        if node is tree:
+            for branch in branches:
+                outdated[id(branch)] = branch
+
+    # Outer branches are processed with all their children
+    outer = []
+    for branch in outdated.values():
+        parent = branch.parent
+        while parent is not None and not id(parent) in outdated:
+            parent = getattr(parent, "parent", None)
+
+        if parent is None:
+            outer.append(branch)
+
+    optimized = False
+    cleanupPass = Pass()
+    pipeline = Pipeline.Pipeline([cleanupPass])
+
+    for branch in outer:
+        pipeline.run(branch)
+        optimized = optimized or cleanupPass.optimized
+
+    Console.outdent()
+
+    return optimized
+
+
+def isDecidable(node):
+    """
+    Whether the given branch (see branchTypes) can be decided without knowing any
+    values e.g. "if (true)" (which means that cleanupNode() might remove it).
+    """
+
+    if node.type == "switch":
+        return node.discriminant.type in ("string", "number")
+
+    return __checkCondition(__getCondition(node)) is not None
+
+
+
+class Pass(Pipeline.Pass):
+    """
+    Removes dead paths from inside to outside (after all children of a node are processed)
+    """
+
+    name = "deadcode"
+
+    def __init__(self):
+        self.optimized = False
+
+    def begin(self, tree):
+        self.optimized = False
+
+    def leave(self, node):
+        if cleanupNode(node):
+            self.optimized = True
+
+
+
+def cleanupNode(node):
+    """
+    Removes the given node when it is a dead path (its children are already processed)
     """
     
     optimized = False
     
-    # Process from inside to outside
-    for child in reversed(node):
-        # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-        if child != None:
-            if __cleanup(child):
-                optimized = True
-        
     # Optimize if cases
     if node.type == "if":
         check = __checkCondition(node.condition)
@@ -120,7 +202,7 @@ def __cleanup(node):
                 block = child[len(child)-1]
                 if len(block) == 0 or block[len(block)-1].type != "break":
                     Console.warn("Could not optimize switch statement (at line %s) because of fallthrough break statement.", node.line)
-                    return False
+                    return optimized
 
             if child.type == "default":
                 fallback = child.statements
@@ -147,6 +229,19 @@ def __cleanup(node):
 # Implementation
 #
 
+def __getCondition(node):
+    """
+    Returns the node which decides about the branch to use
+    """
+
+    if node.type == "if":
+        return node.condition
+    elif node.type == "hook":
+        return node[0]
+    else:
+        return node.discriminant
+
+
 def __checkCondition(node):
     """
     Checks a comparison for equality. Returns None when
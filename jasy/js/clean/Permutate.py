@@ -9,7 +9,7 @@ import jasy.core.Console as Console
 from jasy.js.util import *
 
 
-__all__ = ["patch"]
+__all__ = ["patch", "patchAccesses"]
 
 
 def __translateToJS(code):
@@ -37,100 +37,131 @@ def patch(node, permutation):
     modified = False
     
     if node.type == "dot" and node.parent.type == "call":
-        assembled = assembleDot(node)
-        
-        # jasy.Env.getValue(key)
-        if assembled == "jasy.Env.getValue" and node.parent.type == "call":
-            callNode = node.parent
-            params = callNode[1]
-            name = params[0].value
-
-            Console.debug("Found jasy.Env.getValue(%s) in line %s", name, node.line)
+        if __patchCall(node.parent, assembleDot(node), permutation) is not None:
+            modified = True
 
-            replacement = __translateToJS(permutation.get(name))
-            if replacement:
-                replacementNode = Parser.parseExpression(replacement)
-                callNode.parent.replace(callNode, replacementNode)
+    # Process children
+    for child in reversed(node):
+        if child != None:
+            if patch(child, permutation):
                 modified = True
 
-                Console.debug("Replaced with %s", replacement)
-         
-        
-        # jasy.Env.isSet(key, expected)
-        # also supports boolean like: jasy.Env.isSet(key)
-        elif assembled == "jasy.Env.isSet" and node.parent.type == "call":
-
-            callNode = node.parent
-            params = callNode[1]
-            name = params[0].value
-
-            Console.debug("Found jasy.Env.isSet(%s) in line %s", name, node.line)
-
-            replacement = __translateToJS(permutation.get(name))
-
-            if replacement != None:
-                # Auto-fill second parameter with boolean "true"
-                expected = params[1] if len(params) > 1 else Parser.parseExpression("true")
-
-                if expected.type in ("string", "number", "true", "false"):
-                    parsedReplacement = Parser.parseExpression(replacement)
-                    expectedValue = getattr(expected, "value", None)
-                    
-                    if expectedValue is not None:
-                        if getattr(parsedReplacement, "value", None) is not None:
-                            replacementResult = parsedReplacement.value in str(expected.value).split("|")
-                        else:
-                            replacementResult = parsedReplacement.type in str(expected.value).split("|")
-                    else:
-                        replacementResult = parsedReplacement.type == expected.type
+    return modified
 
-                    # Do actual replacement
-                    replacementNode = Parser.parseExpression("true" if replacementResult else "false")
-                    callNode.parent.replace(callNode, replacementNode)
-                    modified = True
 
-                    Console.debug("Replaced with %s", "true" if replacementResult else "false")
+def patchAccesses(tree, permutation, accesses):
+    """
+    Replaces the field accessing calls at the given positions (see Facts and getNodePath()) with
+    incoming values. Same as patch() but without visiting all nodes. Returns the list of replacement
+    nodes (e.g. for cleaning up dead code around them) or None when the positions do not match the tree.
+    """
 
-        
-        # jasy.Env.select(key, map)
-        elif assembled == "jasy.Env.select" and node.parent.type == "call":
-            Console.debug("Found jasy.Env.select() in line %s", node.line)
-
-            callNode = node.parent
-            params = callNode[1]
-            replacement = __translateToJS(permutation.get(params[0].value))
-            if replacement:
-                parsedReplacement = Parser.parseExpression(replacement)
-                if parsedReplacement.type != "string":
-                    raise Exception("jasy.Env.select requires that the given replacement is of type string.")
+    # Resolve all calls first as patching modifies the tree
+    calls = []
+    for path in accesses:
+        callNode = resolveNodePath(tree, path)
+        if callNode is None or callNode.type != "call" or len(callNode) < 2:
+            return None
 
-                # Directly try to find matching identifier in second param (map)
-                objectInit = params[1]
-                if objectInit.type == "object_init":
-                    fallbackNode = None
-                    for propertyInit in objectInit:
-                        if propertyInit[0].value == "default":
-                            fallbackNode = propertyInit[1]
+        assembled = assembleDot(callNode[0]) if callNode[0].type == "dot" else None
+        if assembled not in ("jasy.Env.getValue", "jasy.Env.isSet", "jasy.Env.select"):
+            return None
 
-                        elif parsedReplacement.value in str(propertyInit[0].value).split("|"):
-                            callNode.parent.replace(callNode, propertyInit[1])
-                            modified = True
-                            break
+        calls.append((callNode, assembled))
 
-                    if not modified and fallbackNode is not None:
-                        callNode.parent.replace(callNode, fallbackNode)
-                        modified = True
+    # Same order as in patch(): inner calls (e.g. in parameters) and later calls first
+    patched = []
+    for callNode, assembled in reversed(calls):
+        replacementNode = __patchCall(callNode, assembled, permutation)
+        if replacementNode is not None:
+            patched.append(replacementNode)
 
-                        Console.debug("Updated with %s", replacement)
+    return patched
 
 
-    # Process children
-    for child in reversed(node):
-        if child != None:
-            if patch(child, permutation):
-                modified = True
+def __patchCall(callNode, assembled, permutation):
+    """ Replaces the given call of the given method with its value. Returns the replacement node (if any). """
 
-    return modified
+    node = callNode[0]
+
+    # jasy.Env.getValue(key)
+    if assembled == "jasy.Env.getValue":
+        params = callNode[1]
+        name = params[0].value
+
+        Console.debug("Found jasy.Env.getValue(%s) in line %s", name, node.line)
+
+        replacement = __translateToJS(permutation.get(name))
+        if replacement:
+            replacementNode = Parser.parseExpression(replacement)
+            callNode.parent.replace(callNode, replacementNode)
+
+            Console.debug("Replaced with %s", replacement)
+            return replacementNode
+     
+    
+    # jasy.Env.isSet(key, expected)
+    # also supports boolean like: jasy.Env.isSet(key)
+    elif assembled == "jasy.Env.isSet":
+        params = callNode[1]
+        name = params[0].value
+
+        Console.debug("Found jasy.Env.isSet(%s) in line %s", name, node.line)
 
+        replacement = __translateToJS(permutation.get(name))
 
-    
\ No newline at end of file
+        if replacement != None:
+            # Auto-fill second parameter with boolean "true"
+            expected = params[1] if len(params) > 1 else Parser.parseExpression("true")
+
+            if expected.type in ("string", "number", "true", "false"):
+                parsedReplacement = Parser.parseExpression(replacement)
+                expectedValue = getattr(expected, "value", None)
+                
+                if expectedValue is not None:
+                    if getattr(parsedReplacement, "value", None) is not None:
+                        replacementResult = parsedReplacement.value in str(expected.value).split("|")
+                    else:
+                        replacementResult = parsedReplacement.type in str(expected.value).split("|")
+                else:
+                    replacementResult = parsedReplacement.type == expected.type
+
+                # Do actual replacement
+                replacementNode = Parser.parseExpression("true" if replacementResult else "false")
+                callNode.parent.replace(callNode, replacementNode)
+
+                Console.debug("Replaced with %s", "true" if replacementResult else "false")
+                return replacementNode
+
+    
+    # jasy.Env.select(key, map)
+    elif assembled == "jasy.Env.select":
+        Console.debug("Found jasy.Env.select() in line %s", node.line)
+
+        params = callNode[1]
+        replacement = __translateToJS(permutation.get(params[0].value))
+        if replacement:
+            parsedReplacement = Parser.parseExpression(replacement)
+            if parsedReplacement.type != "string":
+                raise Exception("jasy.Env.select requires that the given replacement is of type string.")
+
+            # Directly try to find matching identifier in second param (map)
+            objectInit = params[1]
+            if objectInit.type == "object_init":
+                fallbackNode = None
+                for propertyInit in objectInit:
+                    if propertyInit[0].value == "default":
+                        fallbackNode = propertyInit[1]
+
+                    elif parsedReplacement.value in str(propertyInit[0].value).split("|"):
+                        replacementNode = propertyInit[1]
+                        callNode.parent.replace(callNode, replacementNode)
+                        return replacementNode
+
+                if fallbackNode is not None:
+                    callNode.parent.replace(callNode, fallbackNode)
+
+                    Console.debug("Updated with %s", replacement)
+                    return fallbackNode
+
+    return None
@@ -5,10 +5,11 @@
 
 import jasy.js.parse.Node as Node
 import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.parse.Pipeline as Pipeline
 
 import jasy.core.Console as Console
 
-__all__ = ["cleanup", "Error"]
+__all__ = ["cleanup", "Error", "Pass"]
 
 
 #
@@ -27,22 +28,28 @@ class Error(Exception):
 
 def cleanup(node):
     """
+    Removes unused variables, params and functions. Requires up-to-date scope data which is
+    created when not attached to the given node.
     """
     
-    if not hasattr(node, "variables"):
+    if not hasattr(node, "scope"):
         ScopeScanner.scan(node)
 
     # Re cleanup until nothing to remove is found
     x = 0
     cleaned = False
     
+    cleanupPass = Pass()
+    pipeline = Pipeline.Pipeline([cleanupPass])
+
     Console.debug("Removing unused variables...")
     while True:
         x = x + 1
         #debug("Removing unused variables [Iteration: %s]...", x)
         Console.indent()
 
-        if __cleanup(node):
+        pipeline.run(node)
+        if cleanupPass.cleaned:
             ScopeScanner.scan(node)
             cleaned = True
             Console.outdent()
@@ -54,44 +61,69 @@ def cleanup(node):
 
 
 
+class Pass(Pipeline.Pass):
+    """ The scanner part which looks for scopes with unused variables/params """
+
+    name = "unused"
+
+    def __init__(self):
+        self.cleaned = False
+
+    def begin(self, tree):
+        self.cleaned = False
+
+    def leave(self, node):
+        if node.type == "script" and node.scope.unused and hasattr(node, "parent"):
+            if cleanupScope(node, node.scope.unused):
+                self.cleaned = True
+
+
+
 #
 # Implementation
 #
 
-def __cleanup(node):
-    """ The scanner part which looks for scopes with unused variables/params """
-    
-    cleaned = False
-    
-    for child in list(node):
-        if child != None and __cleanup(child):
-            cleaned = True
+def cleanupScope(node, unused):
+    """ 
+    The cleanup part which always processes one scope and cleans up params and
+    variable definitions which are unused (from inside to outside)
+    """
 
-    if node.type == "script" and node.scope.unused and hasattr(node, "parent"):
-        if __recurser(node, node.scope.unused):
-            cleaned = True
+    retval = False
 
-    return cleaned
+    # Children are iterated in-place (without copying the list of children) which
+    # means that the sibling following a removed node is not processed in this run
+    pending = [[node, 0]]
+    while pending:
+        entry = pending[-1]
+        current, pos = entry
+
+        # Process children
+        if current.type != "function" and pos < len(current):
+            entry[1] = pos + 1
+            child = current[pos]
+
+            # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
+            if child != None:
+                pending.append([child, 0])
+
+            continue
+
+        pending.pop()
+        if __cleanupNode(current, unused):
+            retval = True
+
+    return retval
             
             
             
-def __recurser(node, unused):
+def __cleanupNode(node, unused):
     """ 
-    The cleanup part which always processes one scope and cleans up params and
-    variable definitions which are unused
+    Cleans up the given node of a scope (its children are already processed)
     """
     
     retval = False
     
-    # Process children
-    if node.type != "function":
-        for child in node:
-            # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-            if child != None:
-                if __recurser(child, unused):
-                    retval = True
-                    
-
     if node.type == "script" and hasattr(node, "parent"):
         # Remove unused parameters
         params = getattr(node.parent, "params", None)
@@ -5,13 +5,14 @@
 
 import jasy.js.parse.Node as Node
 import jasy.js.output.Compressor as Compressor
+import jasy.parse.Pipeline as Pipeline
 
 import jasy.js.parse.Lang
 
 import jasy.core.Console as Console
 
 
-__all__ = ["optimize", "Error"]
+__all__ = ["optimize", "Error", "Pass"]
 
 
 class Error(Exception):
@@ -22,20 +23,28 @@ class Error(Exception):
 def optimize(node):
     Console.debug("Reducing block complexity...")
     Console.indent()
-    result = __optimize(node, Compressor.Compressor())
+    Pipeline.Pipeline([Pass()]).run(node)
     Console.outdent()
-    return result
     
 
-def __optimize(node, compressor):
-    # Process from inside to outside
-    # on a copy of the node to prevent it from forgetting children when structure is modified
-    for child in list(node):
-        # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-        if child != None:
-            __optimize(child, compressor)
-    
-    
+class Pass(Pipeline.Pass):
+    """Reduces blocks and statements from inside to outside (after all children of a node are processed)"""
+
+    name = "blocks"
+
+    # Statements need to be reduced after all var statements of the scope were converted
+    requires = ("declarations",)
+
+    def begin(self, tree):
+        self.__compressor = Compressor.Compressor()
+
+    def leave(self, node):
+        reduce(node, self.__compressor)
+
+
+def reduce(node, compressor):
+    """Reduces the given node (its children are already processed)"""
+
     # Cleans up empty semicolon statements (or pseudo-empty)
     if node.type == "semicolon" and node.parent.type in ("block", "script"):
         expr = getattr(node, "expression", None)
@@ -442,24 +451,27 @@ def compactIf(node, thenPart, condition):
 def containsIfElse(node):
     """ Checks whether the given node contains another if-else-statement """
     
-    if node.type == "if" and hasattr(node, "elsePart"):
-        return True
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if current.type == "if" and hasattr(current, "elsePart"):
+            return True
 
-    for child in node:
-        if child is None:
-            pass
-        
-        # Blocks reset this if-else problem so we ignore them 
-        # (and their content) for our scan.
-        elif child.type == "block":
-            pass
+        for child in current:
+            if child is None:
+                pass
             
-        # Script blocks reset as well (protected by other function)
-        elif child.type == "script":
-            pass
-        
-        elif containsIfElse(child):
-            return True
+            # Blocks reset this if-else problem so we ignore them 
+            # (and their content) for our scan.
+            elif child.type == "block":
+                pass
+                
+            # Script blocks reset as well (protected by other function)
+            elif child.type == "script":
+                pass
+            
+            else:
+                pending.append(child)
 
     return False
     
@@ -467,24 +479,27 @@ def containsIfElse(node):
 def containsIf(node):
     """ Checks whether the given node contains another if-statement """
     
-    if node.type == "if":
-        return True
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if current.type == "if":
+            return True
 
-    for child in node:
-        if child is None:
-            pass
-        
-        # Blocks reset this if-else problem so we ignore them 
-        # (and their content) for our scan.
-        if child.type == "block":
-            pass
+        for child in current:
+            if child is None:
+                pass
+            
+            # Blocks reset this if-else problem so we ignore them 
+            # (and their content) for our scan.
+            elif child.type == "block":
+                pass
 
-        # Script blocks reset as well (protected by other function)
-        elif child.type == "script":
-            pass
+            # Script blocks reset as well (protected by other function)
+            elif child.type == "script":
+                pass
 
-        elif containsIf(child):
-            return True
+            else:
+                pending.append(child)
 
     return False    
 
@@ -4,9 +4,10 @@
 #
 
 import jasy.js.parse.Node as Node
+import jasy.parse.Pipeline as Pipeline
 import jasy.core.Console as Console
 
-__all__ = ["optimize", "Error"]
+__all__ = ["optimize", "Error", "Pass"]
 
 
 
@@ -22,28 +23,21 @@ class Error(Exception):
 def optimize(node):
     Console.debug("Combining declarations...")
     Console.indent()
-    result = __optimize(node)
+    Pipeline.Pipeline([Pass()]).run(node)
     Console.outdent()
-    return result
     
 
-def __optimize(node):
-    
-    # stabilize list during processing modifyable stuff
-    copy = node
-    if node.type in ("script", "block"):
-        copy = list(node)
-    
-    for child in copy:
-        # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-        if child != None:
-            __optimize(child)
-        
-    if node.type in ("script", "block"):
-        __combineSiblings(node)
-        
-    if node.type == "script":
-        __combineVarStatements(node)
+class Pass(Pipeline.Pass):
+    """Combines declarations from inside to outside (after all children of a node are processed)"""
+
+    name = "declarations"
+
+    def leave(self, node):
+        if node.type in ("script", "block"):
+            combineSiblings(node)
+            
+        if node.type == "script":
+            combineVarStatements(node)
 
 
 
@@ -52,7 +46,7 @@ def __optimize(node):
 # Merge direct variable siblings
 #
 
-def __combineSiblings(node):
+def combineSiblings(node):
     """Backwards processing and insertion into previous sibling if both are declarations""" 
     length = len(node)
     pos = length-1
@@ -88,7 +82,7 @@ def __combineSiblings(node):
 # Merge var statements, convert in-place to assignments in other locations (quite complex)
 #
 
-def __combineVarStatements(node):
+def combineVarStatements(node):
     """Top level method called to optimize a script node"""
     
     if len(node.scope.declared) == 0:
@@ -130,23 +124,20 @@ def __combineVarStatements(node):
 def __findFirstVarStatement(node):
     """Returns the first var statement of the given node. Ignores inner functions."""
     
-    if node.type == "var":
-        # Ignore variable blocks which are used as an iterator in for-in loops
-        # In this case we return False, so that a new collector "var" is being created
-        if getattr(node, "rel", None) == "iterator":
-            return False
-        else:
-            return node
-        
-    for child in node:
-        if child.type == "function":
-            continue
-        
-        result = __findFirstVarStatement(child)
-        if result:
-            return result
-        elif result is False:
-            return False
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if current.type == "var":
+            # Ignore variable blocks which are used as an iterator in for-in loops
+            # In this case we return False, so that a new collector "var" is being created
+            if getattr(current, "rel", None) == "iterator":
+                return False
+            else:
+                return current
+            
+        for child in reversed(current):
+            if child is not None and child.type != "function":
+                pending.append(child)
     
     return None
         
@@ -213,23 +204,26 @@ def __createIdentifier(value):
 
 
 def __patchVarStatements(node, firstVarStatement):
-    """Patches all variable statements in the given node (works recursively) and replace them with assignments."""
-    if node is firstVarStatement:
-        return
-        
-    elif node.type == "function":
-        # Don't process inner functions/scopes
-        return
-        
-    elif node.type == "var":
-        __rebuildAsAssignment(node, firstVarStatement)
-        
-    else:
-        # Recursion into children
-        # Create a cast to list() to keep loop stable during modification
-        for child in list(node):
-            if child is not None:
-                __patchVarStatements(child, firstVarStatement)
+    """Patches all variable statements in the given node (including its children) and replace them with assignments."""
+    
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if current is firstVarStatement:
+            continue
+            
+        elif current.type == "function":
+            # Don't process inner functions/scopes
+            continue
+            
+        elif current.type == "var":
+            __rebuildAsAssignment(current, firstVarStatement)
+            
+        else:
+            # Children are collected before processing them which keeps the walk stable during modification
+            for child in reversed(current):
+                if child is not None:
+                    pending.append(child)
             
             
 def __rebuildAsAssignment(node, firstVarStatement):
@@ -5,8 +5,9 @@
 
 import zlib, string, re
 import jasy.core.Console as Console
+import jasy.parse.Pipeline as Pipeline
 
-__all__ = ["optimize", "Error"]
+__all__ = ["optimize", "Error", "Pass"]
 
 
 
@@ -30,82 +31,85 @@ def optimize(node, contextId=""):
     Console.debug("Crypting private fields...")
     Console.indent()
     
-    coll = __search(node)
-
-    repl = {}
-    for name in coll:
-        repl[name] = "__%s" % __encode("%s.%s" % (contextId, name[2:]))
-        Console.debug("Replacing private field %s with %s (context: %s)", name, repl[name], contextId)
-    
-    Console.debug("Found %s private fields" % len(repl))
-    modified, reduction = __replace(node, repl)
+    cryptPass = Pass(contextId)
+    Pipeline.Pipeline([cryptPass]).run(node)
     
-    Console.debug("Reduced size by %s bytes" % reduction)
     Console.outdent()
     
-    return modified
-    
+    return cryptPass.modified
 
 
-#
-# Internal API
-#
 
-__matcher = re.compile("^__[a-zA-Z0-9]+$")
+class Pass(Pipeline.Pass):
+    """
+    Replaces the names of private fields (starting with two underscores) with a hash based on the
+    given context. Private fields are collected while walking the tree. The accesses found are
+    replaced after the walk (when all private fields are known).
+    """
 
+    name = "privates"
 
-def __search(node, coll=None):
-    
-    if coll is None:
-        coll = set()
-    
-    if node.type == "assign" and node[0].type == "dot":
-        # Only last dot child is relevant
-        if node[0][1].type == "identifier":
-            name = node[0][1].value
-            if type(name) is str and __matcher.match(name):
-                coll.add(name)
-        
-    elif node.type == "property_init":
-        name = node[0].value
-        if type(name) is str and __matcher.match(name):
-            coll.add(name)
-
-    for child in node:
-        # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-        if child != None:
-            __search(child, coll)
-            
-    return coll
+    # Private fields are accessed through the (renamed) variables
+    after = ("variables",)
 
+    def __init__(self, contextId=""):
+        self.__contextId = contextId
+        self.modified = False
 
+    def begin(self, tree):
+        self.__fields = set()
+        self.__accesses = []
+        self.modified = False
 
-def __replace(node, repl):
-    modified = False
-    reduction = 0
-    
-    if node.type == "identifier" and getattr(node, "parent", None):
-        # Only rename items which are part of a dot operator
-        if node.parent.type in ("dot", "property_init") and type(node.value) is str and __matcher.match(node.value):
+    def enter(self, node):
+        if node.type == "assign" and node[0].type == "dot":
+            # Only last dot child is relevant
+            if node[0][1].type == "identifier":
+                name = node[0][1].value
+                if type(name) is str and matcher.match(name):
+                    self.__fields.add(name)
+            
+        elif node.type == "property_init":
+            name = node[0].value
+            if type(name) is str and matcher.match(name):
+                self.__fields.add(name)
+
+        elif node.type == "identifier" and getattr(node, "parent", None):
+            # Only rename items which are part of a dot operator
+            if node.parent.type in ("dot", "property_init") and type(node.value) is str and matcher.match(node.value):
+                self.__accesses.append(node)
+
+    def finish(self, tree):
+        contextId = self.__contextId
+
+        repl = {}
+        for name in self.__fields:
+            repl[name] = "__%s" % encode("%s.%s" % (contextId, name[2:]))
+            Console.debug("Replacing private field %s with %s (context: %s)", name, repl[name], contextId)
+        
+        Console.debug("Found %s private fields" % len(repl))
+
+        reduction = 0
+        for node in self.__accesses:
             if node.value in repl:
                 reduction = reduction + len(node.value) - len(repl[node.value])
                 node.value = repl[node.value]
-                modified = True
+                self.modified = True
             else:
                 raise Error(node.value, node.line)
-        
-    for child in node:
-        # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-        if child != None:
-            subModified, subReduction = __replace(child, repl)
-            modified = modified or subModified
-            reduction = reduction + subReduction
-            
-    return modified, reduction
-    
-    
-    
-def __encode(value, alphabet=string.ascii_letters+string.digits):
+
+        Console.debug("Reduced size by %s bytes" % reduction)
+
+
+
+#
+# Internal API
+#
+
+matcher = re.compile("^__[a-zA-Z0-9]+$")
+
+
+def encode(value, alphabet=string.ascii_letters+string.digits):
     
     num = zlib.adler32(value.encode("utf-8"))
     
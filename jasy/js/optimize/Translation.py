@@ -8,6 +8,7 @@ import re, copy, polib
 import jasy.js.parse.Node as Node
 import jasy.item.Translation as Translation
 
+from jasy.parse.CompactTree import CompactNode
 from jasy import UserError
 import jasy.core.Console as Console
 
@@ -16,7 +17,7 @@ import jasy.core.Console as Console
 # Public API
 #
 
-__all__ = ["hasText", "optimize", "collectTranslations"]
+__all__ = ["hasText", "optimize", "collectTranslations", "collectCall"]
 
 translationFunctions = ("tr", "trc", "trn", "marktr")
 
@@ -64,20 +65,7 @@ def parseParams(params, funcName):
 
 def __collectionRecurser(node, collection):
     if node.type == "call":
-        funcName = None
-        
-        if node[0].type == "identifier":
-            funcName = node[0].value
-        elif node[0].type == "dot" and node[0][1].type == "identifier":
-            funcName = node[0][1].value
-        
-        if funcName in translationFunctions:
-            translationId = Translation.generateId(*parseParams(node[1], funcName))
-            if translationId:
-                if translationId in collection:
-                    collection[translationId].append(node.line)
-                else:
-                    collection[translationId] = [node.line]
+        collectCall(node, collection)
 
     # Process children
     for child in node:
@@ -87,7 +75,34 @@ def __collectionRecurser(node, collection):
     return collection
 
 
+def collectCall(node, collection):
+    """Adds the translation used by the given call node (if any) to the collection (ID => lines)"""
+
+    funcName = None
+    
+    if node[0].type == "identifier":
+        funcName = node[0].value
+    elif node[0].type == "dot" and node[0][1].type == "identifier":
+        funcName = node[0][1].value
+    
+    if funcName in translationFunctions:
+        translationId = Translation.generateId(*parseParams(node[1], funcName))
+        if translationId:
+            if translationId in collection:
+                collection[translationId].append(node.line)
+            else:
+                collection[translationId] = [node.line]
+
+
 def collectTranslations(node):
+    # Compact trees directly offer all calls in document order
+    if isinstance(node, CompactNode):
+        collection = dict()
+        for call in node.findNodes("call"):
+            collectCall(call, collection)
+
+        return collection
+
     return __collectionRecurser(node, dict())
 
 
@@ -19,6 +19,16 @@ unicode_encoder = json.JSONEncoder(ensure_ascii=False)
 #
 
 class Compressor:
+    """
+    Generates compact code from syntax trees.
+
+    All code is appended as fragments to a shared buffer instead of concatenating the
+    strings of all children at every node. Decisions depending on the code of children
+    (e.g. spacing between operators or trailing semicolons) look at the fragments written
+    since a remembered position (mark) of the buffer. Spaces which depend on the start of
+    the following code are reserved as empty fragments first and filled in afterwards.
+    """
+
     __semicolonSymbol = ";"
     __commaSymbol = ","
     
@@ -32,6 +42,10 @@ class Compressor:
                 self.__commaSymbol = ",\n"
             
         self.__forcedSemicolon = False
+        self.__buffer = None
+
+        # Methods generating the code of each node type
+        self.__handlers = {}
 
 
 
@@ -39,50 +53,94 @@ class Compressor:
     # Main
     #
 
-    def compress(self, node):
+    def compress(self, node, stream=None):
+        """
+        Returns the compressed code of the given node. When a stream (any object with a write()
+        method e.g. a file) is given, the code is written to it instead and nothing is returned.
+        Statements of scripts are written one by one so that only the code of the current
+        statement is kept in memory.
+        """
+
+        buffer = self.__buffer = []
+
+        try:
+            if stream is None:
+                self.__emit(node)
+                return "".join(buffer)
+
+            # Statements on the top level do not depend on the code of each other
+            if node.type == "script" and not getattr(node, "parenthesized", None):
+                for child in node:
+                    self.__emit(child)
+                    stream.write("".join(buffer))
+                    del buffer[:]
+
+            else:
+                self.__emit(node)
+                stream.write("".join(buffer))
+
+        finally:
+            self.__buffer = None
+
+
+    def __emit(self, node):
+        """Appends the code of the given node to the buffer"""
+
+        buffer = self.__buffer
         type = node.type
-        result = None
+
+        parenthesized = getattr(node, "parenthesized", None)
+        if parenthesized:
+            buffer.append("(")
     
         if type in self.__simple:
-            result = type
+            buffer.append(type)
+
         elif type in self.__prefixes:
             if getattr(node, "postfix", False):
-                result = self.compress(node[0]) + self.__prefixes[node.type]
+                self.__emit(node[0])
+                buffer.append(self.__prefixes[type])
             else:
-                result = self.__prefixes[node.type] + self.compress(node[0])
+                buffer.append(self.__prefixes[type])
+                self.__emit(node[0])
         
         elif type in self.__dividers:
-            first = self.compress(node[0])
-            second = self.compress(node[1])
-            divider = self.__dividers[node.type]
+            divider = self.__dividers[type]
             
             # Fast path
-            if node.type not in ("plus", "minus"):
-                result = "%s%s%s" % (first, divider, second)
+            if type != "plus" and type != "minus":
+                self.__emit(node[0])
+                buffer.append(divider)
+                self.__emit(node[1])
                 
             # Special code for dealing with situations like x + ++y and y-- - x
             else:
-                result = first
-                if first.endswith(divider):
-                    result += " "
-            
-                result += divider
+                mark = len(buffer)
+                self.__emit(node[0])
+                if self.__endsWith(mark, divider):
+                    buffer.append(" ")
             
-                if second.startswith(divider):
-                    result += " "
-                
-                result += second
+                buffer.append(divider)
+
+                space = len(buffer)
+                buffer.append("")
+                self.__emit(node[1])
+                if self.__startsWith(space + 1, divider):
+                    buffer[space] = " "
 
         else:
-            try:
-                result = getattr(self, "type_%s" % type)(node)
-            except AttributeError:
-                raise Exception("Compressor does not support type '%s' from line %s in file %s" % (type, node.line, node.getFileName()))
+            handler = self.__handlers.get(type)
+            if handler is None:
+                handler = getattr(self, "type_%s" % type, None)
+                if handler is None:
+                    raise Exception("Compressor does not support type '%s' from line %s in file %s" % (type, node.line, node.getFileName()))
+
+                self.__handlers[type] = handler
+
+            handler(node)
             
-        if getattr(node, "parenthesized", None):
-            return "(%s)" % result
-        else:
-            return result
+        if parenthesized:
+            buffer.append(")")
     
     
     
@@ -90,36 +148,106 @@ class Compressor:
     # Helpers
     #
     
+    def __capture(self, node):
+        """Returns the code of the given node instead of appending it to the buffer"""
+
+        buffer = self.__buffer
+        mark = len(buffer)
+
+        self.__emit(node)
+        result = "".join(buffer[mark:])
+        del buffer[mark:]
+
+        return result
+
+    def __endsWith(self, mark, suffix):
+        """Whether the code written since the given mark ends with the given suffix"""
+
+        buffer = self.__buffer
+        pos = len(buffer)
+        tail = ""
+
+        while pos > mark and len(tail) < len(suffix):
+            pos -= 1
+            tail = buffer[pos] + tail
+
+        return tail.endswith(suffix)
+
+    def __startsWith(self, mark, prefix):
+        """Whether the code written since the given mark starts with the given prefix (or one of the given prefixes)"""
+
+        buffer = self.__buffer
+        length = max(map(len, prefix)) if type(prefix) is tuple else len(prefix)
+        pos = mark
+        head = ""
+
+        while pos < len(buffer) and len(head) < length:
+            head += buffer[pos]
+            pos += 1
+
+        return head.startswith(prefix)
+
+    def __isEmpty(self, mark):
+        """Whether no code was written since the given mark"""
+
+        buffer = self.__buffer
+        for pos in range(mark, len(buffer)):
+            if buffer[pos]:
+                return False
+
+        return True
+
+    def __truncate(self, mark, length):
+        """Removes the given number of characters from the end of the code written since the given mark"""
+
+        buffer = self.__buffer
+        while length > 0 and len(buffer) > mark:
+            last = buffer.pop()
+            if len(last) > length:
+                buffer.append(last[:-length])
+                break
+
+            length -= len(last)
+    
     def __statements(self, node):
-        result = []
         for child in node:
-            result.append(self.compress(child))
+            self.__emit(child)
 
-        return "".join(result)
+    def __join(self, nodes, separator):
+        buffer = self.__buffer
+        for pos, child in enumerate(nodes):
+            if pos:
+                buffer.append(separator)
+
+            self.__emit(child)
     
     def __handleForcedSemicolon(self, node):
         if node.type == "semicolon" and not hasattr(node, "expression"):
             self.__forcedSemicolon = True
 
-    def __addSemicolon(self, result):
-        if not result.endswith(self.__semicolonSymbol):
+    def __addSemicolon(self, mark):
+        if not self.__endsWith(mark, self.__semicolonSymbol):
             if self.__forcedSemicolon:
                 self.__forcedSemicolon = False
         
-            return result + self.__semicolonSymbol
-
-        else:
-            return result
+            self.__buffer.append(self.__semicolonSymbol)
 
-    def __removeSemicolon(self, result):
+    def __removeSemicolon(self, mark):
         if self.__forcedSemicolon:
             self.__forcedSemicolon = False
-            return result
+            return
     
-        if result.endswith(self.__semicolonSymbol):
-            return result[:-len(self.__semicolonSymbol)]
+        if self.__endsWith(mark, self.__semicolonSymbol):
+            self.__truncate(mark, len(self.__semicolonSymbol))
+
+    def __encodeString(self, value):
+        # Omit writing real high unicode character which are not supported well by browsers
+        ascii = ascii_encoder.encode(value)
+
+        if high_unicode.search(ascii):
+            return ascii
         else:
-            return result
+            return unicode_encoder.encode(value)
 
 
     #
@@ -176,7 +304,7 @@ class Compressor:
     #
 
     def type_script(self, node):
-        return self.__statements(node)
+        self.__statements(node)
 
 
 
@@ -185,44 +313,54 @@ class Compressor:
     #
     
     def type_comma(self, node):
-        return self.__commaSymbol.join(map(self.compress, node))
+        self.__join(node, self.__commaSymbol)
 
     def type_object_init(self, node):
-        return "{%s}" % self.__commaSymbol.join(map(self.compress, node))
+        self.__buffer.append("{")
+        self.__join(node, self.__commaSymbol)
+        self.__buffer.append("}")
 
     def type_property_init(self, node):
-        key = self.compress(node[0])
-        value = self.compress(node[1])
+        value = getattr(node[0], "value", None)
+
+        if type(value) in (int, float):
+            key = "%s" % value
 
-        if type(key) in (int, float):
-            pass
+        else:
+            key = self.__capture(node[0])
 
-        elif self.__number_property.match(key):
-            pass
+            if self.__number_property.match(key):
+                pass
 
-        # Protect keywords and special characters
-        elif key in keywords or key in futureReserved or not self.__simple_property.match(key):
-            key = self.type_string(node[0])
+            # Protect keywords and special characters
+            elif key in keywords or key in futureReserved or not self.__simple_property.match(key):
+                key = self.__encodeString(value)
 
-        return "%s:%s" % (key, value)
+        self.__buffer.append(key)
+        self.__buffer.append(":")
+        self.__emit(node[1])
         
     def type_array_init(self, node):
-        def helper(child):
-            return self.compress(child) if child != None else ""
-    
-        return "[%s]" % ",".join(map(helper, node))
+        buffer = self.__buffer
+        buffer.append("[")
+        for pos, child in enumerate(node):
+            if pos:
+                buffer.append(",")
+
+            if child is not None:
+                self.__emit(child)
+
+        buffer.append("]")
 
     def type_array_comp(self, node):
-        return "[%s %s]" % (self.compress(node.expression), self.compress(node.tail))    
+        self.__buffer.append("[")
+        self.__emit(node.expression)
+        self.__buffer.append(" ")
+        self.__emit(node.tail)
+        self.__buffer.append("]")
 
     def type_string(self, node):
-        # Omit writing real high unicode character which are not supported well by browsers
-        ascii = ascii_encoder.encode(node.value)
-
-        if high_unicode.search(ascii):
-            return ascii
-        else:
-            return unicode_encoder.encode(node.value)
+        self.__buffer.append(self.__encodeString(node.value))
 
     def type_number(self, node):
         value = node.value
@@ -240,92 +378,98 @@ class Compressor:
         elif int(value) == value and node.parent.type != "dot":
             value = int(value)
 
-        return "%s" % value
+        self.__buffer.append("%s" % value)
 
     def type_regexp(self, node):
-        return node.value
+        self.__buffer.append(node.value)
 
     def type_identifier(self, node):
-        return node.value
+        self.__buffer.append(node.value)
 
     def type_list(self, node):
-        return ",".join(map(self.compress, node))
+        self.__join(node, ",")
 
     def type_index(self, node):
-        return "%s[%s]" % (self.compress(node[0]), self.compress(node[1]))
+        self.__emit(node[0])
+        self.__buffer.append("[")
+        self.__emit(node[1])
+        self.__buffer.append("]")
 
     def type_declaration(self, node):
         names = getattr(node, "names", None)
         if names:
-            result = self.compress(names)
+            self.__emit(names)
         else:
-            result = node.name    
+            self.__buffer.append(node.name)
 
         initializer = getattr(node, "initializer", None)
         if initializer:
-            result += "=%s" % self.compress(node.initializer)
-
-        return result
+            self.__buffer.append("=")
+            self.__emit(node.initializer)
 
     def type_assign(self, node):
         assignOp = getattr(node, "assignOp", None)
         operator = "=" if not assignOp else self.__dividers[assignOp] + "="
     
-        return self.compress(node[0]) + operator + self.compress(node[1])
+        self.__emit(node[0])
+        self.__buffer.append(operator)
+        self.__emit(node[1])
 
     def type_call(self, node):
-        return "%s(%s)" % (self.compress(node[0]), self.compress(node[1]))
+        self.__emit(node[0])
+        self.__buffer.append("(")
+        self.__emit(node[1])
+        self.__buffer.append(")")
 
     def type_new_with_args(self, node):
-        result = "new %s" % self.compress(node[0])
+        self.__buffer.append("new ")
+        self.__emit(node[0])
         
         # Compress new Object(); => new Object;
         if len(node[1]) > 0:
-            result += "(%s)" % self.compress(node[1])
+            self.__buffer.append("(")
+            self.__emit(node[1])
+            self.__buffer.append(")")
         else:
             parent = getattr(node, "parent", None)
-            if parent and parent.type is "dot":
-                result += "()"
-            
-        return result
+            if parent and parent.type == "dot":
+                self.__buffer.append("()")
 
     def type_exception(self, node):
-        return node.value
+        self.__buffer.append(node.value)
     
     def type_generator(self, node):
         """ Generator Expression """
-        result = self.compress(getattr(node, "expression"))
+        self.__emit(getattr(node, "expression"))
         tail = getattr(node, "tail", None)
         if tail:
-            result += " %s" % self.compress(tail)
-
-        return result
+            self.__buffer.append(" ")
+            self.__emit(tail)
 
     def type_comp_tail(self, node):
         """  Comprehensions Tails """
-        result = self.compress(getattr(node, "for"))
+        self.__emit(getattr(node, "for"))
         guard = getattr(node, "guard", None)
         if guard:
-            result += "if(%s)" % self.compress(guard)
-
-        return result    
+            self.__buffer.append("if(")
+            self.__emit(guard)
+            self.__buffer.append(")")
     
     def type_in(self, node):
-        first = self.compress(node[0])
-        second = self.compress(node[1])
+        mark = len(self.__buffer)
+        self.__emit(node[0])
     
-        if first.endswith("'") or first.endswith('"'):
-            pattern = "%sin %s"
+        if self.__endsWith(mark, "'") or self.__endsWith(mark, '"'):
+            self.__buffer.append("in ")
         else:
-            pattern = "%s in %s"
+            self.__buffer.append(" in ")
     
-        return pattern % (first, second)
+        self.__emit(node[1])
     
     def type_instanceof(self, node):
-        first = self.compress(node[0])
-        second = self.compress(node[1])
-
-        return "%s instanceof %s" % (first, second)    
+        self.__emit(node[0])
+        self.__buffer.append(" instanceof ")
+        self.__emit(node[1])
     
     
 
@@ -334,38 +478,60 @@ class Compressor:
     #
 
     def type_block(self, node):
-        return "{%s}" % self.__removeSemicolon(self.__statements(node))
+        self.__buffer.append("{")
+        mark = len(self.__buffer)
+        self.__statements(node)
+        self.__removeSemicolon(mark)
+        self.__buffer.append("}")
     
     def type_let_block(self, node):
-        begin = "let(%s)" % ",".join(map(self.compress, node.variables))
+        self.__buffer.append("let(")
+        self.__join(node.variables, ",")
+        self.__buffer.append(")")
+
         if hasattr(node, "block"):
-            end = self.compress(node.block)
+            self.__emit(node.block)
         elif hasattr(node, "expression"):
-            end = self.compress(node.expression)    
-    
-        return begin + end
+            self.__emit(node.expression)
+
+    def __declarations(self, keyword, node):
+        mark = len(self.__buffer)
+        self.__buffer.append(keyword)
+        self.type_list(node)
+        self.__addSemicolon(mark)
 
     def type_const(self, node):
-        return self.__addSemicolon("const %s" % self.type_list(node))
+        self.__declarations("const ", node)
 
     def type_var(self, node):
-        return self.__addSemicolon("var %s" % self.type_list(node))
+        self.__declarations("var ", node)
 
     def type_let(self, node):
-        return self.__addSemicolon("let %s" % self.type_list(node))
+        self.__declarations("let ", node)
 
     def type_semicolon(self, node):
+        mark = len(self.__buffer)
         expression = getattr(node, "expression", None)
-        return self.__addSemicolon(self.compress(expression) if expression else "")
+        if expression:
+            self.__emit(expression)
+
+        self.__addSemicolon(mark)
 
     def type_label(self, node):
-        return self.__addSemicolon("%s:%s" % (node.label, self.compress(node.statement)))
+        mark = len(self.__buffer)
+        self.__buffer.append("%s:" % node.label)
+        self.__emit(node.statement)
+        self.__addSemicolon(mark)
 
     def type_break(self, node):
-        return self.__addSemicolon("break" if not hasattr(node, "label") else "break %s" % node.label)
+        mark = len(self.__buffer)
+        self.__buffer.append("break" if not hasattr(node, "label") else "break %s" % node.label)
+        self.__addSemicolon(mark)
 
     def type_continue(self, node):
-        return self.__addSemicolon("continue" if not hasattr(node, "label") else "continue %s" % node.label)
+        mark = len(self.__buffer)
+        self.__buffer.append("continue" if not hasattr(node, "label") else "continue %s" % node.label)
+        self.__addSemicolon(mark)
 
 
     #
@@ -373,46 +539,58 @@ class Compressor:
     #
 
     def type_function(self, node):
+        buffer = self.__buffer
+
         if node.type == "setter":
-            result = "set"
+            buffer.append("set")
         elif node.type == "getter":
-            result = "get"
+            buffer.append("get")
         else:
-            result = "function"
+            buffer.append("function")
         
         name = getattr(node, "name", None)
         if name:
-            result += " %s" % name
+            buffer.append(" %s" % name)
     
         params = getattr(node, "params", None)
-        result += "(%s)" % self.compress(params) if params else "()"
+        if params:
+            buffer.append("(")
+            self.__emit(params)
+            buffer.append(")")
+        else:
+            buffer.append("()")
     
         # keep expression closure format (may be micro-optimized for other code, too)
         if getattr(node, "expressionClosure", False):
-            result += self.compress(node.body)
+            self.__emit(node.body)
         else:
-            result += "{%s}" % self.__removeSemicolon(self.compress(node.body))
-        
-        return result
+            buffer.append("{")
+            mark = len(buffer)
+            self.__emit(node.body)
+            self.__removeSemicolon(mark)
+            buffer.append("}")
 
     def type_getter(self, node):
-        return self.type_function(node)
+        self.type_function(node)
     
     def type_setter(self, node):
-        return self.type_function(node)
+        self.type_function(node)
     
     def type_return(self, node):
-        result = "return"
+        buffer = self.__buffer
+        mark = len(buffer)
+        buffer.append("return")
+
         if hasattr(node, "value"):
-            valueCode = self.compress(node.value)
+            space = len(buffer)
+            buffer.append("")
+            self.__emit(node.value)
 
             # Micro optimization: Don't need a space when a block/map/array/group/strings are returned
-            if not valueCode.startswith(("(","[","{","'",'"',"!","-","/")): 
-                result += " "
-
-            result += valueCode
+            if not self.__startsWith(space + 1, ("(","[","{","'",'"',"!","-","/")): 
+                buffer[space] = " "
 
-        return self.__addSemicolon(result)
+        self.__addSemicolon(mark)
 
 
 
@@ -421,22 +599,30 @@ class Compressor:
     #            
     
     def type_throw(self, node):
-        return self.__addSemicolon("throw %s" % self.compress(node.exception))
+        mark = len(self.__buffer)
+        self.__buffer.append("throw ")
+        self.__emit(node.exception)
+        self.__addSemicolon(mark)
 
     def type_try(self, node):
-        result = "try%s" % self.compress(node.tryBlock)
+        buffer = self.__buffer
+        buffer.append("try")
+        self.__emit(node.tryBlock)
     
         for catch in node:
             if catch.type == "catch":
+                buffer.append("catch(")
+                self.__emit(catch.exception)
                 if hasattr(catch, "guard"):
-                    result += "catch(%s if %s)%s" % (self.compress(catch.exception), self.compress(catch.guard), self.compress(catch.block))
-                else:
-                    result += "catch(%s)%s" % (self.compress(catch.exception), self.compress(catch.block))
+                    buffer.append(" if ")
+                    self.__emit(catch.guard)
 
-        if hasattr(node, "finallyBlock"):
-            result += "finally%s" % self.compress(node.finallyBlock)
+                buffer.append(")")
+                self.__emit(catch.block)
 
-        return result
+        if hasattr(node, "finallyBlock"):
+            buffer.append("finally")
+            self.__emit(node.finallyBlock)
 
 
 
@@ -445,58 +631,90 @@ class Compressor:
     #    
     
     def type_while(self, node):
-        result = "while(%s)%s" % (self.compress(node.condition), self.compress(node.body))
+        self.__buffer.append("while(")
+        self.__emit(node.condition)
+        self.__buffer.append(")")
+        self.__emit(node.body)
         self.__handleForcedSemicolon(node.body)
-        return result
 
 
     def type_do(self, node):
+        buffer = self.__buffer
+        mark = len(buffer)
+        buffer.append("do")
+
         # block unwrapping don't help to reduce size on this loop type
         # but if it happens (don't like to modify a global function to fix a local issue), we
         # need to fix the body and re-add braces around the statement
-        body = self.compress(node.body)
-        if not body.startswith("{"):
-            body = "{%s}" % body
+        brace = len(buffer)
+        buffer.append("")
+        self.__emit(node.body)
+        if not self.__startsWith(brace + 1, "{"):
+            buffer[brace] = "{"
+            buffer.append("}")
         
-        return self.__addSemicolon("do%swhile(%s)" % (body, self.compress(node.condition)))
+        buffer.append("while(")
+        self.__emit(node.condition)
+        buffer.append(")")
+        self.__addSemicolon(mark)
 
 
     def type_for_in(self, node):
+        buffer = self.__buffer
+
         # Optional variable declarations
         varDecl = getattr(node, "varDecl", None)
 
         # Body is optional - at least in comprehensions tails
+        # Note: Compressed first as it might affect the forced semicolon of the iterator
         body = getattr(node, "body", None)
         if body:
-            body = self.compress(body)
+            body = self.__capture(body)
         else:
             body = ""
         
-        result = "for"
+        buffer.append("for")
         if node.isEach:
-            result += " each"
+            buffer.append(" each")
     
-        result += "(%s in %s)%s" % (self.__removeSemicolon(self.compress(node.iterator)), self.compress(node.object), body)
+        buffer.append("(")
+        mark = len(buffer)
+        self.__emit(node.iterator)
+        self.__removeSemicolon(mark)
+        buffer.append(" in ")
+        self.__emit(node.object)
+        buffer.append(")")
+        buffer.append(body)
     
         if body:
             self.__handleForcedSemicolon(node.body)
-        
-        return result
     
     
     def type_for(self, node):
+        buffer = self.__buffer
         setup = getattr(node, "setup", None)
         condition = getattr(node, "condition", None)
         update = getattr(node, "update", None)
 
-        result = "for("
-        result += self.__addSemicolon(self.compress(setup) if setup else "")
-        result += self.__addSemicolon(self.compress(condition) if condition else "")
-        result += self.compress(update) if update else ""
-        result += ")%s" % self.compress(node.body)
+        buffer.append("for(")
+
+        mark = len(buffer)
+        if setup:
+            self.__emit(setup)
+        self.__addSemicolon(mark)
+
+        mark = len(buffer)
+        if condition:
+            self.__emit(condition)
+        self.__addSemicolon(mark)
+
+        if update:
+            self.__emit(update)
+
+        buffer.append(")")
+        self.__emit(node.body)
 
         self.__handleForcedSemicolon(node.body)
-        return result
     
        
        
@@ -514,51 +732,64 @@ class Compressor:
             [thenPart,elsePart] = [elsePart,thenPart]
             condition = condition[0]
     
-        return "%s?%s:%s" % (self.compress(condition), self.compress(thenPart), self.compress(elsePart))
+        self.__emit(condition)
+        self.__buffer.append("?")
+        self.__emit(thenPart)
+        self.__buffer.append(":")
+        self.__emit(elsePart)
     
     
     def type_if(self, node):
-        result = "if(%s)%s" % (self.compress(node.condition), self.compress(node.thenPart))
+        buffer = self.__buffer
+        buffer.append("if(")
+        self.__emit(node.condition)
+        buffer.append(")")
+        self.__emit(node.thenPart)
 
         elsePart = getattr(node, "elsePart", None)
         if elsePart:
-            result += "else"
+            buffer.append("else")
 
-            elseCode = self.compress(elsePart)
+            space = len(buffer)
+            buffer.append("")
+            self.__emit(elsePart)
         
             # Micro optimization: Don't need a space when the child is a block
             # At this time the brace could not be part of a map declaration (would be a syntax error)
-            if not elseCode.startswith(("{", "(", ";")):
-                result += " "        
-            
-            result += elseCode
+            if not self.__startsWith(space + 1, ("{", "(", ";")):
+                buffer[space] = " "
         
             self.__handleForcedSemicolon(elsePart)
-        
-        return result
 
 
     def type_switch(self, node):
-        result = "switch(%s){" % self.compress(node.discriminant)
+        buffer = self.__buffer
+        mark = len(buffer)
+
+        buffer.append("switch(")
+        self.__emit(node.discriminant)
+        buffer.append("){")
+
         for case in node:
             if case.type == "case":
-                labelCode = self.compress(case.label)
-                if labelCode.startswith('"'):
-                    result += "case%s:" % labelCode
-                else:
-                    result += "case %s:" % labelCode
+                buffer.append("case")
+                space = len(buffer)
+                buffer.append("")
+                self.__emit(case.label)
+                if not self.__startsWith(space + 1, '"'):
+                    buffer[space] = " "
+
+                buffer.append(":")
             elif case.type == "default":
-                result += "default:"
+                buffer.append("default:")
             else:
                 continue
         
             for statement in case.statements:
-                temp = self.compress(statement)
-                if len(temp) > 0:
-                    result += self.__addSemicolon(temp)
+                statementMark = len(buffer)
+                self.__emit(statement)
+                if not self.__isEmpty(statementMark):
+                    self.__addSemicolon(statementMark)
         
-        return "%s}" % self.__removeSemicolon(result)
-        
-
-
-        
\ No newline at end of file
+        self.__removeSemicolon(mark)
+        buffer.append("}")
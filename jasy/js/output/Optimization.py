@@ -4,6 +4,7 @@
 #
 
 import jasy.core.FlagSet as FlagSet
+import jasy.parse.Pipeline as Pipeline
 
 import jasy.js.optimize.CryptPrivates as CryptPrivates
 import jasy.js.optimize.BlockReducer as BlockReducer
@@ -37,37 +38,32 @@ class Optimization(FlagSet.FlagSet):
         Applies the configured optimizations to the given node tree. Modifies the tree in-place
         to be sure to have a deep copy if you need the original one. It raises an error instance
         whenever any optimization could not be applied to the given tree.
+
+        Optimizations which are compatible are applied during the same walk over the tree
+        (see jasy.parse.Pipeline for the ordering constraints).
         """
         
-        enabled = self.__optimizations
-        
-        if "wrap" in enabled:
+        if self.has("wrap"):
             try:
                 ClosureWrapper.optimize(tree)
             except CryptPrivates.Error as err:
                 raise Error(err)
-            
-        if "declarations" in enabled:
-            try:
-                CombineDeclarations.optimize(tree)
-            except CombineDeclarations.Error as err:
-                raise Error(err)
 
-        if "blocks" in enabled:
-            try:
-                BlockReducer.optimize(tree)
-            except BlockReducer.Error as err:
-                raise Error(err)
+        passes = []
 
-        if "variables" in enabled:
-            try:
-                LocalVariables.optimize(tree)
-            except LocalVariables.Error as err:
-                raise Error(err)
+        if self.has("declarations"):
+            passes.append(CombineDeclarations.Pass())
 
-        if "privates" in enabled:
-            try:
-                CryptPrivates.optimize(tree, tree.fileId)
-            except CryptPrivates.Error as err:
-                raise Error(err)
-     
\ No newline at end of file
+        if self.has("blocks"):
+            passes.append(BlockReducer.Pass())
+
+        if self.has("variables"):
+            passes.append(LocalVariables.Pass())
+
+        if self.has("privates"):
+            passes.append(CryptPrivates.Pass(tree.fileId))
+
+        try:
+            Pipeline.Pipeline(passes).run(tree)
+        except (CombineDeclarations.Error, BlockReducer.Error, LocalVariables.Error, CryptPrivates.Error) as err:
+            raise Error(err)
@@ -6,7 +6,7 @@
 import jasy.js.parse.ScopeData
 
 
-__all__ = ["scan"]
+__all__ = ["scan", "Scanner"]
 
 
 #
@@ -20,8 +20,29 @@ def scan(tree):
     data is not automatically updated. This means that every time you modify the tree heavily,
     it might make sense to re-execute this method to bring it in sync to the current tree structure.
     """
-    
-    return __scanScope(tree)
+
+    scanner = Scanner()
+    enter = scanner.enter
+
+    # Iterative walk in document order (see Scanner). Scopes to leave are marked by None.
+    pending = [tree]
+    push = pending.append
+    while pending:
+        node = pending.pop()
+        if node is None:
+            scanner.leave(pending.pop())
+            continue
+
+        if enter(node):
+            push(node)
+            push(None)
+
+        for child in reversed(node):
+            # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
+            if child is not None:
+                push(child)
+
+    return scanner.getResult()
 
 
 
@@ -29,164 +50,188 @@ def scan(tree):
 # Implementation
 #
 
-def __scanNode(node, data):
+class Scanner():
     """
-    Scans nodes recursively and collects all variables which are declared and accessed.
+    Collects variable data while the nodes of a tree are visited in document order. Each node is
+    passed to enter() before its children. Scopes are finished by leave() after all their children
+    were entered. Allows combining the scan with other analysis in one walk over the tree.
     """
-    
-    if node.type == "function":
-        if node.functionForm == "declared_form":
-            data.declared.add(node.name)
-            data.modified.add(node.name)
-    
-    elif node.type == "declaration":
-        varName = getattr(node, "name", None)
-        if varName != None:
-            data.declared.add(varName)
-            
-            if hasattr(node, "initializer"):
-                data.modified.add(varName)
-            
-            # If the variable is used as a iterator, we need to add it to the use counter as well
-            if getattr(node.parent, "rel", None) == "iterator":
-                data.increment(varName)
-            
-        else:
-            # JS 1.7 Destructing Expression
-            varNames = node.names
-            for identifier in node.names:
-                data.declared.add(identifier.value)
-                data.modified.add(identifier.value)
-                
-            # If the variable is used as a iterator, we need to add it to the use counter as well
-            if getattr(node.parent, "rel", None) == "iterator":
-                for identifier in node.names:
-                    data.increment(identifier.value)
-            
-    elif node.type == "identifier":
-        # Ignore parameter names (of inner functions, these are handled by __scanScope)
-        if node.parent.type == "list" and getattr(node.parent, "rel", None) == "params":
-            pass
-        
-        # Ignore property initialization names
-        elif node.parent.type == "property_init" and node.parent[0] == node:
-            pass
-            
-        # Ignore non first identifiers in dot-chains
-        elif node.parent.type != "dot" or node.parent.index(node) == 0:
-            if node.value != "arguments":
-                data.increment(node.value)
-            
-                if node.parent.type in ("increment", "decrement"):
-                    data.modified.add(node.value)
-                
-                elif node.parent.type == "assign" and node.parent[0] == node:
-                    data.modified.add(node.value)
-
-                # Support for package-like object access
-                if node.parent.type == "dot":
-                    package = __combinePackage(node)
-                    if package in data.packages:
-                        data.packages[package] += 1
-                    else:
-                        data.packages[package] = 1
-                
-    # Treat exception variables in catch blocks like declared
-    elif node.type == "block" and node.parent.type == "catch":
-        data.declared.add(node.parent.exception.value)                
-    
-    if node.type == "script":
-        innerVariables = __scanScope(node)
+
+    def __init__(self):
+        self.__scopes = []
+        self.__result = None
+
+
+    def getResult(self):
+        """Returns the variable data of the root scope (after the root node was left)"""
+
+        return self.__result
+
+
+    def enter(self, node):
+        """Processes the given node. Returns whether leave() needs to be called after all its children."""
+
+        # Scopes are script nodes (including function bodies). The root is always handled like a scope.
+        if node.type == "script" or not self.__scopes:
+            data = jasy.js.parse.ScopeData.ScopeData()
+            node.scope = data
+
+            # Add params to declaration list
+            self.__addParams(node, data)
+
+            self.__scopes.append(data)
+            return True
+
+        self.__scanNode(node, self.__scopes[-1])
+        return False
+
+
+    def leave(self, node):
+        """Finishes the scope of the given node and adds its shared variables to the outer scope"""
+
+        innerVariables = self.__finishScope(self.__scopes.pop())
+        if not self.__scopes:
+            self.__result = innerVariables
+            return
+
+        data = self.__scopes[-1]
         for name in innerVariables.shared:
             data.increment(name, innerVariables.shared[name])
-            
+
             if name in innerVariables.modified:
                 data.modified.add(name)
-        
+
         for package in innerVariables.packages:
             if package in data.packages:
                 data.packages[package] += innerVariables.packages[package]
             else:
                 data.packages[package] = innerVariables.packages[package]
-                
-    else:
-        for child in node:
-            # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
-            if child != None:
-                __scanNode(child, data)
 
 
+    def __scanNode(self, node, data):
+        """
+        Collects the variables which are declared and accessed by the given node (without its children).
+        """
 
-def __combinePackage(node):
-    """
-    Combines a package variable (e.g. foo.bar.baz) into one string
-    """
+        if node.type == "function":
+            if node.functionForm == "declared_form":
+                data.declared.add(node.name)
+                data.modified.add(node.name)
 
-    result = [node.value]
-    parent = node.parent
-    while parent.type == "dot":
-        result.append(parent[1].value)
-        parent = parent.parent
-
-    return ".".join(result)
-    
-    
-    
-def __scanScope(node):
-    """ 
-    Scans a scope and collects statistics on variable declaration and usage 
-    """
-    
-    # Initialize statistics object for this scope
-    data = jasy.js.parse.ScopeData.ScopeData()
-    node.scope = data
-    
-    # Add params to declaration list
-    __addParams(node, data)
-
-    # Collect all data from all children (excluding sub-scopes)
-    for child in node:
-        __scanNode(child, data)
-        
-    # Remove all objects which are based on locally declared variables
-    for name in list(data.packages):
-        top = name[0:name.index(".")]
-        if top in data.declared or top in data.params:
-            del data.packages[name]
-    
-    # Look for accessed varibles which have not been defined
-    # Might be a part of a closure or just a mistake
-    for name in data.accessed:
-        if name not in data.declared and name not in data.params and name != "arguments":
-            data.shared[name] = data.accessed[name]
-            
-    # Look for variables which have been defined, but not accessed.
-    if data.name and not data.name in data.accessed:
-        data.unused.add(data.name)
-    for name in data.params:
-        if not name in data.accessed:
-            data.unused.add(name)
-    for name in data.declared:
-        if not name in data.accessed:
-            data.unused.add(name)
-    
-    return data
-    
-    
-    
-def __addParams(node, data):
-    """
-    Adds all param names from outer function to the definition list
-    """
+        elif node.type == "declaration":
+            varName = getattr(node, "name", None)
+            if varName != None:
+                data.declared.add(varName)
+
+                if hasattr(node, "initializer"):
+                    data.modified.add(varName)
 
-    rel = getattr(node, "rel", None)
-    if rel == "body" and node.parent.type == "function":
-        # In expressed_form the function name belongs to the function body, not to the parent scope
-        if node.parent.functionForm == "expressed_form":
-            data.name = getattr(node.parent, "name", None)
-        
-        paramList = getattr(node.parent, "params", None)
-        if paramList:
-            for paramIdentifier in paramList:
-                data.params.add(paramIdentifier.value)
+                # If the variable is used as a iterator, we need to add it to the use counter as well
+                if getattr(node.parent, "rel", None) == "iterator":
+                    data.increment(varName)
 
+            else:
+                # JS 1.7 Destructing Expression
+                varNames = node.names
+                for identifier in node.names:
+                    data.declared.add(identifier.value)
+                    data.modified.add(identifier.value)
+
+                # If the variable is used as a iterator, we need to add it to the use counter as well
+                if getattr(node.parent, "rel", None) == "iterator":
+                    for identifier in node.names:
+                        data.increment(identifier.value)
+
+        elif node.type == "identifier":
+            # Ignore parameter names (of inner functions, these are handled by __addParams)
+            if node.parent.type == "list" and getattr(node.parent, "rel", None) == "params":
+                pass
+
+            # Ignore property initialization names
+            elif node.parent.type == "property_init" and node.parent[0] == node:
+                pass
+
+            # Ignore non first identifiers in dot-chains
+            elif node.parent.type != "dot" or node.parent.index(node) == 0:
+                if node.value != "arguments":
+                    data.increment(node.value)
+
+                    if node.parent.type in ("increment", "decrement"):
+                        data.modified.add(node.value)
+
+                    elif node.parent.type == "assign" and node.parent[0] == node:
+                        data.modified.add(node.value)
+
+                    # Support for package-like object access
+                    if node.parent.type == "dot":
+                        package = self.__combinePackage(node)
+                        if package in data.packages:
+                            data.packages[package] += 1
+                        else:
+                            data.packages[package] = 1
+
+        # Treat exception variables in catch blocks like declared
+        elif node.type == "block" and node.parent.type == "catch":
+            data.declared.add(node.parent.exception.value)
+
+
+    def __combinePackage(self, node):
+        """
+        Combines a package variable (e.g. foo.bar.baz) into one string
+        """
+
+        result = [node.value]
+        parent = node.parent
+        while parent.type == "dot":
+            result.append(parent[1].value)
+            parent = parent.parent
+
+        return ".".join(result)
+
+
+    def __finishScope(self, data):
+        """
+        Computes the statistics on variable declaration and usage of a scope after all its children were scanned
+        """
+
+        # Remove all objects which are based on locally declared variables
+        for name in list(data.packages):
+            top = name[0:name.index(".")]
+            if top in data.declared or top in data.params:
+                del data.packages[name]
+
+        # Look for accessed varibles which have not been defined
+        # Might be a part of a closure or just a mistake
+        for name in data.accessed:
+            if name not in data.declared and name not in data.params and name != "arguments":
+                data.shared[name] = data.accessed[name]
+
+        # Look for variables which have been defined, but not accessed.
+        if data.name and not data.name in data.accessed:
+            data.unused.add(data.name)
+        for name in data.params:
+            if not name in data.accessed:
+                data.unused.add(name)
+        for name in data.declared:
+            if not name in data.accessed:
+                data.unused.add(name)
+
+        return data
+
+
+
+    def __addParams(self, node, data):
+        """
+        Adds all param names from outer function to the definition list
+        """
+
+        rel = getattr(node, "rel", None)
+        if rel == "body" and node.parent.type == "function":
+            # In expressed_form the function name belongs to the function body, not to the parent scope
+            if node.parent.functionForm == "expressed_form":
+                data.name = getattr(node.parent, "name", None)
+
+            paramList = getattr(node.parent, "params", None)
+            if paramList:
+                for paramIdentifier in paramList:
+                    data.params.add(paramIdentifier.value)
@@ -74,6 +74,39 @@ operatorNames = {
 assignOperators = ["|", "^", "&", "<<", ">>", ">>>", "+", "-", "*", "/", "%"]
 
 
+# Exponent part of numbers
+exponent = r"[eE][+-]?[0-9]+"
+
+# Master pattern for tokens including preceding white space (beside regular expressions and line
+# breaks which depend on the state of the tokenizer). Operators are sorted by length as the longest
+# one wins. Slashes starting a comment do not match so that these are handled by skip().
+tokenExpr = re.compile(r"""
+    [\xA0\ \t]*
+  (?:
+    (?P<identifier>[a-zA-Z$_][a-zA-Z0-9$_]*)
+  | (?P<float>(?:[1-9][0-9]*\.[0-9]*|0\.[0-9]*|\.[0-9]+)(?:%(exponent)s)?|[1-9][0-9]*%(exponent)s)
+  | (?P<integer>[1-9][0-9]*)
+  | (?P<hex>0[xX][0-9a-fA-F]*)
+  | (?P<octal>0[0-7]+)
+  | (?P<zero>0(?:%(exponent)s)?)
+  | (?P<string>"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')
+  | (?P<dot>\.)
+  | (?P<operator>%(operators)s)
+  )
+""" % {
+    "exponent" : exponent,
+    "operators" : "|".join([r"/(?![/*])" if op == "/" else re.escape(op) for op in sorted(operatorNames, key=len, reverse=True)])
+}, re.VERBOSE | re.DOTALL)
+
+# Regular expression literals (only valid where an operand is expected)
+regExpExpr = re.compile(r"/(?:[^/\\\[]|\\.|\[(?:[^\]\\]|\\.)*\])*/[a-z]*", re.DOTALL)
+
+# White space (with or without line breaks) and comments between tokens
+blankExpr = re.compile(r"[\xA0 \t\n]*")
+spaceExpr = re.compile(r"[\xA0 \t]*")
+commentExpr = re.compile(r"/\*.*?\*/|//[^\n]*", re.DOTALL)
+
+
 
 
 #
@@ -96,7 +129,7 @@ class Tokenizer(object):
         # line: Line number (for debugging proposes)
         self.cursor = 0
         self.source = str(source)
-        self.tokens = {}
+        self.tokens = [None, None, None, None]
         self.tokenIndex = 0
         self.lookahead = 0
         self.scanNewlines = False
@@ -105,7 +138,7 @@ class Tokenizer(object):
         self.comments = []
 
     input_ = property(lambda self: self.source[self.cursor:])
-    token = property(lambda self: self.tokens.get(self.tokenIndex))
+    token = property(lambda self: self.tokens[self.tokenIndex])
 
 
     def done(self):
@@ -115,6 +148,17 @@ class Tokenizer(object):
         
 
     def match(self, tokenType, scanOperand=False):
+        # Compare with the next already scanned token without moving back and forth (see get())
+        if self.lookahead:
+            next = self.tokens[(self.tokenIndex + 1) & 3]
+            if next.type != "newline" or self.scanNewlines:
+                if next.type != tokenType:
+                    return False
+
+                self.lookahead -= 1
+                self.tokenIndex = (self.tokenIndex + 1) & 3
+                return True
+
         return self.get(scanOperand) == tokenType or self.unget()
 
 
@@ -127,7 +171,7 @@ class Tokenizer(object):
 
     def peek(self, scanOperand=False):
         if self.lookahead:
-            next = self.tokens.get((self.tokenIndex + self.lookahead) & 3)
+            next = self.tokens[(self.tokenIndex + self.lookahead) & 3]
             if self.scanNewlines and (getattr(next, "line", None) != getattr(self, "line", None)):
                 tokenType = "newline"
             else:
@@ -161,417 +205,180 @@ class Tokenizer(object):
         startLine = self.line
 
         # Whether this is the first called as happen on start parsing a file (eat leading comments/white space)
-        startOfFile = self.cursor is 0
+        startOfFile = self.cursor == 0
         
         indent = ""
         
         while (True):
-            if len(input) > self.cursor:
-                ch = input[self.cursor]
+            cursor = self.cursor
+
+            # Line breaks are tokens on their own while scanning for them
+            if self.scanNewlines:
+                end = spaceExpr.match(input, cursor).end()
             else:
+                end = blankExpr.match(input, cursor).end()
+
+            # check for whitespace, also for special cases like 0xA0
+            if end != cursor:
+                text = input[cursor:end]
+                lineBreaks = text.count("\n")
+                if lineBreaks:
+                    self.line += lineBreaks
+                    indent = text[text.rfind("\n")+1:]
+                else:
+                    indent += text
+
+                self.cursor = cursor = end
+
+            if not input.startswith("/", cursor):
                 return
-                
-            self.cursor += 1
-            
-            if len(input) > self.cursor:
-                next = input[self.cursor]
+
+            match = commentExpr.match(input, cursor)
+            if match is None:
+                if input.startswith("/*", cursor):
+                    raise ParseError("Unterminated comment", self.fileId, self.line)
+
+                return
+
+            text = match.group()
+            self.cursor = match.end()
+
+            if startLine == self.line and not startOfFile:
+                mode = "inline"
+            elif (self.line-1) > startLine:
+                # distance before this comment means it is a comment block for a whole section (multiple lines of code)
+                mode = "section"
             else:
-                next = None
+                # comment for maybe multiple following lines of code, but not that important (no visual white space divider)
+                mode = "block"
 
-            if ch == "\n" and not self.scanNewlines:
-                self.line += 1
-                indent = ""
-                
-            elif ch == "/" and next == "*":
-                self.cursor += 1
-                text = "/*"
-                inline = startLine == self.line and startLine > 1
+            if text.startswith("/*"):
                 commentStartLine = self.line
-                if startLine == self.line and not startOfFile:
-                    mode = "inline"
-                elif (self.line-1) > startLine:
-                    # distance before this comment means it is a comment block for a whole section (multiple lines of code)
-                    mode = "section"
-                else:
-                    # comment for maybe multiple following lines of code, but not that important (no visual white space divider)
-                    mode = "block"
-                    
-                while (True):
-                    try:
-                        ch = input[self.cursor]
-                        self.cursor += 1
-                    except IndexError:
-                        raise ParseError("Unterminated comment", self.fileId, self.line)
-                        
-                    if ch == "*":
-                        next = input[self.cursor]
-                        if next == "/":
-                            text += "*/"
-                            self.cursor += 1
-                            break
-                            
-                    elif ch == "\n":
-                        self.line += 1
-                        
-                    text += ch
-                    
-                
+                self.line += text.count("\n")
+
                 # Filter escaping on slash-star combinations in comment text
-                text = text.replace("*\/", "*/")
+                text = text.replace("*\\/", "*/")
                 
                 try:
                     self.comments.append(Comment.Comment(text, mode, commentStartLine, indent, self.fileId))
                 except Comment.CommentException as commentError:
                     Console.error("Ignoring comment in %s: %s", self.fileId, commentError)
-                    
-                    
-            elif ch == "/" and next == "/":
-                self.cursor += 1
-                text = "//"
-                if startLine == self.line and not startOfFile:
-                    mode = "inline"
-                elif (self.line-1) > startLine:
-                    # distance before this comment means it is a comment block for a whole section (multiple lines of code)
-                    mode = "section"
-                else:
-                    # comment for maybe multiple following lines of code, but not that important (no visual white space divider)
-                    mode = "block"
-                    
-                while (True):
-                    try:
-                        ch = input[self.cursor]
-                        self.cursor += 1
-                    except IndexError:
-                        # end of file etc.
-                        break
-
-                    if ch == "\n":
-                        self.line += 1
-                        break
-                    
-                    text += ch
-                    
+
+            else:
+                # Line comments consume the line break (if not at the end of the file)
+                if input.startswith("\n", self.cursor):
+                    self.cursor += 1
+                    self.line += 1
+
                 try:
                     self.comments.append(Comment.Comment(text, mode, self.line-1, "", self.fileId))
-                except Comment.CommentException:
+                except Comment.CommentException as commentError:
                     Console.error("Ignoring comment in %s: %s", self.fileId, commentError)
 
-            # check for whitespace, also for special cases like 0xA0
-            elif ch in "\xA0 \t":
-                indent += ch
-
-            else:
-                self.cursor -= 1
-                return
 
+    def get(self, scanOperand=False):
+        """ 
+        It consumes input *only* if there is no lookahead.
+        Dispatches to the appropriate lexing function depending on the input.
+        """
+        while self.lookahead:
+            self.lookahead -= 1
+            self.tokenIndex = (self.tokenIndex + 1) & 3
+            token = self.tokens[self.tokenIndex]
+            if token.type != "newline" or self.scanNewlines:
+                return token.type
 
-    # Lexes the exponential part of a number, if present. Returns True if an
-    # exponential part was found.
-    def lexExponent(self):
         input = self.source
-        next = input[self.cursor]
-        if next == "e" or next == "E":
-            self.cursor += 1
-            ch = input[self.cursor]
-            self.cursor += 1
-            if ch == "+" or ch == "-":
-                ch = input[self.cursor]
-                self.cursor += 1
 
-            if ch < "0" or ch > "9":
-                raise ParseError("Missing exponent", self.fileId, self.line)
+        # Comments, line breaks and the end of the file are not covered by the master pattern
+        match = tokenExpr.match(input, self.cursor)
+        if match is None:
+            self.skip()
+            match = tokenExpr.match(input, self.cursor)
 
-            while(True):
-                ch = input[self.cursor]
-                self.cursor += 1
-                if not (ch >= "0" and ch <= "9"):
-                    break
-                
-            self.cursor -= 1
-            return True
-
-        return False
-
-
-    def lexZeroNumber(self, ch):
-        token = self.token
-        input = self.source
-        token.type = "number"
+        self.tokenIndex = (self.tokenIndex + 1) & 3
+        self.tokens[self.tokenIndex] = token = Token()
 
-        ch = input[self.cursor]
-        self.cursor += 1
-        if ch == ".":
-            while(True):
-                ch = input[self.cursor]
-                self.cursor += 1
-                if not (ch >= "0" and ch <= "9"):
-                    break
-                
-            self.cursor -= 1
-            self.lexExponent()
-            token.value = input[token.start:self.cursor]
-            
-        elif ch == "x" or ch == "X":
-            while(True):
-                ch = input[self.cursor]
-                self.cursor += 1
-                if not ((ch >= "0" and ch <= "9") or (ch >= "a" and ch <= "f") or (ch >= "A" and ch <= "F")):
-                    break
-                    
-            self.cursor -= 1
-            token.value = input[token.start:self.cursor]
-
-        elif ch >= "0" and ch <= "7":
-            while(True):
-                ch = input[self.cursor]
-                self.cursor += 1
-                if not (ch >= "0" and ch <= "7"):
-                    break
-                    
-            self.cursor -= 1
-            token.value = input[token.start:self.cursor]
+        token.line = self.line
 
-        else:
-            self.cursor -= 1
-            self.lexExponent()     # 0E1, &c.
-            token.value = 0
-    
+        if match is None:
+            token.start = self.cursor
 
-    def lexNumber(self, ch):
-        token = self.token
-        input = self.source
-        token.type = "number"
+            if self.cursor == len(input):
+                token.end = token.start
+                token.type = "end"
+                return token.type
 
-        floating = False
-        while(True):
             ch = input[self.cursor]
-            self.cursor += 1
-            
-            if ch == "." and not floating:
-                floating = True
-                ch = input[self.cursor]
-                self.cursor += 1
-                
-            if not (ch >= "0" and ch <= "9"):
-                break
-
-        self.cursor -= 1
-
-        exponent = self.lexExponent()
-        segment = input[token.start:self.cursor]
-        
-        # Protect float or exponent numbers
-        if floating or exponent:
-            token.value = segment
-        else:
-            token.value = int(segment)
-
-
-    def lexDot(self, ch):
-        token = self.token
-        input = self.source
-        next = input[self.cursor]
-        
-        if next >= "0" and next <= "9":
-            while (True):
-                ch = input[self.cursor]
+            if self.scanNewlines and ch == "\n":
+                token.type = "newline"
                 self.cursor += 1
-                if not (ch >= "0" and ch <= "9"):
-                    break
-
-            self.cursor -= 1
-            self.lexExponent()
-
-            token.type = "number"
-            token.value = input[token.start:self.cursor]
-
-        else:
-            token.type = "dot"
+                self.line += 1
 
+            elif ch == '"' or ch == "'":
+                raise ParseError("Unterminated string", self.fileId, self.line)
 
-    def lexString(self, ch):
-        token = self.token
-        input = self.source
-        token.type = "string"
-
-        hasEscapes = False
-        delim = ch
-        ch = input[self.cursor]
-        self.cursor += 1
-        while ch != delim:
-            if ch == "\\":
-                hasEscapes = True
-                self.cursor += 1
+            else:
+                raise ParseError("Illegal token: %s (Code: %s)" % (ch, ord(ch)), self.fileId, self.line)
 
-            ch = input[self.cursor]
-            self.cursor += 1
+            token.end = self.cursor
+            return token.type
 
-        if hasEscapes:
-            token.value = eval(input[token.start:self.cursor])
-        else:
-            token.value = input[token.start+1:self.cursor-1]
+        kind = match.lastgroup
+        value = match.group(kind)
+        token.start = match.start(kind)
+        self.cursor = match.end()
 
+        if kind == "identifier":
+            if value in Lang.keywords:
+                token.type = value
+            else:
+                token.type = "identifier"
+                token.value = value
 
-    def lexRegExp(self, ch):
-        token = self.token
-        input = self.source
-        token.type = "regexp"
+        elif kind == "operator":
+            if scanOperand and value == "/":
+                match = regExpExpr.match(input, token.start)
+                if match is None:
+                    raise ParseError("Unterminated regex", self.fileId, self.line)
 
-        while (True):
-            try:
-                ch = input[self.cursor]
-                self.cursor += 1
-            except IndexError:
-                raise ParseError("Unterminated regex", self.fileId, self.line)
+                token.type = "regexp"
+                token.value = match.group()
+                self.cursor = match.end()
 
-            if ch == "\\":
+            elif value in assignOperators and input.startswith("=", self.cursor):
                 self.cursor += 1
-                
-            elif ch == "[":
-                while (True):
-                    if ch == "\\":
-                        self.cursor += 1
-
-                    try:
-                        ch = input[self.cursor]
-                        self.cursor += 1
-                    except IndexError:
-                        raise ParseError("Unterminated character class", self.fileId, self.line)
-                    
-                    if ch == "]":
-                        break
-                    
-            if ch == "/":
-                break
-
-        while(True):
-            ch = input[self.cursor]
-            self.cursor += 1
-            if not (ch >= "a" and ch <= "z"):
-                break
+                token.type = "assign"
+                token.assignOp = operatorNames[value]
 
-        self.cursor -= 1
-        token.value = input[token.start:self.cursor]
-    
-
-    def lexOp(self, ch):
-        token = self.token
-        input = self.source
-
-        op = ch
-        while(True):
-            try:
-                next = input[self.cursor]
-            except IndexError:
-                break
-                
-            if (op + next) in operatorNames:
-                self.cursor += 1
-                op += next
             else:
-                break
-        
-        try:
-            next = input[self.cursor]
-        except IndexError:
-            next = None
-
-        if next == "=" and op in assignOperators:
-            self.cursor += 1
-            token.type = "assign"
-            token.assignOp = operatorNames[op]
-            op += "="
-            
-        else:
-            token.type = operatorNames[op]
-            token.assignOp = None
-
+                token.type = operatorNames[value]
+                token.assignOp = None
 
-    # FIXME: Unicode escape sequences
-    # FIXME: Unicode identifiers
-    def lexIdent(self, ch):
-        token = self.token
-        input = self.source
+        elif kind == "string":
+            token.type = "string"
+            if "\\" in value:
+                token.value = eval(value)
+            else:
+                token.value = value[1:-1]
 
-        try:
-            while True:
-                ch = input[self.cursor]
-                self.cursor += 1
-            
-                if not ((ch >= "a" and ch <= "z") or (ch >= "A" and ch <= "Z") or (ch >= "0" and ch <= "9") or ch == "$" or ch == "_"):
-                    break
-                    
-        except IndexError:
-            self.cursor += 1
-            pass
-        
-        # Put the non-word character back.
-        self.cursor -= 1
+        elif kind == "dot":
+            token.type = "dot"
 
-        identifier = input[token.start:self.cursor]
-        if identifier in Lang.keywords:
-            token.type = identifier
         else:
-            token.type = "identifier"
-            token.value = identifier
-
-
-    def get(self, scanOperand=False):
-        """ 
-        It consumes input *only* if there is no lookahead.
-        Dispatches to the appropriate lexing function depending on the input.
-        """
-        while self.lookahead:
-            self.lookahead -= 1
-            self.tokenIndex = (self.tokenIndex + 1) & 3
-            token = self.tokens[self.tokenIndex]
-            if token.type != "newline" or self.scanNewlines:
-                return token.type
-
-        self.skip()
-
-        self.tokenIndex = (self.tokenIndex + 1) & 3
-        self.tokens[self.tokenIndex] = token = Token()
-
-        token.start = self.cursor
-        token.line = self.line
-
-        input = self.source
-        if self.cursor == len(input):
-            token.end = token.start
-            token.type = "end"
-            return token.type
-
-        ch = input[self.cursor]
-        self.cursor += 1
-        
-        if (ch >= "a" and ch <= "z") or (ch >= "A" and ch <= "Z") or ch == "$" or ch == "_":
-            self.lexIdent(ch)
-        
-        elif scanOperand and ch == "/":
-            self.lexRegExp(ch)
-        
-        elif ch == ".":
-            self.lexDot(ch)
+            # Numbers without an exponent must not be followed by an incomplete one
+            if kind != "hex" and kind != "octal" and not "e" in value and not "E" in value and input[self.cursor:self.cursor+1] in ("e", "E"):
+                raise ParseError("Missing exponent", self.fileId, self.line)
 
-        elif self.scanNewlines and ch == "\n":
-            token.type = "newline"
-            self.line += 1
+            token.type = "number"
 
-        elif ch in operatorNames:
-            self.lexOp(ch)
-        
-        elif ch >= "1" and ch <= "9":
-            self.lexNumber(ch)
-        
-        elif ch == "0":
-            self.lexZeroNumber(ch)
-        
-        elif ch == '"' or ch == "'":
-            self.lexString(ch)
-        
-        else:
-            raise ParseError("Illegal token: %s (Code: %s)" % (ch, ord(ch)), self.fileId, self.line)
+            # Integers are stored as such, all other numbers keep their original notation
+            if kind == "integer":
+                token.value = int(value)
+            elif kind == "zero":
+                token.value = 0
+            else:
+                token.value = value
 
         token.end = self.cursor
         return token.type
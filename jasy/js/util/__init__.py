@@ -411,4 +411,35 @@ def assembleDot(node, result=None):
             return None
 
     return ".".join(result)
-    
\ No newline at end of file
+    
+
+
+def getNodePath(node):
+    """
+    Returns the position of the given node inside its tree as tuple of child indexes (starting at the root)
+    """
+
+    path = []
+    parent = getattr(node, "parent", None)
+    while parent is not None:
+        path.append(parent.index(node))
+        node = parent
+        parent = getattr(node, "parent", None)
+
+    path.reverse()
+    return tuple(path)
+
+
+def resolveNodePath(tree, path):
+    """
+    Returns the node at the given position (see getNodePath()) or None when the tree has no such node
+    """
+
+    node = tree
+    for index in path:
+        if node is None or index >= len(node):
+            return None
+
+        node = node[index]
+
+    return node
@@ -5,6 +5,23 @@
 
 import json, copy
 
+# Marker for slots which are not set
+__missing = object()
+
+def getAttributes(node):
+    """Returns a list of name/value pairs of all attributes (slots) set on the given node"""
+
+    missing = __missing
+    result = []
+    for name in node.__slots__:
+        value = getattr(node, name, missing)
+        if value is not missing:
+            result.append((name, value))
+
+    return result
+
+
+
 class AbstractNode(list):
     
     __slots__ = [
@@ -49,8 +66,12 @@ class AbstractNode(list):
 
             self.tokenizer = tokenizer
             
-        elif type:
-            self.type = type
+        else:
+            # Nodes created by optimizers (or restored from storage) are used to create further nodes
+            self.tokenizer = None
+
+            if type:
+                self.type = type
 
         for arg in args:
             self.append(arg)
@@ -152,7 +173,7 @@ class AbstractNode(list):
             if not isinstance(kid, AbstractNode):
                 raise Exception("Invalid kid: %s" % kid)
             
-            if hasattr(kid, "tokenizer"):
+            if getattr(kid, "tokenizer", None) is not None:
                 if hasattr(kid, "start"):
                     if not hasattr(self, "start") or self.start == None or kid.start < self.start:
                         self.start = kid.start
@@ -287,45 +308,64 @@ class AbstractNode(list):
         return result
         
         
-    def __deepcopy__(self, memo):
-        """Used by deepcopy function to clone AbstractNode instances"""
-        
-        CurrentClass = self.__class__
+    def clone(self, memo=None):
+        """
+        Returns a copy of the node including all its children. Works non-recursively so that
+        deeply nested trees do not hit the recursion limit (also used by deepcopy()). The optional
+        memo dictionary (id of original => copy) is filled with all copied nodes.
+        """
+
+        if memo is None:
+            memo = {}
+
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+
+        # Copy the structure first so that attributes can be mapped to the copied nodes afterwards
+        copies = [(self, result)]
+        pending = [(self, result)]
+        while pending:
+            node, nodeCopy = pending.pop()
+
+            # Using simple list appends for better performance
+            for child in node:
+                if child is None:
+                    list.append(nodeCopy, None)
+                else:
+                    childCopy = child.__class__.__new__(child.__class__)
+                    childCopy.parent = nodeCopy
+                    memo[id(child)] = childCopy
+                    list.append(nodeCopy, childCopy)
+
+                    copies.append((child, childCopy))
+                    pending.append((child, childCopy))
 
-        # Create copy
-        if hasattr(self, "tokenizer"):
-            result = CurrentClass(tokenizer=self.tokenizer)
-        else:
-            result = CurrentClass(type=self.type)
-        
-        # Copy children
-        for child in self:
-            if child is None:
-                list.append(result, None)
-            else:
-                # Using simple list appends for better performance
-                childCopy = copy.deepcopy(child, memo)
-                childCopy.parent = result
-                list.append(result, childCopy)
-        
         # Sync attributes
-        # Note: "parent" attribute is handled by append() already
-        for name in self.__slots__:
-            if hasattr(self, name) and not name in ("parent", "tokenizer"):
-                value = getattr(self, name)
-                if value is None:
+        # Note: "parent" attribute is handled above already
+        for node, nodeCopy in copies:
+            for name, value in getAttributes(node):
+                if name == "parent":
                     pass
-                elif type(value) in (bool, int, float, str):
-                    setattr(result, name, value)
-                elif type(value) in (list, set, dict, CurrentClass):
-                    setattr(result, name, copy.deepcopy(value, memo))
+                elif value is None or name == "tokenizer" or type(value) in (bool, int, float, str):
+                    setattr(nodeCopy, name, value)
+                elif isinstance(value, AbstractNode):
+                    mapped = memo.get(id(value))
+                    setattr(nodeCopy, name, mapped if mapped is not None else value.clone(memo))
+                elif type(value) in (list, set, dict):
+                    setattr(nodeCopy, name, copy.deepcopy(value, memo))
                 # Scope can be assigned (will be re-created when needed for the copied node)
                 elif name == "scope":
-                    result.scope = self.scope
+                    nodeCopy.scope = value
 
         return result
-        
-        
+
+
+    def __deepcopy__(self, memo):
+        """Used by deepcopy function to clone AbstractNode instances"""
+
+        return self.clone(memo)
+
+
     def getSource(self):
         """Returns the source code of the node"""
 
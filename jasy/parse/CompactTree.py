@@ -0,0 +1,447 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Compact read-only representation of syntax trees based on AbstractNode.
+
+All nodes of a tree are stored in one table of parallel typed arrays (type, position,
+parent, relation and ranges of children and attributes) instead of one list object
+with a full set of slots per node. Strings are interned per tree. Passes which only
+read the tree (e.g. collecting meta data, fields or translations) work on lightweight
+views (see CompactNode) which are created on access. A mutable copy of a tree (or
+of one of its sub trees) is created by materialize() when a pass needs to modify it.
+"""
+
+import array, copy, sys
+
+from jasy.parse.AbstractNode import AbstractNode, getAttributes
+
+__all__ = ["CompactTree", "CompactNode"]
+
+
+# Attributes stored in the columns of the node table or rebuilt by materialize()
+columnAttributes = ("type", "line", "start", "end", "rel", "parent", "tokenizer")
+
+
+class CompactTree():
+    """
+    Node table of a syntax tree. Nodes are numbered in document order (depth-first, parents
+    before their children) so that all nodes of the sub tree of node N are stored in the range
+    N to N+sizes[N]. Missing positions or parents are stored as -1. Children of node N are
+    stored in children[childOffsets[N]:childOffsets[N+1]] (-1 for empty children like in
+    array holes) and its attributes in attributeNames/attributeValues[attributeOffsets[N]:attributeOffsets[N+1]].
+    """
+
+    def __init__(self, tree):
+        self.__nodeClass = tree.__class__
+
+        # Index of each interned string
+        ids = self.ids = {}
+        strings = self.strings = []
+
+        def intern(value):
+            index = ids.get(value)
+            if index is None:
+                index = ids[value] = len(strings)
+                strings.append(value)
+
+            return index
+
+        types = self.types = array.array("i")
+        lines = self.lines = array.array("i")
+        starts = self.starts = array.array("i")
+        ends = self.ends = array.array("i")
+        parents = self.parents = array.array("i")
+        rels = self.rels = array.array("i")
+        childOffsets = self.childOffsets = array.array("I")
+        children = self.children = array.array("i")
+        attributeOffsets = self.attributeOffsets = array.array("I")
+        attributeNames = self.attributeNames = array.array("i")
+        attributeValues = self.attributeValues = []
+
+        # Values set on views after building the table (index => name => value)
+        self.annotations = {}
+
+        # Nodes are numbered when taken from the stack. Their position in the list
+        # of children of the parent is reserved before.
+        pending = [(tree, -1, -1)]
+        while pending:
+            node, parentIndex, slot = pending.pop()
+            index = len(types)
+            if slot >= 0:
+                children[slot] = index
+
+            line = start = end = rel = None
+
+            attributeOffsets.append(len(attributeNames))
+            for name, value in getAttributes(node):
+                if name == "line":
+                    line = value
+                elif name == "start":
+                    start = value
+                elif name == "end":
+                    end = value
+                elif name == "rel":
+                    rel = value
+                elif name in columnAttributes:
+                    pass
+
+                # Related children are restored through their "rel" attribute
+                elif not isinstance(value, AbstractNode):
+                    attributeNames.append(intern(name))
+                    attributeValues.append(strings[intern(value)] if type(value) is str else value)
+
+            types.append(intern(node.type))
+            lines.append(-1 if line is None else line)
+            starts.append(-1 if start is None else start)
+            ends.append(-1 if end is None else end)
+            rels.append(-1 if rel is None else intern(rel))
+            parents.append(parentIndex)
+
+            first = len(children)
+            childOffsets.append(first)
+
+            count = len(node)
+            if count:
+                children.extend([-1] * count)
+                for pos in range(count-1, -1, -1):
+                    child = node[pos]
+                    if child is not None:
+                        pending.append((child, index, first + pos))
+
+        childOffsets.append(len(children))
+        attributeOffsets.append(len(attributeNames))
+
+        sizes = self.sizes = array.array("I", [1]) * len(types)
+        for index in range(len(types)-1, 0, -1):
+            sizes[parents[index]] += sizes[index]
+
+
+    def __len__(self):
+        """Number of nodes in the tree"""
+
+        return len(self.types)
+
+
+    def __sizeof__(self):
+        """Memory used by the node table (excluding the strings and attribute values)"""
+
+        size = object.__sizeof__(self)
+        for column in (self.types, self.lines, self.starts, self.ends, self.parents, self.sizes, self.rels, self.childOffsets, self.children, self.attributeOffsets, self.attributeNames):
+            size += sys.getsizeof(column)
+
+        return size
+
+
+    def getRoot(self):
+        """Returns a view of the root node"""
+
+        return CompactNode(self, 0)
+
+
+    def findNodes(self, type, index=0):
+        """Returns the indexes of all nodes of the given type in the sub tree of the given node (in document order)"""
+
+        typeId = self.ids.get(type)
+        if typeId is None:
+            return []
+
+        types = self.types
+        return [pos for pos in range(index, index + self.sizes[index]) if types[pos] == typeId]
+
+
+    def collectValues(self, name, index=0):
+        """Returns the values of the given attribute of all nodes in the sub tree of the given node (in document order)"""
+
+        nameId = self.ids.get(name)
+        if nameId is None:
+            return []
+
+        attributeOffsets = self.attributeOffsets
+        attributeNames = self.attributeNames
+        attributeValues = self.attributeValues
+
+        return [attributeValues[pos] for pos in range(attributeOffsets[index], attributeOffsets[index + self.sizes[index]]) if attributeNames[pos] == nameId]
+
+
+    def materialize(self, index=0):
+        """Returns a mutable copy (using the original node class) of the node with the given index and all its children"""
+
+        nodeClass = self.__nodeClass
+        strings = self.strings
+        types = self.types
+        lines = self.lines
+        starts = self.starts
+        ends = self.ends
+        rels = self.rels
+        childOffsets = self.childOffsets
+        children = self.children
+        attributeOffsets = self.attributeOffsets
+        attributeNames = self.attributeNames
+        attributeValues = self.attributeValues
+        annotations = self.annotations
+
+        result = nodeClass.__new__(nodeClass)
+        pending = [(index, result)]
+
+        while pending:
+            index, node = pending.pop()
+
+            node.type = strings[types[index]]
+            node.tokenizer = None
+
+            value = lines[index]
+            node.line = None if value < 0 else value
+            value = starts[index]
+            node.start = None if value < 0 else value
+            value = ends[index]
+            node.end = None if value < 0 else value
+
+            if rels[index] >= 0:
+                node.rel = strings[rels[index]]
+
+            for pos in range(attributeOffsets[index], attributeOffsets[index+1]):
+                value = attributeValues[pos]
+
+                # Same as in AbstractNode.clone()
+                if type(value) in (list, set, dict):
+                    value = copy.deepcopy(value)
+
+                setattr(node, strings[attributeNames[pos]], value)
+
+            if index in annotations:
+                for name, value in annotations[index].items():
+                    setattr(node, name, value)
+
+            # Using simple list appends for better performance (same as in AbstractNode.clone())
+            for pos in range(childOffsets[index], childOffsets[index+1]):
+                childIndex = children[pos]
+                if childIndex < 0:
+                    list.append(node, None)
+                else:
+                    child = nodeClass.__new__(nodeClass)
+                    child.parent = node
+                    list.append(node, child)
+
+                    if rels[childIndex] >= 0:
+                        setattr(node, strings[rels[childIndex]], child)
+
+                    pending.append((childIndex, child))
+
+        return result
+
+
+
+class CompactNode():
+    """
+    Read-only view of one node of a CompactTree. Offers the same interface for reading
+    as AbstractNode (type, positions, parent, attributes, related and indexed children).
+    Views are created on access and compare equal when they refer to the same node.
+    """
+
+    __slots__ = ["__tree", "__index"]
+
+    def __init__(self, tree, index):
+        self.__tree = tree
+        self.__index = index
+
+
+    @property
+    def type(self):
+        tree = self.__tree
+        return tree.strings[tree.types[self.__index]]
+
+    @property
+    def line(self):
+        value = self.__tree.lines[self.__index]
+        return None if value < 0 else value
+
+    @property
+    def start(self):
+        value = self.__tree.starts[self.__index]
+        return None if value < 0 else value
+
+    @property
+    def end(self):
+        value = self.__tree.ends[self.__index]
+        return None if value < 0 else value
+
+    @property
+    def parent(self):
+        index = self.__tree.parents[self.__index]
+        if index < 0:
+            raise AttributeError("parent")
+
+        return CompactNode(self.__tree, index)
+
+    @property
+    def rel(self):
+        tree = self.__tree
+        index = tree.rels[self.__index]
+        if index < 0:
+            raise AttributeError("rel")
+
+        return tree.strings[index]
+
+    @property
+    def tokenizer(self):
+        return None
+
+    @property
+    def scope(self):
+        annotations = self.__tree.annotations.get(self.__index)
+        if annotations and "scope" in annotations:
+            return annotations["scope"]
+
+        return self.__getattr__("scope")
+
+    @scope.setter
+    def scope(self, value):
+        self.__tree.annotations.setdefault(self.__index, {})["scope"] = value
+
+
+    def __getattr__(self, name):
+        tree = self.__tree
+        index = self.__index
+
+        # Names which are not used anywhere in the tree
+        nameId = tree.ids.get(name)
+        if nameId is None:
+            raise AttributeError(name)
+
+        attributeNames = tree.attributeNames
+        for pos in range(tree.attributeOffsets[index], tree.attributeOffsets[index+1]):
+            if attributeNames[pos] == nameId:
+                return tree.attributeValues[pos]
+
+        # Related children
+        rels = tree.rels
+        children = tree.children
+        for pos in range(tree.childOffsets[index], tree.childOffsets[index+1]):
+            childIndex = children[pos]
+            if childIndex >= 0 and rels[childIndex] == nameId:
+                return CompactNode(tree, childIndex)
+
+        raise AttributeError(name)
+
+
+    def __len__(self):
+        childOffsets = self.__tree.childOffsets
+        return childOffsets[self.__index+1] - childOffsets[self.__index]
+
+
+    def __getitem__(self, key):
+        tree = self.__tree
+        first = tree.childOffsets[self.__index]
+        length = tree.childOffsets[self.__index+1] - first
+
+        if type(key) is slice:
+            return [self[pos] for pos in range(*key.indices(length))]
+
+        if key < 0:
+            key += length
+
+        if key < 0 or key >= length:
+            raise IndexError("child index out of range")
+
+        childIndex = tree.children[first + key]
+        return None if childIndex < 0 else CompactNode(tree, childIndex)
+
+
+    def __getChildren(self):
+        tree = self.__tree
+        index = self.__index
+        return [None if childIndex < 0 else CompactNode(tree, childIndex) for childIndex in tree.children[tree.childOffsets[index]:tree.childOffsets[index+1]]]
+
+
+    def __iter__(self):
+        return iter(self.__getChildren())
+
+
+    def __reversed__(self):
+        return reversed(self.__getChildren())
+
+
+    def __contains__(self, kid):
+        for child in self:
+            if child == kid:
+                return True
+
+        return False
+
+
+    def index(self, kid):
+        for pos, child in enumerate(self):
+            if child == kid:
+                return pos
+
+        raise ValueError("Given node is no child!")
+
+
+    def __eq__(self, other):
+        return type(other) is CompactNode and other.__tree is self.__tree and other.__index == self.__index
+
+    def __ne__(self, other):
+        return type(other) is not CompactNode or other.__tree is not self.__tree or other.__index != self.__index
+
+    def __hash__(self):
+        return hash((id(self.__tree), self.__index))
+
+    def __bool__(self):
+        return True
+
+
+    def getFileName(self):
+        """Traverses up the tree to find a node with a fileId and returns it"""
+
+        node = self
+        while node:
+            fileId = getattr(node, "fileId", None)
+            if fileId is not None:
+                return fileId
+
+            node = getattr(node, "parent", None)
+
+
+    def getUnrelatedChildren(self):
+        """Collects all unrelated children"""
+
+        return [child for child in self if not hasattr(child, "rel")]
+
+
+    def getChildrenLength(self, filter=True):
+        """Number of (per default unrelated) children"""
+
+        return len([child for child in self if not filter or not hasattr(child, "rel")])
+
+
+    def findNodes(self, type):
+        """Returns views of all nodes of the given type in the sub tree of this node (in document order)"""
+
+        tree = self.__tree
+        return [CompactNode(tree, index) for index in tree.findNodes(type, self.__index)]
+
+
+    def collectValues(self, name):
+        """Returns the values of the given attribute of all nodes in the sub tree of this node (in document order)"""
+
+        return self.__tree.collectValues(name, self.__index)
+
+
+    def materialize(self):
+        """Returns a mutable copy of this node and all its children"""
+
+        return self.__tree.materialize(self.__index)
+
+
+    def toXml(self, format=True, indent=0, tab="  "):
+        """Converts the node to XML"""
+
+        return self.materialize().toXml(format, indent, tab)
+
+
+    # Map Python built-ins
+    __repr__ = toXml
+    __str__ = toXml
@@ -0,0 +1,269 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Runs passes over syntax trees based on AbstractNode.
+
+Each pass implements handlers which are called for every node of the tree: enter() before
+the children of the node are visited and leave() afterwards. Passes which are compatible
+share one iterative walk over the tree so that the tree is traversed once for all of them
+instead of once per pass (and independently from Python's recursion limit).
+
+Ordering constraints are declared by the passes themselves: a pass lists the names of the
+passes it has to run after. Passes named in "after" only need to process each node before
+this pass does, so both are still executed in the same walk. Passes named in "requires"
+need to be finished on the whole tree before this pass starts, which starts a new walk.
+
+The time spent in each walk is collected per combination of passes. A breakdown
+per pass is available after enabling profiling (see setProfiling() and getStatistics()).
+"""
+
+import collections, time
+
+import jasy.core.Console as Console
+
+__all__ = ["Pass", "Pipeline", "Error", "setProfiling", "getStatistics", "resetStatistics", "printStatistics"]
+
+
+# Time spent per walk or pass (see getStatistics())
+statisticFields = ("runs", "time")
+statistics = collections.defaultdict(lambda: dict.fromkeys(statisticFields, 0))
+
+# Whether the time spent in the handlers is measured per pass
+profiling = False
+
+# Walk time which is not spent in any of the handlers e.g. for maintaining the list of pending nodes
+walkStatistic = "(walk)"
+
+
+def setProfiling(enabled):
+    """
+    Configures whether the time spent in each pass is measured. Otherwise only the time
+    of each walk is recorded (named by the passes it contains) which has no overhead per node.
+    """
+
+    global profiling
+    profiling = enabled
+
+
+def getStatistics():
+    """Returns the number of runs and the time spent (in seconds) per walk or pass"""
+
+    return { name : dict(statistics[name]) for name in statistics }
+
+
+def resetStatistics():
+    """Resets all timing counters"""
+
+    statistics.clear()
+
+
+def printStatistics():
+    """Prints the time spent per walk or pass"""
+
+    Console.info("%-20s %8s %10s", "Pass", "Runs", "Time ms")
+
+    for name in sorted(statistics, key=lambda name: -statistics[name]["time"]):
+        entry = statistics[name]
+        Console.info("%-20s %8s %10.1f", name, entry["runs"], entry["time"] * 1000)
+
+
+
+class Error(Exception):
+    """
+    Error object which is raised whenever the ordering constraints of passes can not be fulfilled.
+    """
+
+    def __init__(self, msg):
+        self.__msg = msg
+
+    def __str__(self):
+        return "Invalid pipeline! %s" % (self.__msg)
+
+
+
+class Pass():
+    """
+    Base class of all passes. Subclasses override the handlers they need. Handlers
+    which are not overridden are not called at all.
+
+    - begin(tree) is called before the walk which contains the pass
+    - enter(node) is called before the children of the node are visited
+    - leave(node) is called after all children of the node were visited. The node might be
+      replaced in or removed from its parent. Nodes moved around are not visited again.
+    - finish(tree) is called after the walk
+    """
+
+    # Unique name of the pass (used for ordering constraints and statistics)
+    name = None
+
+    # Passes which have to process each node before this pass (same walk)
+    after = ()
+
+    # Passes which have to be finished on the whole tree before this pass (separate walk)
+    requires = ()
+
+    def begin(self, tree):
+        pass
+
+    def enter(self, node):
+        pass
+
+    def leave(self, node):
+        pass
+
+    def finish(self, tree):
+        pass
+
+
+
+class Pipeline():
+    """
+    Runs the given passes over trees. Passes are ordered based on their constraints
+    (keeping the given order otherwise) and grouped into as few walks as possible.
+    """
+
+    def __init__(self, passes):
+        self.__stages = []
+
+        stage = None
+        names = set()
+
+        for current in self.__sort(passes):
+            if stage is None or names.intersection(current.requires):
+                stage = []
+                names = set()
+                self.__stages.append(stage)
+
+            stage.append(current)
+            names.add(current.name)
+
+
+    def getStages(self):
+        """Returns the names of the passes per walk"""
+
+        return [[current.name for current in stage] for stage in self.__stages]
+
+
+    def run(self, tree):
+        """Runs all passes over the given tree. Modifies the tree in-place."""
+
+        for stage in self.__stages:
+            Console.debug("Running passes: %s...", ", ".join([current.name for current in stage]))
+            Console.indent()
+            self.__walk(tree, stage)
+            Console.outdent()
+
+
+    def __sort(self, passes):
+        """Orders the given passes to fulfill their constraints. Otherwise keeps the given order."""
+
+        remaining = list(passes)
+        result = []
+
+        while remaining:
+            names = set([current.name for current in remaining])
+            for current in remaining:
+                if not names.intersection(current.after) and not names.intersection(current.requires):
+                    break
+            else:
+                raise Error("Cyclic ordering constraints between: %s" % ", ".join(sorted(names)))
+
+            remaining.remove(current)
+            result.append(current)
+
+        return result
+
+
+    def __walk(self, tree, stage):
+        """Visits all nodes of the tree once and calls the handlers of all passes of the given stage"""
+
+        clock = time.perf_counter
+        timers = {}
+
+        # Sums up the time spent in all handler calls of one pass
+        def timed(handler, timer):
+            def wrapper(node):
+                start = clock()
+                handler(node)
+                timer[0] += clock() - start
+
+            return wrapper
+
+        begins = []
+        enters = []
+        leaves = []
+        finishes = []
+
+        for current in stage:
+            handlers = [current.begin, None, None, current.finish]
+            if type(current).enter is not Pass.enter:
+                handlers[1] = current.enter
+            if type(current).leave is not Pass.leave:
+                handlers[2] = current.leave
+
+            if profiling:
+                timer = timers[current.name] = [0]
+                handlers = [handler and timed(handler, timer) for handler in handlers]
+
+            begins.append(handlers[0])
+            if handlers[1]:
+                enters.append(handlers[1])
+            if handlers[2]:
+                leaves.append(handlers[2])
+            finishes.append(handlers[3])
+
+        start = clock()
+        for begin in begins:
+            begin(tree)
+
+        # Children are pushed when their parent is entered which means that modifications
+        # of the list of children by handlers do not affect the walk. Nodes to leave are marked by None.
+        if enters or leaves:
+            pending = [tree]
+            push = pending.append
+            pop = pending.pop
+
+            while pending:
+                node = pop()
+                if node is None:
+                    node = pop()
+                    for leave in leaves:
+                        leave(node)
+
+                    continue
+
+                for enter in enters:
+                    enter(node)
+
+                if leaves:
+                    push(node)
+                    push(None)
+
+                for child in reversed(node):
+                    # None children are allowed sometimes e.g. during array_init like [1,2,,,7,8]
+                    if child is not None:
+                        push(child)
+
+        for finish in finishes:
+            finish(tree)
+
+        total = clock() - start
+
+        if profiling:
+            # Time not spent in any handler is counted for the walk itself
+            for current in stage:
+                entry = statistics[current.name]
+                entry["runs"] += 1
+                entry["time"] += timers[current.name][0]
+                total -= timers[current.name][0]
+
+            entry = statistics[walkStatistic]
+
+        else:
+            entry = statistics["+".join([current.name for current in stage])]
+
+        entry["runs"] += 1
+        entry["time"] += total
@@ -0,0 +1,286 @@
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Compact binary encoding of syntax trees based on AbstractNode.
+
+Trees are written as a string table followed by a depth-first stream of node records.
+All numbers are encoded as variable length integers. Primitive attributes are stored
+inline, only rich values like scope data and comment objects are collected and pickled
+in one block at the end. References to the tokenizer are never stored.
+"""
+
+import struct, pickle
+
+from jasy.parse.AbstractNode import AbstractNode
+
+__all__ = ["dump", "load", "StoreError"]
+
+
+# Increase whenever the binary layout changes
+VERSION = 1
+
+MAGIC = b"JTS"
+
+__header = struct.Struct("<3sB")
+__double = struct.Struct("<d")
+
+
+# Value tags
+TAG_NONE = 0
+TAG_TRUE = 1
+TAG_FALSE = 2
+TAG_INT = 3
+TAG_STRING = 4
+TAG_FLOAT = 5
+TAG_OBJECT = 6
+
+# Node markers
+NODE_EMPTY = 0
+NODE_DATA = 1
+
+# Attributes which are encoded in the record head or are rebuilt by the loader
+__ignoredAttributes = ("type", "line", "start", "end", "parent", "tokenizer")
+
+# Marker for unset slots
+__missing = object()
+
+
+class StoreError(Exception):
+    pass
+
+
+
+#
+# Encoder
+#
+
+def dump(tree):
+    """Returns the bytes representation of the given tree"""
+
+    strings = {}
+    objects = []
+    attributeNames = {}
+    output = bytearray()
+    append = output.append
+
+    def writeNumber(value):
+        # Zig-zag encoding to support negative values
+        value = (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+        while value > 0x7F:
+            append((value & 0x7F) | 0x80)
+            value >>= 7
+
+        append(value)
+
+    def writeString(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+
+        writeNumber(index)
+
+    def writeOptional(value):
+        # Position data might be None (e.g. for nodes without tokenizer)
+        if value is None:
+            writeNumber(0)
+        else:
+            writeNumber(value + 1)
+
+    def writeValue(value):
+        if value is None:
+            append(TAG_NONE)
+        elif value is True:
+            append(TAG_TRUE)
+        elif value is False:
+            append(TAG_FALSE)
+        elif type(value) is int:
+            append(TAG_INT)
+            writeNumber(value)
+        elif type(value) is str:
+            append(TAG_STRING)
+            writeString(value)
+        elif type(value) is float:
+            append(TAG_FLOAT)
+            output.extend(__double.pack(value))
+        else:
+            append(TAG_OBJECT)
+            writeNumber(len(objects))
+            objects.append(value)
+
+    def writeNode(node):
+        if node is None:
+            append(NODE_EMPTY)
+            return
+
+        append(NODE_DATA)
+        writeString(node.type)
+        writeOptional(getattr(node, "line", None))
+        writeOptional(getattr(node, "start", None))
+        writeOptional(getattr(node, "end", None))
+
+        nodeClass = node.__class__
+        names = attributeNames.get(nodeClass)
+        if names is None:
+            names = attributeNames[nodeClass] = [name for name in nodeClass.__slots__ if not name in __ignoredAttributes]
+
+        attributes = []
+        for name in names:
+            value = getattr(node, name, __missing)
+            if value is __missing:
+                continue
+
+            # Related children are restored through their "rel" attribute
+            if isinstance(value, AbstractNode):
+                continue
+
+            attributes.append((name, value))
+
+        writeNumber(len(attributes))
+        for name, value in attributes:
+            writeString(name)
+            writeValue(value)
+
+        writeNumber(len(node))
+        for child in node:
+            writeNode(child)
+
+    writeNode(tree)
+
+    # Prepend string table, append pickled objects
+    table = "\0".join(sorted(strings, key=strings.get)).encode("utf-8")
+    objectData = pickle.dumps(objects, pickle.HIGHEST_PROTOCOL) if objects else b""
+
+    result = bytearray(__header.pack(MAGIC, VERSION))
+    result.extend(struct.pack("<III", len(strings), len(table), len(output)))
+    result.extend(table)
+    result.extend(output)
+    result.extend(objectData)
+
+    return bytes(result)
+
+
+
+#
+# Decoder
+#
+
+def load(data, nodeClass):
+    """
+    Rebuilds a tree out of the given bytes using the given node class. Parent and
+    relation links are restored while decoding. Nodes are detached from any tokenizer.
+    """
+
+    try:
+        magic, version = __header.unpack_from(data, 0)
+    except struct.error:
+        raise StoreError("Invalid tree data!")
+
+    if magic != MAGIC:
+        raise StoreError("Invalid tree data!")
+
+    if version != VERSION:
+        raise StoreError("Unsupported tree data version: %s" % version)
+
+    offset = __header.size
+    try:
+        count, tableLength, nodesLength = struct.unpack_from("<III", data, offset)
+    except struct.error:
+        raise StoreError("Invalid tree data!")
+
+    offset += 12
+
+    strings = data[offset:offset+tableLength].decode("utf-8").split("\0") if count else []
+    offset += tableLength
+
+    objectOffset = offset + nodesLength
+    try:
+        objects = pickle.loads(data[objectOffset:]) if objectOffset < len(data) else []
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+        raise StoreError("Corrupt tree data: %s" % error)
+
+    # Using closure state for the read position
+    position = offset
+
+    def readNumber():
+        nonlocal position
+
+        shift = 0
+        result = 0
+        while True:
+            byte = data[position]
+            position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+
+        return (result >> 1) if not result & 1 else -((result + 1) >> 1)
+
+    def readOptional():
+        value = readNumber()
+        return None if value == 0 else value - 1
+
+    def readValue():
+        nonlocal position
+
+        tag = data[position]
+        position += 1
+
+        if tag == TAG_NONE:
+            return None
+        elif tag == TAG_TRUE:
+            return True
+        elif tag == TAG_FALSE:
+            return False
+        elif tag == TAG_INT:
+            return readNumber()
+        elif tag == TAG_STRING:
+            return strings[readNumber()]
+        elif tag == TAG_FLOAT:
+            value = __double.unpack_from(data, position)[0]
+            position += __double.size
+            return value
+        elif tag == TAG_OBJECT:
+            return objects[readNumber()]
+
+        raise StoreError("Invalid value tag: %s" % tag)
+
+    def readNode():
+        nonlocal position
+
+        marker = data[position]
+        position += 1
+
+        if marker == NODE_EMPTY:
+            return None
+
+        node = nodeClass(type=strings[readNumber()])
+        node.line = readOptional()
+        node.start = readOptional()
+        node.end = readOptional()
+
+        for pos in range(readNumber()):
+            name = strings[readNumber()]
+            setattr(node, name, readValue())
+
+        # Using simple list appends for better performance (same as in __deepcopy__)
+        for pos in range(readNumber()):
+            child = readNode()
+            if child is not None:
+                child.parent = node
+                rel = getattr(child, "rel", None)
+                if rel is not None:
+                    setattr(node, rel, child)
+
+            list.append(node, child)
+
+        return node
+
+    try:
+        return readNode()
+    except (IndexError, struct.error) as error:
+        raise StoreError("Corrupt tree data: %s" % error)
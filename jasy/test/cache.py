@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 
-import sys, os, unittest, logging, tempfile
+import sys, os, unittest, logging, tempfile, time
 
 # Extend PYTHONPATH with local 'lib' folder
 jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
 sys.path.insert(0, jasyroot)
 
 import jasy.core.Cache as Cache
+import jasy.core.CacheBackend as CacheBackend
+from jasy import UserError
 
 class Tests(unittest.TestCase):
 
@@ -85,6 +87,405 @@ class Tests(unittest.TestCase):
         cache.store("test", 1337, transient=True, inMemory=False)
         self.assertEqual(cache.read("test", inMemory=False), None)
 
+    def test_timestamp(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("test", 1337, timestamp=100, inMemory=False)
+        self.assertEqual(cache.read("test", 50, inMemory=False), 1337)
+        self.assertEqual(cache.read("test", 100, inMemory=False), 1337)
+        self.assertEqual(cache.read("test", 150, inMemory=False), None)
+
+    def test_sqlite_store_and_read(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, backend="sqlite")
+        cache.store("test", {"hello" : [1, 2, 3]}, timestamp=100, inMemory=False)
+        self.assertEqual(cache.read("test", inMemory=False), {"hello" : [1, 2, 3]})
+        self.assertEqual(cache.read("test", 150, inMemory=False), None)
+
+    def test_sqlite_close_and_reopen(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, backend="sqlite")
+        cache.store("test", 1337)
+        cache.close()
+        cache2 = Cache.Cache(tempDirectory, backend="sqlite")
+        self.assertEqual(cache2.read("test"), 1337)
+
+    def test_sqlite_concurrent_reader(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        writer = Cache.Cache(tempDirectory, backend="sqlite")
+        reader = Cache.Cache(tempDirectory, backend="sqlite")
+        writer.store("test", 1337)
+        self.assertEqual(reader.read("test"), None)
+        writer.sync()
+        self.assertEqual(reader.read("test"), 1337)
+
+    def test_sqlite_concurrent_writers(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+
+        timeout = CacheBackend.sqliteTimeout
+        CacheBackend.sqliteTimeout = 0.2
+        try:
+            first = Cache.Cache(tempDirectory, backend="sqlite")
+            second = Cache.Cache(tempDirectory, backend="sqlite")
+
+            # Full batches are committed which releases the lock
+            for pos in range(CacheBackend.sqliteBatchSize):
+                first.store("first[%s]" % pos, pos, inMemory=False)
+
+            second.store("second", 1, inMemory=False)
+
+            # Skipped while the other writer holds the lock
+            first.store("first[last]", 2, inMemory=False)
+
+            # Without waiting for the lock again until the next sync
+            start = time.time()
+            for pos in range(10):
+                first.store("first[more-%s]" % pos, pos, inMemory=False)
+
+            self.assertTrue(time.time() - start < CacheBackend.sqliteTimeout)
+            second.close()
+
+            self.assertEqual(first.read("second", inMemory=False), 1)
+            self.assertEqual(first.read("first[last]", inMemory=False), None)
+            self.assertEqual(first.read("first[more-0]", inMemory=False), None)
+            self.assertEqual(first.read("first[0]", inMemory=False), 0)
+
+            first.sync()
+            first.store("first[synced]", 3, inMemory=False)
+            self.assertEqual(first.read("first[synced]", inMemory=False), 3)
+            first.close()
+
+        finally:
+            CacheBackend.sqliteTimeout = timeout
+
+    def test_sqlite_clear(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, backend="sqlite")
+        cache.store("test", 1337)
+        cache.clear()
+        cache2 = Cache.Cache(tempDirectory, backend="sqlite")
+        self.assertEqual(cache2.read("test"), None)
+
+    def test_unknown_backend(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        self.assertRaises(UserError, Cache.Cache, tempDirectory, backend="unknown")
+
+    def test_memory_limit(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, memory=10000)
+        for pos in range(100):
+            cache.store("text[%s]" % pos, "x" * 500, transient=True)
+
+        self.assertEqual(cache.read("text[0]"), None)
+        self.assertEqual(cache.read("text[99]"), "x" * 500)
+
+    def test_memory_lru(self):
+
+        store = Cache.MemoryStore(3000)
+        store.set("a", "x" * 900)
+        store.set("b", "x" * 900)
+        store.get("a")
+        store.set("c", "x" * 900)
+        store.set("d", "x" * 900)
+        self.assertTrue("a" in store)
+        self.assertFalse("b" in store)
+        self.assertTrue("d" in store)
+        self.assertTrue(store.getSize() <= 3000)
+
+    def test_memory_large_first(self):
+
+        store = Cache.MemoryStore(32000)
+        store.set("tree[foo]", "x" * 10000)
+        store.set("small[a]", "x" * 500)
+        store.set("small[b]", "x" * 500)
+        store.set("tree[bar]", "x" * 22000)
+        self.assertFalse("tree[foo]" in store)
+        self.assertTrue("small[a]" in store)
+        self.assertTrue("small[b]" in store)
+        self.assertTrue("tree[bar]" in store)
+
+    def test_memory_pinned(self):
+
+        store = Cache.MemoryStore(1000)
+        store.set("facts[foo]", "x" * 5000)
+        store.set("fields[foo]", set(["debug"]))
+        for pos in range(20):
+            store.set("text[%s]" % pos, "x" * 200)
+
+        self.assertEqual(store.get("facts[foo]"), "x" * 5000)
+        self.assertEqual(store.get("fields[foo]"), set(["debug"]))
+
+        # Entries of permutations count against the budget
+        store.set("facts[foo]-debug:true@abc", "x" * 5000)
+        self.assertEqual(store.get("facts[foo]-debug:true@abc"), None)
+        self.assertTrue(Cache.isPinned("facts[foo]@abc"))
+        self.assertFalse(Cache.isPinned("facts[foo]-debug:true"))
+
+    def test_estimate_tree(self):
+
+        import jasy.js.parse.Parser as Parser
+        small = Cache.estimateSize(Parser.parse("x++;"))
+        large = Cache.estimateSize(Parser.parse("x++;" * 100))
+        self.assertTrue(large > small * 50)
+
+    def test_shared_read_through(self):
+
+        sharedDirectory = tempfile.TemporaryDirectory().name
+        firstDirectory = tempfile.TemporaryDirectory().name
+        secondDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(firstDirectory)
+        os.makedirs(secondDirectory)
+
+        first = Cache.Cache(firstDirectory, shared=sharedDirectory)
+        first.store("test@abc", 1337, shared=True)
+        first.store("local", 42)
+
+        second = Cache.Cache(secondDirectory, shared=sharedDirectory)
+        self.assertEqual(second.read("test@abc"), None)
+        self.assertEqual(second.read("test@abc", shared=True), 1337)
+        self.assertEqual(second.read("local", shared=True), None)
+
+        # Copied over to local storage
+        second.close()
+        third = Cache.Cache(secondDirectory)
+        self.assertEqual(third.read("test@abc"), 1337)
+
+    def test_shared_schema_versions(self):
+
+        sharedDirectory = tempfile.TemporaryDirectory().name
+        firstDirectory = tempfile.TemporaryDirectory().name
+        secondDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(firstDirectory)
+        os.makedirs(secondDirectory)
+
+        first = Cache.Cache(firstDirectory, shared=sharedDirectory)
+        first.store("tree[foo]@abc", 1337, shared=True)
+        first.store("fields[foo]@abc", 42, shared=True)
+        first.close()
+
+        # Entries of other schema versions are not shared
+        Cache.schemaVersions["tree"] += 1
+        try:
+            second = Cache.Cache(secondDirectory, shared=sharedDirectory)
+            self.assertEqual(second.read("tree[foo]@abc", shared=True), None)
+            self.assertEqual(second.read("fields[foo]@abc", shared=True), 42)
+        finally:
+            Cache.schemaVersions["tree"] -= 1
+
+    def test_shared_eviction(self):
+
+        sharedDirectory = tempfile.TemporaryDirectory().name
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+
+        cache = Cache.Cache(tempDirectory, shared=sharedDirectory, sharedLimit=50000)
+        for pos in range(10):
+            cache.store("entry[%s]@abc" % pos, os.urandom(10000), shared=True)
+
+        cache.close()
+
+        size = 0
+        for root, dirs, files in os.walk(sharedDirectory):
+            size += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+
+        self.assertTrue(size <= 50000)
+        self.assertTrue(size >= 40000)
+
+    def test_statistics(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        Cache.resetStatistics()
+
+        cache.store("meta[foo]", 1337, timestamp=100, inMemory=False)
+        cache.read("meta[foo]", inMemory=False)
+        cache.read("meta[foo]", 150, inMemory=False)
+        cache.read("meta[bar]")
+
+        statistics = Cache.getStatistics()
+        counters = statistics["namespaces"]["meta"]
+        self.assertEqual(counters["stores"], 1)
+        self.assertEqual(counters["hits"], 1)
+        self.assertEqual(counters["stale"], 1)
+        self.assertEqual(counters["misses"], 2)
+        self.assertTrue(counters["storedBytes"] > 0)
+        self.assertTrue(statistics["files"][cache.getFileName()] > 0)
+
+    def test_compression(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, codec="zlib")
+        Cache.resetStatistics()
+
+        cache.store("api[foo]", "x" * 100000, inMemory=False)
+        cache.store("api[bar]", "x", inMemory=False)
+        self.assertEqual(cache.read("api[foo]", inMemory=False), "x" * 100000)
+        self.assertEqual(cache.read("api[bar]", inMemory=False), "x")
+        self.assertTrue(Cache.getStatistics()["namespaces"]["api"]["storedBytes"] < 10000)
+
+    def test_codecs(self):
+
+        data = b"x" * 10000
+        for codec in Cache.codecs:
+            encoded = Cache.encode(data, codec)
+            self.assertEqual(encoded[:1], Cache.codecs[codec][0])
+            self.assertEqual(Cache.decode(encoded), data)
+
+        self.assertEqual(Cache.encode(b"x", "zlib"), b"-x")
+        self.assertRaises(ValueError, Cache.decode, b"?x")
+
+    def test_remove_and_compact(self):
+
+        for backend in ("shelve", "sqlite"):
+            tempDirectory = tempfile.TemporaryDirectory().name
+            os.makedirs(tempDirectory)
+            cache = Cache.Cache(tempDirectory, backend=backend)
+
+            for pos in range(20):
+                cache.store("entry[%s]" % pos, os.urandom(10000))
+
+            cache.sync()
+            for pos in range(19):
+                cache.remove("entry[%s]" % pos)
+
+            self.assertEqual(cache.keys(), ["entry[19]"])
+            self.assertEqual(cache.read("entry[0]"), None)
+            self.assertTrue(cache.compact() > 100000)
+            self.assertEqual(len(cache.read("entry[19]", inMemory=False)), 10000)
+
+    def test_schema_versions(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("tree[foo]", 1)
+        cache.store("fields[foo]", 2)
+        cache.close()
+
+        Cache.schemaVersions["tree"] += 1
+        try:
+            cache = Cache.Cache(tempDirectory)
+            self.assertEqual(cache.read("tree[foo]"), None)
+            self.assertEqual(cache.read("fields[foo]"), 2)
+        finally:
+            Cache.schemaVersions["tree"] -= 1
+
+    def test_schema_versions_new(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+
+        # Namespaces of brand new caches are never outdated
+        with self.assertLogs(level="DEBUG") as logs:
+            cache = Cache.Cache(tempDirectory)
+            logging.debug("Opened cache")
+
+        self.assertFalse([line for line in logs.output if "outdated" in line])
+        cache.close()
+
+    def test_writebehind(self):
+
+        for backend in ("shelve", "sqlite"):
+            tempDirectory = tempfile.TemporaryDirectory().name
+            os.makedirs(tempDirectory)
+            cache = Cache.Cache(tempDirectory, backend=backend, writebehind=True)
+
+            for pos in range(100):
+                cache.store("entry[%s]" % pos, pos, timestamp=100, inMemory=False)
+
+            self.assertEqual(cache.read("entry[50]", inMemory=False), 50)
+            self.assertEqual(cache.read("entry[50]", 150, inMemory=False), None)
+            self.assertEqual(cache.getTimestamp("entry[99]"), 100)
+            self.assertEqual(len(cache.keys()), 100)
+
+            cache.remove("entry[99]")
+            cache.close()
+
+            cache = Cache.Cache(tempDirectory, backend=backend)
+            self.assertEqual(cache.read("entry[98]"), 98)
+            self.assertEqual(cache.read("entry[99]"), None)
+
+    def test_writebehind_reopen(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, writebehind=True)
+        cache.store("test", 1)
+        cache.close()
+        cache.open()
+        cache.store("test", 2)
+        cache.sync()
+        self.assertEqual(cache.read("test", inMemory=False), 2)
+
+    def test_memory_backend(self):
+
+        cache = Cache.Cache(".", filename="unused", backend="memory")
+        cache.store("test[foo]-x", "hello", 42, inMemory=False)
+        cache.store("transient", "bye", transient=True)
+        self.assertEqual(cache.read("test[foo]-x", 42, inMemory=False), "hello")
+        self.assertEqual(cache.keys(), ["test[foo]-x"])
+        self.assertFalse(os.path.exists("unused"))
+
+        cache.close()
+        cache.open()
+        self.assertEqual(cache.read("test[foo]-x", inMemory=False), None)
+
+    def test_detach_and_merge(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, writebehind=False)
+        cache.store("first", 1337)
+        cache.sync()
+
+        # Same as in a forked worker: reads the file, keeps stores in memory
+        detached = Cache.Cache(tempDirectory, writebehind=False)
+        detached.detach()
+        self.assertEqual(detached.read("first", inMemory=False), 1337)
+        detached.store("second", "hello")
+        self.assertEqual(detached.read("second", inMemory=False), "hello")
+
+        records = detached.takeRecords()
+        self.assertEqual(list(records), ["second"])
+        self.assertEqual(detached.takeRecords(), None)
+
+        cache.merge(records)
+        cache.close()
+        cache = Cache.Cache(tempDirectory)
+        self.assertEqual(cache.read("second"), "hello")
+
+    def test_detach_sqlite(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory, backend="sqlite")
+        cache.store("first", 1337)
+        cache.sync()
+
+        cache.detach()
+        self.assertEqual(cache.read("first", inMemory=False), 1337)
+        cache.store("second", 42)
+        self.assertEqual(cache.read("second", inMemory=False), 42)
+        self.assertEqual(list(cache.takeRecords()), ["second"])
+
 
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.ERROR)
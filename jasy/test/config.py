@@ -90,6 +90,13 @@ class Tests(unittest.TestCase):
         self.assertEqual(config.get('foo.yeah'), 42)
 
 
+    def test_config_object_getdata_withdot_default(self):
+
+        config = Config.Config({'foo': {'yeah': 42}, 'one': 1})
+        self.assertEqual(config.get('foo.nope', 'default'), 'default')
+        self.assertEqual(config.get('bar.yeah', 'default'), 'default')
+
+
     def test_config_object_setdata_withdot(self):
 
         config = Config.Config({'foo': {'yeah': 42}, 'one': 1})
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, copy
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.output.Compressor as Compressor
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code):
+        tree = Parser.parse(code)
+        ScopeScanner.scan(tree)
+
+        return tree, tree.clone()
+
+    def compress(self, tree):
+        return Compressor.Compressor().compress(tree)
+
+    def test_equal(self):
+        tree, cloned = self.process('var x = 1.5, y = -2, z = "hello"; if (x) { y = null; } else z = [1,,3]; function f(a, b) { return a + b; }')
+        self.assertEqual(self.compress(cloned), self.compress(tree))
+        self.assertEqual(cloned.toXml(), tree.toXml())
+
+    def test_relations(self):
+        tree, cloned = self.process('if (x) { y = 1; } else { y = 2; }')
+        statement = cloned[0]
+        self.assertIsNot(statement, tree[0])
+        self.assertIs(statement.thenPart, statement[1])
+        self.assertIs(statement.elsePart, statement[2])
+        self.assertIs(statement.thenPart.parent, statement)
+        self.assertIs(statement.parent, cloned)
+        self.assertFalse(hasattr(cloned, "parent"))
+
+    def test_independent(self):
+        tree, cloned = self.process('a = 1; b = 2;')
+        cloned.remove(cloned[0])
+        self.assertEqual(self.compress(tree), 'a=1;b=2;')
+        self.assertEqual(self.compress(cloned), 'b=2;')
+
+    def test_scope(self):
+        tree, cloned = self.process('function f(a) { var b = a; }')
+        self.assertIs(cloned.scope, tree.scope)
+        self.assertIs(cloned[0].body.scope, tree[0].body.scope)
+
+    def test_rare_attributes(self):
+        # Attributes only set on some nodes of a type must be copied as well
+        tree, cloned = self.process('a = b + c; d = (e + f) * g;')
+        self.assertEqual(self.compress(cloned), 'a=b+c;d=(e+f)*g;')
+
+    def test_deepcopy(self):
+        tree = Parser.parse('var x = function(a) { return a * 2; };')
+        self.assertEqual(self.compress(copy.deepcopy(tree)), self.compress(tree))
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
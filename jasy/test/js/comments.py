@@ -688,6 +688,40 @@ class Tests(unittest.TestCase):
         self.assertEqual("current" in comment.tags["use"], True)
         self.assertEqual("xxx" in comment.tags["use"], False)
 
+
+
+    def test_doc_tags_lazy(self):
+
+        parsed = self.process('''
+
+        /**
+         * Hello World
+         *
+         * #require(foo.Bar)
+         */
+        tagged();
+
+        /**
+         * Just a {String} with @text {String} param
+         */
+        untagged();
+
+        ''')
+
+        tagged = parsed[0].comments[0]
+        untagged = parsed[1].comments[0]
+
+        # Tags are available without accessing anything else before
+        self.assertEqual(tagged.getTags(), {"require" : set(["foo.Bar"])})
+        self.assertTrue(tagged.hasTag("require"))
+        self.assertEqual(tagged.text, "Hello World")
+
+        # Comments without any tags are not processed for querying them
+        self.assertEqual(untagged.getTags(), None)
+        self.assertFalse(untagged.hasTag("require"))
+        self.assertEqual(untagged.params["text"]["type"], [{"name" : "String", "builtin" : True}])
+        self.assertEqual(untagged.getTags(), None)
+
     
     
     #
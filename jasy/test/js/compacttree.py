@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Node as Node
+import jasy.js.output.Compressor as Compressor
+import jasy.js.optimize.Translation as Translation
+import jasy.js.output.Optimization as Optimization
+import jasy.parse.CompactTree as CompactTree
+import jasy.core.Worker as Worker
+
+from jasy.js.MetaData import MetaData
+from jasy.item.Class import collectFields, ClassItem
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code):
+        tree = Parser.parse(code)
+        ScopeScanner.scan(tree)
+
+        return tree, CompactTree.CompactTree(tree).getRoot()
+
+    def compress(self, tree):
+        return Compressor.Compressor().compress(tree)
+
+    def test_view(self):
+        tree, view = self.process('var x = 1.5, y = -2, z = "hello"; if (x) { y = null; } else z = [1,,3];')
+        self.assertEqual(view.type, "script")
+        self.assertEqual(len(view), 2)
+        self.assertEqual(view[1].type, "if")
+        self.assertEqual(view[-1].type, "if")
+        self.assertEqual([child.type for child in view], ["var", "if"])
+        self.assertEqual([child.type for child in reversed(view)], ["if", "var"])
+        self.assertEqual(self.compress(view), self.compress(tree))
+
+    def test_positions(self):
+        tree, view = self.process('a = 1;\nb = 2;')
+        self.assertEqual(view.line, tree.line)
+        self.assertEqual(view[1].line, 2)
+        self.assertEqual(view[1].start, tree[1].start)
+        self.assertEqual(view[1].end, tree[1].end)
+        self.assertIsNone(view.tokenizer)
+
+    def test_relations(self):
+        tree, view = self.process('function foo(a, b) { return a + b; }')
+        func = view[0]
+        self.assertEqual(func.type, "function")
+        self.assertEqual(func.name, "foo")
+        self.assertEqual(func.body.parent, func)
+        self.assertEqual(func.body.rel, "body")
+        self.assertEqual(func.params.parent, func)
+        self.assertEqual(func.parent, view)
+        self.assertEqual(func.parent.index(func), 0)
+        self.assertFalse(hasattr(func, "rel"))
+        self.assertFalse(hasattr(view, "parent"))
+        self.assertRaises(AttributeError, getattr, func, "unknown")
+
+    def test_holes(self):
+        tree, view = self.process('x = [1,,3];')
+        array = view[0].expression[1]
+        self.assertEqual(array.type, "array_init")
+        self.assertEqual(len(array), 3)
+        self.assertIsNone(array[1])
+        self.assertEqual(array[2].value, 3)
+
+    def test_readonly(self):
+        tree, view = self.process('x++;')
+        self.assertRaises(AttributeError, setattr, view[0], "type", "block")
+        self.assertRaises(AttributeError, setattr, view[0], "value", 1)
+
+    def test_find(self):
+        tree, view = self.process('a(); function b() { c(d()); }')
+        self.assertEqual([call[0].value for call in view.findNodes("call")], ["a", "c", "d"])
+        self.assertEqual([call[0].value for call in view[1].findNodes("call")], ["c", "d"])
+        self.assertEqual(view.findNodes("unknown"), [])
+        self.assertEqual(view.collectValues("name"), ["b"])
+
+    def test_materialize(self):
+        tree, view = self.process('var x = window.foo; function bar() { return x; }')
+        restored = view.materialize()
+        self.assertIsInstance(restored, Node.Node)
+        self.assertEqual(restored.toXml(), tree.toXml())
+        self.assertIs(restored[1].body.parent, restored[1])
+        self.assertEqual(restored.scope.shared, tree.scope.shared)
+
+        # Materialized trees can be modified without affecting the table
+        restored.remove(restored[0])
+        self.assertEqual(len(view), 2)
+
+        # Sub trees
+        func = view[1].materialize()
+        self.assertEqual(func.type, "function")
+        self.assertEqual(self.compress(func), "function bar(){return x}")
+
+    def test_scope(self):
+        tree = Parser.parse('var x = window.foo; function bar(a) { return x + a; }')
+        view = CompactTree.CompactTree(Parser.parse('var x = window.foo; function bar(a) { return x + a; }')).getRoot()
+        ScopeScanner.scan(tree)
+        ScopeScanner.scan(view)
+        self.assertEqual(view.scope.declared, tree.scope.declared)
+        self.assertEqual(view.scope.shared, tree.scope.shared)
+        self.assertEqual(view.scope.packages, tree.scope.packages)
+        self.assertEqual(view[1].body.scope.params, tree[1].body.scope.params)
+        self.assertEqual(view[1].body.scope.accessed, tree[1].body.scope.accessed)
+        self.assertEqual(view.materialize().scope.declared, tree.scope.declared)
+
+    def test_passes(self):
+        tree, view = self.process('/** #require(foo.Bar) #break(foo.Baz) */ if (jasy.Env.isSet("debug")) { x = tr("Hello"); } y = this.tr("World"); z = trn("One", "Many", 2);')
+        meta = MetaData(view)
+        self.assertEqual(meta.requires, MetaData(tree).requires)
+        self.assertEqual(meta.breaks, set(["foo.Baz"]))
+        self.assertEqual(collectFields(view), set(["debug"]))
+        self.assertEqual(Translation.collectTranslations(view), Translation.collectTranslations(tree))
+
+    def test_materialized_optimize(self):
+        # Nodes created by optimizers from materialized nodes are used to create further nodes
+        code = 'function f(graph, adjacent, current) { var node = graph[adjacent]; if (node.distance === -1) { node.distance = graph[current].distance + 1; node.parent = current; } }'
+        classItem = ClassItem(Worker.WorkerProject(), "foo.Main")
+        classItem.setText(code)
+
+        optimization = Optimization.Optimization("declarations", "blocks", "variables", "privates")
+        self.assertEqual(classItem.getCompressed(None, None, optimization), 'function f(b,d,c){var a=b[d];a.distance===-1&&(a.distance=b[c].distance+1,a.parent=c)}')
+
+        tree = Parser.parse(code)
+        ScopeScanner.scan(tree)
+        optimization.apply(tree)
+        self.assertEqual(classItem.getCompressed(None, None, optimization), self.compress(tree))
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
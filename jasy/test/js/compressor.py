@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-import sys, os, unittest, logging
+import sys, os, io, unittest, logging
 
 # Extend PYTHONPATH with local 'lib' folder
 if __name__ == "__main__":
@@ -307,6 +307,19 @@ class Tests(unittest.TestCase):
 
     def test_while(self):
         self.assertEqual(self.process('while (true) { x++; }'), 'while(true){x++}')
+
+    def test_stream(self):
+        code = 'var x = 1; function foo(a) { return a + ++x; } if (x) { foo(x) } else foo(-x); do x--; while(x)'
+        stream = io.StringIO()
+        self.assertEqual(Compressor.Compressor().compress(Parser.parse(code), stream), None)
+        self.assertEqual(stream.getvalue(), self.process(code))
+        self.assertEqual(stream.getvalue(), 'var x=1;function foo(a){return a+ ++x}if(x){foo(x)}else foo(-x);do{x--;}while(x);')
+
+    def test_stream_parenthesized(self):
+        tree = Parser.parse('(x + y) * -z')[0].expression
+        stream = io.StringIO()
+        Compressor.Compressor().compress(tree, stream)
+        self.assertEqual(stream.getvalue(), '(x+y)*-z')
                      
         
 
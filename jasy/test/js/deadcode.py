@@ -13,6 +13,10 @@ import jasy.js.parse.ScopeScanner as ScopeScanner
 import jasy.js.output.Compressor as Compressor
 import jasy.js.clean.Unused as Unused
 import jasy.js.clean.DeadCode as DeadCode
+import jasy.js.clean.Permutate as Permutate
+import jasy.core.Permutation as Permutation
+
+from jasy.js.Facts import Facts
 
 
 class Tests(unittest.TestCase):
@@ -94,6 +98,21 @@ class Tests(unittest.TestCase):
     def test_if_trueish_or_unknown(self):
         self.assertEqual(self.process('if (true || x) x++;'), 'if(true||x)x++;')
 
+    def test_decidable(self):
+        self.assertFalse(Facts(Parser.parse('if (x) { y = a ? 1 : 2; } switch (x) { case 1: break; }')).deadCode)
+        self.assertTrue(Facts(Parser.parse('function x() { return 2 == 3 ? 1 : 2; }')).deadCode)
+        self.assertTrue(Facts(Parser.parse('switch ("a") { case "a": x(); break; }')).deadCode)
+
+    def test_patched(self):
+        code = 'if (jasy.Env.isSet("debug") && x) { a(); } if (y) { b = jasy.Env.isSet("debug") ? 1 : 2; if (false) c(); }'
+        node = Parser.parse(code)
+        patched = Permutate.patchAccesses(node, Permutation.getPermutation({"debug": False}), Facts(node).accesses)
+        self.assertEqual(len(patched), 2)
+        self.assertTrue(DeadCode.cleanupPatched(node, patched))
+
+        # Only branches around patched nodes are processed
+        self.assertEqual(Compressor.Compressor().compress(node), 'if(y){b=2;if(false)c()}')
+
 
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.ERROR)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Node as Node
+import jasy.js.optimize.Translation as Translation
+import jasy.parse.CompactTree as CompactTree
+
+from jasy.js.Facts import Facts
+from jasy.js.MetaData import MetaData
+from jasy.js.util import assembleDot
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code):
+        return Facts(Parser.parse(code))
+
+    def test_fields(self):
+        facts = self.process('if (jasy.Env.isSet("debug")) { x = jasy.Env.getValue("locale"); } y = jasy.Env.select("engine", {}); z = foo.isSet("other");')
+        self.assertEqual(facts.fields, set(["debug", "locale", "engine"]))
+
+    def test_accesses(self):
+        tree = Parser.parse('x = 1; if (jasy.Env.isSet("debug")) { y = jasy.Env.select("engine", { webkit: jasy.Env.getValue("locale") }); }')
+        facts = Facts(tree)
+        self.assertEqual(len(facts.accesses), 3)
+
+        for path, name in zip(facts.accesses, ["jasy.Env.isSet", "jasy.Env.select", "jasy.Env.getValue"]):
+            node = tree
+            for index in path:
+                node = node[index]
+
+            self.assertEqual(node.type, "call")
+            self.assertEqual(assembleDot(node[0]), name)
+
+    def test_translations(self):
+        code = 'x = tr("Hello"); function foo() { y = this.tr("Hello"); z = trc("Menu", "Open"); } w = trn("One", "Many", 2);'
+        facts = self.process(code)
+        self.assertEqual(facts.translations, Translation.collectTranslations(Parser.parse(code)))
+        self.assertEqual(facts.translations["Hello"], [1, 1])
+
+    def test_meta(self):
+        facts = self.process('/** #require(foo.Bar) */ x = 1; function y() { /** #break(foo.Baz) #asset(foo/*) */ }')
+        self.assertIsInstance(facts.meta, MetaData)
+        self.assertEqual(facts.meta.requires, set(["foo.Bar"]))
+        self.assertEqual(facts.meta.breaks, set(["foo.Baz"]))
+        self.assertEqual(facts.meta.assets, set(["foo/*"]))
+
+    def test_scope(self):
+        code = 'var x = window.foo.bar; function y(a) { return x + a + core.Main.z; }'
+        tree = Parser.parse(code)
+        facts = Facts(tree)
+        scope = ScopeScanner.scan(Parser.parse(code))
+        self.assertEqual(facts.scope.declared, scope.declared)
+        self.assertEqual(facts.scope.shared, scope.shared)
+        self.assertEqual(facts.scope.packages, scope.packages)
+        self.assertIs(tree.scope, facts.scope)
+        self.assertEqual(tree[1].body.scope.params, set(["a"]))
+
+    def test_compact(self):
+        code = '/** #require(foo.Bar) */ if (jasy.Env.isSet("debug")) { x = tr("Hello"); }'
+        tree = Parser.parse(code)
+        facts = Facts(CompactTree.CompactTree(tree).getRoot())
+        self.assertEqual(facts.fields, set(["debug"]))
+        self.assertEqual(list(facts.translations), ["Hello"])
+        self.assertEqual(facts.meta.requires, set(["foo.Bar"]))
+        self.assertEqual(facts.scope.shared, ScopeScanner.scan(tree).shared)
+
+    def test_deep(self):
+        # Generated code might be nested deeper than the recursion limit
+        tree = Parser.parse('x = 1;')
+        node = tree
+        for pos in range(sys.getrecursionlimit() * 2):
+            child = Node.Node(None, "block")
+            node.append(child)
+            node = child
+
+        self.assertEqual(Facts(tree).scope.shared, { "x" : 1 })
+        self.assertEqual(ScopeScanner.scan(tree).shared, { "x" : 1 })
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
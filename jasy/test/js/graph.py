@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.core.Cache as Cache
+import jasy.core.Project as Project
+
+from jasy.js.DependencyGraph import DependencyGraph
+from jasy.core.NamespaceTrie import NamespaceTrie
+
+
+class Tests(unittest.TestCase):
+
+    def writeFile(self, path, fileName, content):
+        os.makedirs(path, exist_ok=True)
+        handle = open(os.path.join(path, fileName), mode="w", encoding="utf-8")
+        handle.write(content)
+        handle.close()
+
+    def createProject(self):
+        path = os.path.join(tempfile.TemporaryDirectory().name, "myproject")
+        src = os.path.join(path, "src")
+
+        self.writeFile(src, "Main.js", "myproject.Main = function() { return new myproject.util.Helper(); };")
+        self.writeFile(os.path.join(src, "util"), "Helper.js", "myproject.util.Helper = function() { myproject.Base.call(this); };")
+        self.writeFile(os.path.join(src, "util"), "Other.js", "myproject.util.Other = 1;")
+        self.writeFile(src, "Base.js", "myproject.Base = function() {};")
+        self.writeFile(src, "Tools.js", "/**\n * #require(myproject.util.*)\n */\nmyproject.Tools = {};")
+
+        return Project.Project(path, {"name": "myproject"})
+
+    def getIds(self, classObjs):
+        return sorted([classObj.getId() for classObj in classObjs])
+
+    def test_dependencies(self):
+        project = self.createProject()
+        classes = project.getClasses()
+        graph = DependencyGraph(classes)
+
+        self.assertEqual(self.getIds(graph.getDependencies(classes["myproject.Main"])), ["myproject.util.Helper"])
+        self.assertEqual(self.getIds(graph.getDependencies(classes["myproject.Tools"])), ["myproject.util.Helper", "myproject.util.Other"])
+        self.assertEqual(self.getIds(graph.getClosure([classes["myproject.Main"]])), ["myproject.Base", "myproject.Main", "myproject.util.Helper"])
+
+    def test_dependents(self):
+        project = self.createProject()
+        classes = project.getClasses()
+        graph = DependencyGraph(classes)
+
+        self.assertEqual(self.getIds(graph.getDependents(classes["myproject.util.Helper"])), ["myproject.Main", "myproject.Tools"])
+        self.assertEqual(self.getIds(graph.getAffected([classes["myproject.Base"]])), ["myproject.Base", "myproject.Main", "myproject.Tools", "myproject.util.Helper"])
+
+    def test_persistence(self):
+        project = self.createProject()
+        classes = project.getClasses()
+        graph = DependencyGraph(classes)
+        graph.getClosure(classes.values())
+
+        keys = [key for key in project.getCache().keys() if key.startswith("deps[")]
+        self.assertEqual(len(keys), len(classes))
+        self.assertTrue("deps[myproject.Main]-None" in keys)
+
+        # Entries are only computed again for classes which match a removed class
+        subset = dict(classes)
+        del subset["myproject.util.Other"]
+        reduced = DependencyGraph(subset)
+
+        Cache.resetStatistics()
+        self.assertEqual(self.getIds(reduced.getDependencies(classes["myproject.Main"])), ["myproject.util.Helper"])
+        self.assertEqual(Cache.getStatistics()["namespaces"]["deps"]["stores"], 0)
+
+        self.assertEqual(self.getIds(reduced.getDependencies(classes["myproject.Tools"])), ["myproject.util.Helper"])
+        self.assertEqual(Cache.getStatistics()["namespaces"]["deps"]["stores"], 1)
+
+    def test_index(self):
+        project = self.createProject()
+        classes = project.getClasses()
+        index = NamespaceTrie(classes)
+
+        plain = DependencyGraph(classes)
+        indexed = DependencyGraph(classes, index=index)
+
+        for classObj in classes.values():
+            self.assertEqual(indexed.getDependencies(classObj), plain.getDependencies(classObj))
+
+        # The index might know more classes than the ones available for the graph
+        subset = dict(classes)
+        del subset["myproject.util.Other"]
+        reduced = DependencyGraph(subset, index=index)
+        self.assertEqual(self.getIds(reduced.getDependencies(classes["myproject.Tools"])), ["myproject.util.Helper"])
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
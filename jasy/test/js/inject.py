@@ -15,6 +15,8 @@ import jasy.js.parse.ScopeScanner as ScopeScanner
 import jasy.js.output.Compressor as Compressor
 import jasy.js.clean.Permutate as Permutate
 
+from jasy.js.Facts import Facts
+
 
 class Tests(unittest.TestCase):
 
@@ -28,7 +30,14 @@ class Tests(unittest.TestCase):
             'fullversion': 3.11
         })
         Permutate.patch(node, permutation)
-        return Compressor.Compressor().compress(node)    
+        result = Compressor.Compressor().compress(node)
+
+        # Patching the positions known from parsing gives the same result
+        node = Parser.parse(code)
+        self.assertNotEqual(Permutate.patchAccesses(node, permutation, Facts(node).accesses), None)
+        self.assertEqual(Compressor.Compressor().compress(node), result)
+
+        return result
     
     
     def test_get(self):
@@ -171,6 +180,22 @@ class Tests(unittest.TestCase):
             'var prefix="Webkit";'
         )             
 
+    def test_nested(self):
+        self.assertEqual(self.process(
+            '''
+            var prefix = jasy.Env.select("engine", {
+              webkit: jasy.Env.isSet("legacy") ? jasy.Env.getValue("version") : "",
+              "default": jasy.Env.getValue("debug")
+            });
+            '''),
+            'var prefix=true?"3":"";'
+        )
+
+    def test_outdated_accesses(self):
+        node = Parser.parse('var engine = jasy.Env.getValue("engine");')
+        accesses = Facts(Parser.parse('var x = 1; var engine = jasy.Env.getValue("engine");')).accesses
+        self.assertEqual(Permutate.patchAccesses(node, Permutation.getPermutation({'engine': 'webkit'}), accesses), None)
+
 
     
 if __name__ == '__main__':
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Node as Node
+import jasy.js.output.Compressor as Compressor
+import jasy.js.output.Optimization as Optimization
+import jasy.js.optimize.CombineDeclarations as CombineDeclarations
+import jasy.js.optimize.BlockReducer as BlockReducer
+import jasy.js.optimize.LocalVariables as LocalVariables
+import jasy.js.optimize.CryptPrivates as CryptPrivates
+import jasy.js.clean.DeadCode as DeadCode
+import jasy.js.clean.Unused as Unused
+import jasy.parse.Pipeline as Pipeline
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code, *optimizations):
+        node = Parser.parse(code, "test")
+        ScopeScanner.scan(node)
+        Optimization.Optimization(*optimizations).apply(node)
+        return Compressor.Compressor().compress(node)
+
+    def sequential(self, code):
+        node = Parser.parse(code, "test")
+        ScopeScanner.scan(node)
+        CombineDeclarations.optimize(node)
+        BlockReducer.optimize(node)
+        LocalVariables.optimize(node)
+        CryptPrivates.optimize(node, "test")
+        return Compressor.Compressor().compress(node)
+
+    def test_stages(self):
+        pipeline = Pipeline.Pipeline([CombineDeclarations.Pass(), BlockReducer.Pass(), LocalVariables.Pass(), CryptPrivates.Pass()])
+        self.assertEqual(pipeline.getStages(), [["declarations"], ["blocks", "variables", "privates"]])
+
+        pipeline = Pipeline.Pipeline([BlockReducer.Pass(), LocalVariables.Pass()])
+        self.assertEqual(pipeline.getStages(), [["blocks", "variables"]])
+
+    def test_order(self):
+        pipeline = Pipeline.Pipeline([CryptPrivates.Pass(), LocalVariables.Pass(), BlockReducer.Pass(), CombineDeclarations.Pass()])
+        self.assertEqual(pipeline.getStages(), [["variables", "privates", "declarations"], ["blocks"]])
+
+    def test_cyclic(self):
+        class First(Pipeline.Pass):
+            name = "first"
+            after = ("second",)
+
+        class Second(Pipeline.Pass):
+            name = "second"
+            requires = ("first",)
+
+        self.assertRaises(Pipeline.Error, Pipeline.Pipeline, [First(), Second()])
+
+    def test_sequential(self):
+        code = '''
+        function foo(first, second) {
+            var result = first;
+            if (second) {
+                var other = second + 1;
+                result += other;
+            } else {
+                return null;
+            }
+
+            this.__cache = result;
+            return this.__cache;
+        }
+        '''
+        optimized = self.process(code, "declarations", "blocks", "variables", "privates")
+        self.assertEqual(optimized, self.sequential(code))
+        self.assertEqual(optimized, 'function foo(d,a){var b=d,c;if(a)c=a+1,b+=c;else return null;this.__yTs75=b;return this.__yTs75}')
+
+    def test_error(self):
+        self.assertRaises(Optimization.Error, self.process, 'this.__foo = 1; x = this.__bar;', "blocks", "privates")
+
+    def test_deep(self):
+        # Generated code might be nested deeper than the recursion limit
+        tree = Parser.parse('function foo(a, b) { if (false) { b++; } return a; }')
+        body = tree[0].body
+        statement = body[1]
+
+        outer = node = Node.Node(None, "block")
+        for pos in range(sys.getrecursionlimit() * 2):
+            child = Node.Node(None, "block")
+            node.append(child)
+            node = child
+
+        body.replace(statement, outer)
+        node.append(statement)
+
+        DeadCode.cleanup(tree)
+        Unused.cleanup(tree)
+        Optimization.Optimization("declarations", "blocks", "variables").apply(tree)
+        self.assertEqual(Compressor.Compressor().compress(tree), 'function foo(a){return a}')
+
+    def test_statistics(self):
+        Pipeline.resetStatistics()
+        self.process('var x = 1; x++;', "blocks", "variables")
+        self.assertEqual(list(Pipeline.getStatistics()), ["blocks+variables"])
+
+        Pipeline.resetStatistics()
+        Pipeline.setProfiling(True)
+        try:
+            self.process('var x = 1; x++;', "blocks", "variables")
+        finally:
+            Pipeline.setProfiling(False)
+
+        statistics = Pipeline.getStatistics()
+        self.assertEqual(set(statistics), set(["blocks", "variables", Pipeline.walkStatistic]))
+        self.assertEqual(statistics["blocks"]["runs"], 1)
+
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.Sorter as Sorter
+
+
+class Item:
+    def __init__(self, id):
+        self.id = id
+
+    def getId(self):
+        return self.id
+
+
+class Graph:
+    def __init__(self, dependencies, breaks):
+        self.dependencies = dependencies
+        self.breaks = breaks
+
+    def getDependencies(self, classObj):
+        return set(self.dependencies.get(classObj, ()))
+
+    def getBreaks(self, classObj):
+        return set(self.breaks.get(classObj, ()))
+
+
+class Resolver:
+    def __init__(self, classes, required):
+        self.classes = classes
+        self.required = required
+
+    def getIncludedClasses(self):
+        return set(self.classes)
+
+    def getRequiredClasses(self):
+        return self.required
+
+
+class Session:
+    def getCurrentPermutation(self):
+        return None
+
+    def getFieldSetupClasses(self):
+        return {}
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, dependencies, required, breaks={}, excluded=()):
+        items = {}
+        for name in set(dependencies) | set([dep for deps in dependencies.values() for dep in deps]):
+            items[name] = Item(name)
+
+        graph = Graph(dict([(items[name], [items[dep] for dep in deps]) for name, deps in dependencies.items()]), dict([(items[name], [items[dep] for dep in deps]) for name, deps in breaks.items()]))
+        sorter = Sorter.Sorter(Resolver([items[name] for name in items if not name in excluded], [items[name] for name in required]), Session(), graph)
+
+        return [classObj.getId() for classObj in sorter.getSortedClasses()]
+
+    def test_simple(self):
+        self.assertEqual(self.process({"Main": ["Foo"], "Foo": ["Bar"], "Bar": []}, ["Main"]), ["Bar", "Foo", "Main"])
+
+    def test_shared(self):
+        self.assertEqual(self.process({"Main": ["Foo", "Bar"], "Foo": ["Core"], "Bar": ["Core", "Foo"], "Core": []}, ["Main"]), ["Core", "Foo", "Bar", "Main"])
+
+    def test_fewer_dependencies_first(self):
+        self.assertEqual(self.process({"Main": ["A", "B"], "A": ["C", "D"], "B": [], "C": [], "D": []}, ["Main"]), ["B", "C", "D", "A", "Main"])
+
+    def test_required_order(self):
+        self.assertEqual(self.process({"Main": ["Core"], "Other": [], "Core": []}, ["Other", "Main"]), ["Other", "Core", "Main"])
+
+    def test_break(self):
+        # Class with break is loaded first, broken dependency as soon as possible afterwards
+        result = self.process({"Main": ["App"], "App": ["View"], "View": ["App", "Base"], "Base": []}, ["Main"], {"App": ["View"]})
+        self.assertEqual(result, ["App", "Base", "View", "Main"])
+
+    def test_excluded(self):
+        # Graph of the resolver contains classes which are not included
+        self.assertEqual(self.process({"Main": ["Foo", "Core"], "Foo": ["Core"], "Core": []}, ["Main"], excluded=["Core"]), ["Foo", "Main"])
+
+    def test_circular(self):
+        with self.assertRaises(Sorter.CircularDependency) as context:
+            self.process({"Main": ["A"], "A": ["B"], "B": ["A"]}, ["Main"])
+
+        self.assertTrue(str(context.exception) in ("Circular Dependency: A >> B >> A", "Circular Dependency: B >> A >> B"))
+
+    def test_deep(self):
+        # Deeper than the recursion limit
+        count = 5000
+        dependencies = dict([("C%s" % pos, ["C%s" % (pos + 1)] if pos + 1 < count else []) for pos in range(count)])
+        result = self.process(dependencies, ["C0"])
+        self.assertEqual(result[0], "C%s" % (count - 1))
+        self.assertEqual(result[-1], "C0")
+        self.assertEqual(len(result), count)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.tokenize.Tokenizer as Tokenizer
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code, scanOperand=False):
+        tokenizer = Tokenizer.Tokenizer(code)
+        result = []
+
+        while tokenizer.get(scanOperand) != "end":
+            token = tokenizer.token
+            result.append((token.type, getattr(token, "value", None)))
+
+        return result
+
+    def test_identifiers(self):
+        self.assertEqual(self.process("var $foo = _bar1;"), [("var", None), ("identifier", "$foo"), ("assign", None), ("identifier", "_bar1"), ("semicolon", None)])
+
+    def test_numbers(self):
+        self.assertEqual(self.process("42 1.5 1. .5 1e3 2.5E-2 0 0.25 0x1F 017 0e1"), [
+            ("number", 42), ("number", "1.5"), ("number", "1."), ("number", ".5"), ("number", "1e3"), ("number", "2.5E-2"),
+            ("number", 0), ("number", "0.25"), ("number", "0x1F"), ("number", "017"), ("number", 0)
+        ])
+
+    def test_number_member(self):
+        self.assertEqual(self.process("1..toString"), [("number", "1."), ("dot", None), ("identifier", "toString")])
+
+    def test_missing_exponent(self):
+        self.assertRaises(Tokenizer.ParseError, self.process, "1e+")
+
+    def test_strings(self):
+        self.assertEqual(self.process(r'''"double" 'single' "esc\"aped" 'tab\t' '''), [
+            ("string", "double"), ("string", "single"), ("string", 'esc"aped'), ("string", "tab\t")
+        ])
+
+    def test_unterminated_string(self):
+        self.assertRaises(Tokenizer.ParseError, self.process, '"open')
+
+    def test_operators(self):
+        tokenizer = Tokenizer.Tokenizer("a >>>= b !== c <= d && e")
+        types = []
+        while tokenizer.get() != "end":
+            types.append((tokenizer.token.type, tokenizer.token.assignOp if hasattr(tokenizer.token, "assignOp") else None))
+
+        self.assertEqual(types, [("identifier", None), ("assign", "ursh"), ("identifier", None), ("strict_ne", None), ("identifier", None), ("le", None), ("identifier", None), ("and", None), ("identifier", None)])
+
+    def test_regexp(self):
+        self.assertEqual(self.process(r"/a[/\]]+\/b/gi", True), [("regexp", r"/a[/\]]+\/b/gi")])
+        self.assertEqual(self.process("a / b"), [("identifier", "a"), ("div", None), ("identifier", "b")])
+
+    def test_comments(self):
+        tokenizer = Tokenizer.Tokenizer("\n  /* first\n line */ // second\n\n\n   /** Doc */\nfoo")
+        self.assertEqual(tokenizer.get(), "identifier")
+        self.assertEqual(tokenizer.token.line, 7)
+
+        comments = tokenizer.getComments()
+        self.assertEqual([comment.variant for comment in comments], ["multi", "single", "doc"])
+        self.assertEqual([comment.context for comment in comments], ["block", "section", "section"])
+
+    def test_unterminated_comment(self):
+        self.assertRaises(Tokenizer.ParseError, self.process, "foo /* open")
+
+    def test_newlines(self):
+        tokenizer = Tokenizer.Tokenizer("a\nb")
+        self.assertEqual(tokenizer.get(), "identifier")
+        self.assertEqual(tokenizer.peekOnSameLine(), "newline")
+        self.assertEqual(tokenizer.get(), "identifier")
+        self.assertEqual(tokenizer.token.line, 2)
+
+    def test_illegal(self):
+        self.assertRaises(Tokenizer.ParseError, self.process, "a # b")
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
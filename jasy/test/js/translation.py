@@ -13,6 +13,9 @@ import jasy.js.parse.ScopeScanner as ScopeScanner
 import jasy.js.output.Compressor as Compressor
 import jasy.js.optimize.Translation as TranslationOptimizer
 import jasy.item.Translation as Translation
+import jasy.core.Worker as Worker
+
+from jasy.item.Class import ClassItem
 
 
 class Tests(unittest.TestCase):
@@ -171,6 +174,32 @@ class Tests(unittest.TestCase):
         )
 
 
+    def test_checksum(self):
+        translation = Translation.TranslationItem(None, id="de", table={ "Hello": "Hallo", "Bye": "Tschuess" })
+        checksum = translation.getTableChecksum(["Hello"])
+        self.assertEqual(checksum, translation.getTableChecksum(set(["Hello"])))
+        self.assertNotEqual(checksum, translation.getTableChecksum(["Hello", "Bye"]))
+
+        translation += Translation.TranslationItem(None, id="de", table={ "Bye": "Ciao" })
+        self.assertEqual(translation.getTableChecksum(["Hello"]), checksum)
+
+        translation += Translation.TranslationItem(None, id="de", table={ "Hello": "Servus" })
+        self.assertNotEqual(translation.getTableChecksum(["Hello"]), checksum)
+
+    def test_compressed_key(self):
+        classItem = ClassItem(Worker.WorkerProject(), "foo.Main")
+        classItem.setText('foo.Main = function() { return tr("Hello"); };')
+
+        translation = Translation.TranslationItem(None, id="de", table={ "Hello": "Hallo", "Bye": "Tschuess" })
+        self.assertEqual(classItem.getCompressed(translation=translation), 'foo.Main=function(){return"Hallo"};')
+
+        # Unrelated changes keep the compressed code
+        translation += Translation.TranslationItem(None, id="de", table={ "Bye": "Ciao" })
+        self.assertTrue(classItem.hasCompressed(translation=translation))
+
+        translation += Translation.TranslationItem(None, id="de", table={ "Hello": "Servus" })
+        self.assertFalse(classItem.hasCompressed(translation=translation))
+        self.assertEqual(classItem.getCompressed(translation=translation), 'foo.Main=function(){return"Servus"};')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging
+
+# Extend PYTHONPATH with local 'lib' folder
+if __name__ == "__main__":
+    jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir, os.pardir))
+    sys.path.insert(0, jasyroot)
+    print("Running from %s..." % jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.parse.Node as Node
+import jasy.js.output.Compressor as Compressor
+import jasy.js.output.Optimization as Optimization
+import jasy.parse.TreeStore as TreeStore
+import jasy.core.Worker as Worker
+
+from jasy.item.Class import ClassItem
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, code):
+        tree = Parser.parse(code)
+        ScopeScanner.scan(tree)
+
+        return tree, TreeStore.load(TreeStore.dump(tree), Node.Node)
+
+    def compress(self, tree):
+        return Compressor.Compressor().compress(tree)
+
+    def test_roundtrip(self):
+        tree, restored = self.process('var x = 1.5, y = -2, z = "hello"; if (x) { y = null; } else z = [1,,3];')
+        self.assertEqual(self.compress(tree), self.compress(restored))
+        self.assertEqual(self.compress(restored), 'var x=1.5,y=-2,z="hello";if(x){y=null}else z=[1,,3];')
+
+    def test_positions(self):
+        tree, restored = self.process('a = 1;\nb = 2;')
+        self.assertEqual(restored.line, tree.line)
+        self.assertEqual(restored[1].line, 2)
+        self.assertEqual(restored[1].start, tree[1].start)
+        self.assertEqual(restored[1].end, tree[1].end)
+
+    def test_relations(self):
+        tree, restored = self.process('function foo(a, b) { return a + b; }')
+        func = restored[0]
+        self.assertEqual(func.type, "function")
+        self.assertEqual(func.name, "foo")
+        self.assertIs(func.body.parent, func)
+        self.assertEqual(func.body.rel, "body")
+        self.assertIs(func.params.parent, func)
+        self.assertIs(func.parent, restored)
+
+    def test_scope(self):
+        tree, restored = self.process('var x = window.foo; function bar() { return x; }')
+        self.assertEqual(restored.scope.declared, tree.scope.declared)
+        self.assertEqual(restored.scope.shared, tree.scope.shared)
+        self.assertEqual(restored[1].body.scope.accessed, tree[1].body.scope.accessed)
+
+    def test_detached(self):
+        tree, restored = self.process('x++;')
+        self.assertIsNone(restored.tokenizer)
+        self.assertIsNone(restored[0].tokenizer)
+
+    def test_optimize(self):
+        # Nodes created by optimizers from restored nodes are used to create further nodes
+        code = 'function f(graph, adjacent, current) { var node = graph[adjacent]; if (node.distance === -1) { node.distance = graph[current].distance + 1; node.parent = current; } }'
+        tree, restored = self.process(code)
+
+        Optimization.Optimization("declarations", "blocks", "variables").apply(tree)
+        Optimization.Optimization("declarations", "blocks", "variables").apply(restored)
+        self.assertEqual(self.compress(restored), self.compress(tree))
+
+        # Next session: tree is restored from the cache and compressed using more optimizations
+        project = Worker.WorkerProject()
+        first = ClassItem(project, "foo.Main")
+        first.setText(code)
+        first.getCompressed(None, None, Optimization.Optimization("declarations"))
+        project.getCache().remove("tree[foo.Main]")
+
+        second = ClassItem(project, "foo.Main")
+        second.setText(code)
+        self.assertEqual(second.getCompressed(None, None, Optimization.Optimization("declarations", "blocks", "variables", "privates")), 'function f(b,d,c){var a=b[d];a.distance===-1&&(a.distance=b[c].distance+1,a.parent=c)}')
+
+    def test_invalid(self):
+        self.assertRaises(TreeStore.StoreError, TreeStore.load, b"", Node.Node)
+        self.assertRaises(TreeStore.StoreError, TreeStore.load, b"XYZ\x01", Node.Node)
+
+    def test_truncated(self):
+        data = TreeStore.dump(Parser.parse('var a = [1, 2, 3];'))
+        self.assertRaises(TreeStore.StoreError, TreeStore.load, data[:30], Node.Node)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, fnmatch
+
+# Extend PYTHONPATH with local 'lib' folder
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+from jasy.core.NamespaceTrie import NamespaceTrie
+
+
+names = ["foo", "foo.Main", "foo.util.Helper", "foo.util.Other", "foo.util.sub.Deep", "foo.utility", "fooo.Bar", "bar.Main"]
+
+
+class Tests(unittest.TestCase):
+
+    def test_contains(self):
+        index = NamespaceTrie(names)
+
+        self.assertEqual(len(index), len(names))
+        self.assertTrue("foo.util.Helper" in index)
+        self.assertFalse("foo.util" in index)
+        self.assertFalse("foo.util.Helper.create" in index)
+
+        index.add("foo.util")
+        index.add("foo.util")
+        self.assertTrue("foo.util" in index)
+        self.assertEqual(len(index), len(names) + 1)
+
+    def test_prefixes(self):
+        index = NamespaceTrie(names)
+
+        self.assertEqual(index.getPrefixes("foo.util.Helper.create"), ["foo.util.Helper", "foo"])
+        self.assertEqual(index.getPrefixes("foo.Main"), ["foo.Main", "foo"])
+        self.assertEqual(index.getPrefixes("baz.Main"), [])
+
+    def test_match(self):
+        index = NamespaceTrie(names)
+
+        self.assertEqual(sorted(index.match("foo.util.*")), ["foo.util.Helper", "foo.util.Other", "foo.util.sub.Deep"])
+        self.assertEqual(sorted(index.match("foo.util*")), ["foo.util.Helper", "foo.util.Other", "foo.util.sub.Deep", "foo.utility"])
+        self.assertEqual(sorted(index.match("*.Main")), ["bar.Main", "foo.Main"])
+        self.assertEqual(index.match("foo.[LM]ain"), ["foo.Main"])
+        self.assertEqual(index.match("foo.Main"), ["foo.Main"])
+        self.assertEqual(index.match("baz.*"), [])
+        self.assertEqual(index.match("foo.util"), [])
+
+    def test_match_fnmatch(self):
+        index = NamespaceTrie(names)
+
+        for pattern in ["*", "f*", "foo.*", "foo.?ain", "*.util.*", "foo.util.s*.*", "fo[o].*", "*o*"]:
+            self.assertEqual(sorted(index.match(pattern)), sorted(fnmatch.filter(names, pattern)), pattern)
+
+    def test_match_after_add(self):
+        index = NamespaceTrie(names)
+
+        self.assertEqual(len(index.match("foo.util.*")), 3)
+        index.add("foo.util.New")
+        self.assertEqual(len(index.match("foo.util.*")), 4)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, pickle
+
+# Extend PYTHONPATH with local 'lib' folder
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import jasy.core.Permutation as Permutation
+import jasy.core.Worker as Worker
+from jasy.item.Class import ClassItem
+
+
+class Tests(unittest.TestCase):
+
+    def test_registry(self):
+        first = Permutation.getPermutation({"debug": True, "engine": "webkit"})
+        second = Permutation.getPermutation({"engine": "webkit", "debug": True})
+        self.assertIs(first, second)
+        self.assertEqual(first.getKey(), "debug:true;engine:webkit")
+        self.assertIsNot(first, Permutation.getPermutation({"debug": 1, "engine": "webkit"}))
+
+    def test_filter(self):
+        permutation = Permutation.getPermutation({"debug": True, "engine": "webkit", "locale": "de"})
+        fields = Permutation.internFields(["engine", "debug"])
+        self.assertIs(fields, Permutation.internFields(set(["debug", "engine"])))
+
+        filtered = permutation.filter(fields)
+        self.assertEqual(filtered.getKey(), "debug:true;engine:webkit")
+        self.assertIs(permutation.filter(fields), filtered)
+        self.assertIs(permutation.filter(set(["debug", "engine"])), filtered)
+        self.assertEqual(permutation.filter(Permutation.internFields(["other"])), None)
+
+    def test_pickle(self):
+        permutation = Permutation.getPermutation({"debug": False})
+        self.assertIs(pickle.loads(pickle.dumps(permutation)), permutation)
+
+    def test_class_fields(self):
+        classItem = ClassItem(Worker.WorkerProject(), "foo.Main")
+        classItem.setText('if (jasy.Env.isSet("debug")) { foo.x = jasy.Env.getValue("engine"); }')
+
+        fields = classItem.getFieldSet()
+        self.assertIs(fields, Permutation.internFields(["debug", "engine"]))
+        self.assertIs(classItem.getFieldSet(), fields)
+
+        permutation = Permutation.getPermutation({"debug": True, "engine": "gecko", "locale": "en"})
+        self.assertEqual(classItem.filterPermutation(permutation).getKey(), "debug:true;engine:gecko")
+        self.assertIs(classItem.filterPermutation(permutation), classItem.filterPermutation(permutation))
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -180,6 +180,102 @@ content: {myproject.Main: [man/Main.js, man/Add.js], myproject/main.css: [man/ma
     def test_manual_class_fusion(self):
         self.assertEqual(self.createCaseOne().getClassByName("myproject.Main").getText(), ";;")
 
+    def createContentValidated(self):
+        path = os.path.join(tempfile.TemporaryDirectory().name, "myproject")
+        os.makedirs(os.path.join(path, "src"))
+        self.writeFile(os.path.join(path, "src"), "Main.js", "var x = 1;")
+
+        return Project.Project(path, {"name": "myproject", "cache": {"validation": "content"}})
+
+    def test_content_validation(self):
+        project = self.createContentValidated()
+        self.assertEqual(project.getCacheValidation(), "content")
+
+        item = project.getClassByName("myproject.Main")
+        item.storeCache("fields[myproject.Main]", set(["debug"]))
+
+        # Touching the file does not invalidate the entry
+        path = item.getPath()
+        os.utime(path, (item.mtime + 100, item.mtime + 100))
+        touched = type(item)(project, item.id).attach(path)
+        self.assertEqual(touched.getFingerprint(), item.getFingerprint())
+        self.assertEqual(touched.readCache("fields[myproject.Main]"), set(["debug"]))
+
+        # Modifying the content does
+        self.writeFile(os.path.dirname(path), "Main.js", "var x = 2;")
+        modified = type(item)(project, item.id).attach(path)
+        self.assertNotEqual(modified.getFingerprint(), item.getFingerprint())
+        self.assertEqual(modified.readCache("fields[myproject.Main]"), None)
+
+    def test_mtime_validation(self):
+        path = self.createContentValidated().getPath()
+        project = Project.Project(path, {"name": "myproject"})
+        self.assertEqual(project.getCacheValidation(), "mtime")
+
+        item = project.getClassByName("myproject.Main")
+        item.storeCache("fields[myproject.Main]", set(["debug"]), inMemory=False)
+
+        path = item.getPath()
+        os.utime(path, (item.mtime + 100, item.mtime + 100))
+        touched = type(item)(project, item.id).attach(path)
+        self.assertEqual(touched.readCache("fields[myproject.Main]"), None)
+
+    def test_collect_garbage(self):
+        path = self.createContentValidated().getPath()
+        project = Project.Project(path, {"name": "myproject"})
+        cache = project.getCache()
+
+        item = project.getClassByName("myproject.Main")
+        item.storeCache("meta[myproject.Main]-None", 1)
+        item.storeCache("compressed[myproject.Main]-debug:true-None-None-None", 2)
+        cache.store("meta[myproject.Removed]-None", 3)
+        cache.store("meta[myproject.Main]-None@123", 4)
+
+        project.collectGarbage([])
+        keys = cache.keys()
+        self.assertTrue("meta[myproject.Main]-None" in keys)
+        self.assertFalse("compressed[myproject.Main]-debug:true-None-None-None" in keys)
+        self.assertFalse("meta[myproject.Removed]-None" in keys)
+        self.assertFalse("meta[myproject.Main]-None@123" in keys)
+
+    def test_collect_garbage_translated(self):
+        path = self.createContentValidated().getPath()
+        project = Project.Project(path, {"name": "myproject"})
+        cache = project.getCache()
+
+        # Compressed entries are keyed by language and checksum of the used translations
+        item = project.getClassByName("myproject.Main")
+        item.storeCache("compressed[myproject.Main]-None-de#c0ffee-None-None", 1)
+        item.storeCache("compressed[myproject.Main]-debug:true-de#c0ffee-None-None", 2)
+
+        project.collectGarbage([])
+        keys = cache.keys()
+        self.assertTrue("compressed[myproject.Main]-None-de#c0ffee-None-None" in keys)
+        self.assertFalse("compressed[myproject.Main]-debug:true-de#c0ffee-None-None" in keys)
+    def test_collect_garbage_namespaces(self):
+        path = self.createContentValidated().getPath()
+        project = Project.Project(path, {"name": "myproject"})
+        cache = project.getCache()
+
+        item = project.getClassByName("myproject.Main")
+        item.getFields()
+        item.storeCache("facts[myproject.Main]-None", 2)
+        item.storeCache("facts[myproject.Main]-debug:true", 3)
+        item.storeCache("deps[myproject.Main]-None", 4)
+        item.storeCache("deps[myproject.Main]-None-c0ffee", 5)
+
+        # Entries of other kinds of items with the same ID
+        item.storeCache("fields[myproject.Main]", 6)
+
+        project.collectGarbage([])
+        keys = cache.keys()
+        self.assertTrue("facts[myproject.Main]" in keys)
+        self.assertTrue("facts[myproject.Main]-None" in keys)
+        self.assertFalse("facts[myproject.Main]-debug:true" in keys)
+        self.assertTrue("deps[myproject.Main]-None" in keys)
+        self.assertFalse("deps[myproject.Main]-None-c0ffee" in keys)
+        self.assertFalse("fields[myproject.Main]" in keys)
+
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.ERROR)
     suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
@@ -228,6 +228,35 @@ def add(number):
         self.assertEqual(counter, 24)
 
 
+    def test_group_permutations(self):
+        path = self.createProject([], onlyFileCreation=True)
+        classPath = os.path.join(os.path.join(path, "source"), "class")
+        self.writeFile(classPath, "Main.js", 'myproject.Main = function() { return jasy.Env.isSet("debug"); };')
+        self.writeFile(classPath, "Other.js", 'myproject.Other = function() { return jasy.Env.getValue("engine"); };')
+
+        session = Session.Session()
+        session.addProject(Project.getProjectFromPath(path))
+
+        # Engine is not accessed by the main class
+        groups = session.groupPermutations(["myproject.Main"])
+        self.assertEqual(len(groups), 2)
+        self.assertEqual([len(group) for group in groups], [4, 4])
+
+        groups = session.groupPermutations(["myproject.Main", "myproject.Other"])
+        self.assertEqual(len(groups), 8)
+
+        results = session.runPermutations(lambda permutation: permutation.get("debug"), ["myproject.Main"])
+        self.assertEqual(results, [True] * 4 + [False] * 4)
+
+        # Build loops only process one permutation of each group
+        processed = []
+        for permutation in session.permutate(["myproject.Main"]):
+            processed.append(len(session.getEquivalentPermutations()))
+
+        self.assertEqual(processed, [3, 3])
+        self.assertEqual(session.getEquivalentPermutations(), ())
+
+
 if __name__ == '__main__':
     logging.getLogger().setLevel(logging.ERROR)
     suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
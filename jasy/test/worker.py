@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import sys, os, unittest, logging, tempfile, shutil
+
+# Extend PYTHONPATH with local 'lib' folder
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import jasy.core.Cache as Cache
+import jasy.core.Worker as Worker
+from jasy.core.Permutation import getPermutation
+from jasy.item.Class import ClassItem
+
+
+class Tests(unittest.TestCase):
+
+    def process(self, classes, permutation=None):
+        entries = Worker.compressClasses(classes, permutation, None, None, None)
+
+        project = Worker.WorkerProject()
+        for classId, text in classes:
+            classItem = ClassItem(project, classId)
+            classItem.setText(text)
+            self.assertFalse(classItem.hasCompressed(permutation))
+
+            for field, value in entries[classId].items():
+                classItem.storeCache(field, value)
+
+            self.assertTrue(classItem.hasCompressed(permutation))
+
+        project.close()
+
+        return entries
+
+
+    def test_compress(self):
+
+        classes = [("foo.Main", "foo.Main = function(a, b) { return a + b; };"), ("foo.Other", "foo.Other = { x : 1 };")]
+        entries = self.process(classes)
+
+        project = Worker.WorkerProject()
+        serial = ClassItem(project, "foo.Main")
+        serial.setText(classes[0][1])
+        self.assertEqual(entries["foo.Main"]["compressed[foo.Main]-None-None-None-None"], serial.getCompressed())
+        project.close()
+
+
+    def test_compress_permutation(self):
+
+        classes = [("foo.Main", "if (jasy.Env.isSet('debug')) { foo.x = 1; } else { foo.x = 2; }")]
+        permutation = getPermutation({"debug": True})
+        entries = self.process(classes, permutation)
+
+        compressed = [value for field, value in entries["foo.Main"].items() if field.startswith("compressed[")]
+        self.assertEqual(compressed, ["{foo.x=1}"])
+
+
+    def test_compress_error(self):
+
+        # Errors are reported by the main process, workers just skip these classes
+        entries = Worker.compressClasses([("foo.Broken", "foo.Broken = function( {")], None, None, None, None)
+        self.assertFalse("compressed" in str(list(entries.get("foo.Broken", {}))))
+
+
+    def test_run_in_workers(self):
+
+        tempDirectory = tempfile.TemporaryDirectory().name
+        os.makedirs(tempDirectory)
+        cache = Cache.Cache(tempDirectory)
+        cache.store("base", 10)
+
+        def square(value):
+            logging.info("Squaring %s", value)
+            cache.store("square-%s" % value, value * value + cache.read("base"))
+            return (os.getpid(), value * value)
+
+        Worker.setJobs(2)
+        try:
+            results = Worker.runInWorkers(square, range(5), [cache])
+        finally:
+            Worker.setJobs(1)
+
+        self.assertEqual([value for pid, value in results], [0, 1, 4, 9, 16])
+        self.assertFalse(os.getpid() in [pid for pid, value in results])
+        self.assertEqual(cache.read("square-3"), 19)
+
+        cache.close()
+        cache = Cache.Cache(tempDirectory)
+        self.assertEqual(cache.read("square-4"), 26)
+        cache.close()
+        self.assertFalse(cache in Cache.instances)
+
+        shutil.rmtree(tempDirectory)
+
+
+    def test_run_in_workers_error(self):
+
+        def fail(value):
+            if value == 1:
+                raise ValueError("Failed: %s" % value)
+
+            return value
+
+        Worker.setJobs(2)
+        try:
+            self.assertRaises(ValueError, Worker.runInWorkers, fail, range(3))
+        finally:
+            Worker.setJobs(1)
+
+        # Sequential without multiple jobs
+        self.assertEqual(Worker.runInWorkers(fail, [0, 2]), [0, 2])
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.ERROR)
+    suite = unittest.TestLoader().loadTestsFromTestCase(Tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
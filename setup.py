@@ -42,6 +42,7 @@ if uses == "distribute":
       "jsdoc" : ["misaka"],
       "daemon" : ["watchdog"],
       "sprites" : ["Pillow"],
+      "lz4" : ["lz4"],
       "doc" : ["sphinx"]
     }
 
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Measures write/read throughput and stored size of the cache for each available codec.
+
+Usage: cache.py [file.js ...]
+
+Uses the given JavaScript files (or generated code) to create typical cache values:
+syntax trees, compressed code and highlighted HTML.
+"""
+
+import sys, os, time, tempfile, shutil
+
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import jasy.core.Cache as Cache
+import jasy.js.parse.Parser as Parser
+import jasy.js.output.Compressor as Compressor
+
+
+def getSources():
+    if len(sys.argv) > 1:
+        return [open(fileName, encoding="utf-8").read() for fileName in sys.argv[1:]]
+
+    code = "\n".join(["var obj%s = { key : 'value %s', list : [1, 2, 3], fn : function(a, b) { return a + b * %s; } };" % (pos, pos, pos) for pos in range(200)])
+    return [code] * 10
+
+
+def getValues(sources):
+    values = []
+    for pos, source in enumerate(sources):
+        tree = Parser.parse(source)
+        compressed = Compressor.Compressor().compress(tree)
+        html = "".join(["<span class=\"k\">%s</span>" % line for line in source.split("\n")])
+
+        values.append(("tree[%s]" % pos, tree))
+        values.append(("compressed[%s]" % pos, compressed))
+        values.append(("highlighted[%s]" % pos, html))
+
+    return values
+
+
+def run(codec, values, rounds=3):
+    folder = tempfile.mkdtemp()
+    cache = Cache.Cache(folder, codec=codec)
+    Cache.resetStatistics()
+
+    start = time.time()
+    for round in range(rounds):
+        for key, value in values:
+            cache.store(key, value, inMemory=False)
+        cache.sync()
+    writeTime = time.time() - start
+
+    start = time.time()
+    for round in range(rounds):
+        for key, value in values:
+            cache.read(key, inMemory=False)
+    readTime = time.time() - start
+
+    stored = sum(entry["storedBytes"] for entry in Cache.getStatistics()["namespaces"].values()) / rounds
+    cache.close()
+    fileSize = cache.getFileSize()
+    shutil.rmtree(folder)
+
+    return stored, fileSize, writeTime / rounds, readTime / rounds
+
+
+values = getValues(getSources())
+
+print("%-6s %12s %12s %12s %12s" % ("Codec", "Stored KB", "File KB", "Write ms", "Read ms"))
+for codec in sorted(Cache.codecs):
+    stored, fileSize, writeTime, readTime = run(codec, values)
+    print("%-6s %12.1f %12.1f %12.1f %12.1f" % (codec, stored / 1024, fileSize / 1024, writeTime * 1000, readTime * 1000))
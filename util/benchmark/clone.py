@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Compares AbstractNode.clone() with the previous deepcopy() based copying of syntax trees.
+
+Usage: clone.py [file.js ...]
+"""
+
+import sys, os, time, copy
+
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import jasy.js.parse.Parser as Parser
+import jasy.js.parse.ScopeScanner as ScopeScanner
+import jasy.js.output.Compressor as Compressor
+
+
+def deepcopyNode(node, memo):
+    """Previous implementation of AbstractNode.__deepcopy__()"""
+
+    CurrentClass = node.__class__
+
+    if hasattr(node, "tokenizer"):
+        result = CurrentClass(tokenizer=node.tokenizer)
+    else:
+        result = CurrentClass(type=node.type)
+
+    for child in node:
+        if child is None:
+            list.append(result, None)
+        else:
+            childCopy = memo.get(id(child))
+            if childCopy is None:
+                childCopy = deepcopyNode(child, memo)
+                memo[id(child)] = childCopy
+            childCopy.parent = result
+            list.append(result, childCopy)
+
+    for name in node.__slots__:
+        if hasattr(node, name) and not name in ("parent", "tokenizer"):
+            value = getattr(node, name)
+            if value is None:
+                pass
+            elif type(value) in (bool, int, float, str):
+                setattr(result, name, value)
+            elif type(value) is CurrentClass:
+                mapped = memo.get(id(value))
+                if mapped is None:
+                    mapped = memo[id(value)] = deepcopyNode(value, memo)
+                setattr(result, name, mapped)
+            elif type(value) in (list, set, dict):
+                setattr(result, name, copy.deepcopy(value, memo))
+            elif name == "scope":
+                result.scope = node.scope
+
+    return result
+
+
+def getTrees():
+    if len(sys.argv) > 1:
+        sources = [open(fileName, encoding="utf-8").read() for fileName in sys.argv[1:]]
+    else:
+        sources = ["\n".join(["var obj%s = { key : 'value %s', list : [1, 2, 3], fn : function(a, b) { if (a) { return a + b * %s; } else { return b; } } };" % (pos, pos, pos) for pos in range(2000)])]
+
+    trees = []
+    for source in sources:
+        tree = Parser.parse(source)
+        ScopeScanner.scan(tree)
+        trees.append(tree)
+
+    return trees
+
+
+def measure(method, trees, rounds=5):
+    start = time.time()
+    for round in range(rounds):
+        for tree in trees:
+            method(tree)
+
+    return (time.time() - start) / rounds
+
+
+trees = getTrees()
+
+sys.setrecursionlimit(10000)
+for tree in trees:
+    if Compressor.Compressor().compress(tree.clone()) != Compressor.Compressor().compress(deepcopyNode(tree, {})):
+        raise Exception("Clone differs from deepcopy!")
+
+deepcopyTime = measure(lambda tree: deepcopyNode(tree, {}), trees)
+cloneTime = measure(lambda tree: tree.clone(), trees)
+
+print("%-10s %12s" % ("Method", "Time ms"))
+print("%-10s %12.1f" % ("deepcopy", deepcopyTime * 1000))
+print("%-10s %12.1f" % ("clone", cloneTime * 1000))
+print("Speedup: %.1fx" % (deepcopyTime / cloneTime))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Sorts a synthetic application of 20.000 classes (packages of classes depending on each other
+and on a few core packages, plus some circular dependencies which are solved by breaks)
+and compares the result and the time with the previous recursive implementation.
+
+Usage: sorter.py [classes]
+"""
+
+import sys, os, time, random
+
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import jasy.js.Sorter as Sorter
+
+
+class SyntheticClass:
+    def __init__(self, id):
+        self.id = id
+
+    def getId(self):
+        return self.id
+
+    __repr__ = __str__ = getId
+
+
+class SyntheticGraph:
+    def __init__(self, dependencies, breaks):
+        self.__dependencies = dependencies
+        self.__breaks = breaks
+
+    def getDependencies(self, classObj):
+        return self.__dependencies[classObj]
+
+    def getBreaks(self, classObj):
+        return self.__breaks[classObj]
+
+
+class SyntheticResolver:
+    def __init__(self, classes, required):
+        self.__classes = classes
+        self.__required = required
+
+    def getIncludedClasses(self):
+        return self.__classes
+
+    def getRequiredClasses(self):
+        return self.__required
+
+
+class SyntheticSession:
+    def getCurrentPermutation(self):
+        return None
+
+    def getFieldSetupClasses(self):
+        return {}
+
+
+def generate(count, packageSize=50, corePackages=5):
+    random.seed(42)
+
+    classes = [SyntheticClass("app.p%s.C%s" % (pos // packageSize, pos % packageSize)) for pos in range(count)]
+    dependencies = dict([(classObj, set()) for classObj in classes])
+    breaks = dict([(classObj, set()) for classObj in classes])
+
+    for pos, classObj in enumerate(classes):
+        packageStart = pos - pos % packageSize
+
+        # Dependencies inside the package
+        for other in range(random.randint(0, 3)):
+            if pos > packageStart:
+                dependencies[classObj].add(classes[random.randint(packageStart, pos - 1)])
+
+        # Dependencies to core packages
+        if pos >= corePackages * packageSize and random.random() < 0.5:
+            dependencies[classObj].add(classes[random.randint(0, corePackages * packageSize - 1)])
+
+        # Circular dependencies solved by breaks
+        if pos > packageStart and random.random() < 0.05:
+            target = classes[random.randint(packageStart, pos - 1)]
+            dependencies[target].add(classObj)
+            breaks[target].add(classObj)
+
+    required = [classes[pos] for pos in range(count - 1, -1, -7)]
+    return classes, required, SyntheticGraph(dependencies, breaks)
+
+
+def sortPrevious(classes, required, graph):
+    """Previous recursive implementation (using the same order for classes with the same number of dependencies)"""
+
+    names = set(classObj.getId() for classObj in classes)
+    loadDeps = {}
+    circularDeps = {}
+
+    def getLoadDepsRecurser(classObj, stack):
+        if classObj in stack:
+            raise Sorter.CircularDependency("Circular Dependency")
+
+        stack.append(classObj)
+        classDeps = graph.getDependencies(classObj)
+        classBreaks = graph.getBreaks(classObj)
+
+        result = set()
+        circular = set([breakObj for breakObj in classBreaks if breakObj.getId() in names])
+
+        for depObj in classDeps:
+            if depObj is classObj or depObj in classBreaks:
+                continue
+            elif depObj in loadDeps:
+                result.update(loadDeps[depObj])
+                result.add(depObj)
+            else:
+                result.update(getLoadDepsRecurser(depObj, stack[:]))
+                result.add(depObj)
+
+        result = sorted(result, key=lambda depObj: (len(loadDeps[depObj]), depObj.getId()))
+        loadDeps[classObj] = result
+        if circular:
+            circularDeps[classObj] = circular
+
+        return result
+
+    def getLoadDeps(classObj):
+        if not classObj in loadDeps:
+            getLoadDepsRecurser(classObj, [])
+
+        return loadDeps[classObj]
+
+    def addSorted(classObj, result):
+        for depObj in getLoadDeps(classObj):
+            if not depObj in result:
+                addSorted(depObj, result)
+
+        if classObj in result:
+            return
+
+        result.append(classObj)
+
+        if classObj in circularDeps:
+            for depObj in sorted(circularDeps[classObj], key=lambda depObj: (len(getLoadDeps(depObj)), depObj.getId())):
+                if not depObj in result:
+                    addSorted(depObj, result)
+
+    for classObj in classes:
+        getLoadDeps(classObj)
+
+    result = []
+    for classObj in required:
+        if not classObj in result:
+            addSorted(classObj, result)
+
+    return result
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+classes, required, graph = generate(count)
+
+sys.setrecursionlimit(100000)
+
+start = time.time()
+sorter = Sorter.Sorter(SyntheticResolver(classes, required), SyntheticSession(), graph)
+result = sorter.getSortedClasses()
+currentTime = time.time() - start
+
+start = time.time()
+previous = sortPrevious(classes, required, graph)
+previousTime = time.time() - start
+
+if [classObj.getId() for classObj in result] != [classObj.getId() for classObj in previous]:
+    raise Exception("Sorted classes differ from previous implementation!")
+
+print("Sorted %s classes" % len(result))
+print("%-10s %12s" % ("Method", "Time ms"))
+print("%-10s %12.1f" % ("previous", previousTime * 1000))
+print("%-10s %12.1f" % ("current", currentTime * 1000))
+print("Speedup: %.1fx" % (previousTime / currentTime))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+#
+# Jasy - Web Tooling Framework
+# Copyright 2013 Sebastian Werner
+#
+
+"""
+Measures the throughput of the JavaScript tokenizer alone and of the parser on top of it.
+
+Usage: tokenizer.py [file.js ...]
+"""
+
+import sys, os, time
+
+jasyroot = os.path.normpath(os.path.join(os.path.abspath(sys.argv[0]), os.pardir, os.pardir, os.pardir))
+sys.path.insert(0, jasyroot)
+
+import jasy.js.tokenize.Tokenizer as Tokenizer
+import jasy.js.parse.Parser as Parser
+
+
+def getSources():
+    if len(sys.argv) > 1:
+        return [open(fileName, encoding="utf-8").read() for fileName in sys.argv[1:]]
+
+    block = "/**\n * Documentation of method %s.\n *\n * @param a {Number} First value\n * @return {Number} Result\n */\n"
+    return ["\n".join([(block % pos) + "var obj%s = { key : 'value %s', re : /[a-z]+\\/x/g, fn : function(a, b) { return a / b * 0x%s + 1.5e3; } };" % (pos, pos, pos) for pos in range(2000)])]
+
+
+def tokenize(source):
+    tokenizer = Tokenizer.Tokenizer(source)
+    count = 0
+
+    # Regular expressions are only detected where operands are expected
+    scanOperand = True
+    while True:
+        tokenType = tokenizer.get(scanOperand)
+        if tokenType == "end":
+            return count
+
+        count += 1
+        scanOperand = not tokenType in ("identifier", "number", "string", "regexp", "right_paren", "right_bracket", "right_curly")
+
+
+def measure(method, sources, rounds=5):
+    """Returns the best time of all rounds to reduce the noise of other processes"""
+
+    best = None
+    for round in range(rounds):
+        start = time.time()
+        for source in sources:
+            method(source)
+
+        duration = time.time() - start
+        if best is None or duration < best:
+            best = duration
+
+    return best
+
+
+sources = getSources()
+tokens = sum([tokenize(source) for source in sources])
+size = sum([len(source) for source in sources])
+
+tokenizeTime = measure(tokenize, sources)
+parseTime = measure(Parser.parse, sources)
+
+print("Processed %s tokens (%.1f KB)" % (tokens, size / 1024))
+print("%-10s %12s %14s" % ("Method", "Time ms", "Tokens/s"))
+print("%-10s %12.1f %14.0f" % ("tokenize", tokenizeTime * 1000, tokens / tokenizeTime))
+print("%-10s %12.1f %14.0f" % ("parse", parseTime * 1000, tokens / parseTime))